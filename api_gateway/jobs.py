@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from typing import Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from cache_client.idempotency import IdempotencyStore
+from job_store.models import JobRow
+from job_store.repository import JobRepository
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an idempotency key is reused with a different payload."""
+
+
+class JobRecord(BaseModel):
+    job_id: str
+    fingerprint: str
+    idempotency_key: Optional[str] = None
+    # "queued" or "failed" from the gateway, later statuses from the orchestrator
+    status: str = "queued"
+    created_at: float = Field(default_factory=time.time)
+
+    @classmethod
+    def from_row(cls, row: JobRow) -> "JobRecord":
+        return cls(
+            job_id=row.job_id,
+            fingerprint=row.payload["fingerprint"],
+            idempotency_key=row.payload.get("idempotency_key"),
+            status=row.status,
+            created_at=row.created_at,
+        )
+
+
+def fingerprint(payload: dict) -> str:
+    """Return a stable hash of a JSON payload."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class JobRegistry:
+    """Keeps submitted jobs and deduplicates client retries by idempotency key.
+
+    Job records live in the shared job store and idempotency keys in the shared
+    cache, so every gateway process sees every job and retries are deduplicated
+    across all of them.
+    """
+
+    def __init__(self, idempotency: IdempotencyStore, repository: JobRepository):
+        self._idempotency = idempotency
+        self._repository = repository
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        row = await self._repository.get_job(job_id)
+        return None if row is None else JobRecord.from_row(row)
+
+    async def submit(
+        self,
+        payload: dict,
+        enqueue: Callable[[str, dict], None],
+        *,
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[JobRecord, bool]:
+        """Register a job and enqueue it unless the idempotency key was already used.
+
+        ``enqueue`` is a blocking publisher and runs in a worker thread.
+
+        Returns:
+            The job record and ``True`` if a new job was created.
+
+        Raises:
+            IdempotencyConflict: If the key was used for a different payload.
+        """
+        fp = fingerprint(payload)
+        record = JobRecord(job_id=uuid.uuid4().hex, fingerprint=fp, idempotency_key=idempotency_key)
+
+        if idempotency_key is not None:
+            existing = await self._idempotency.reserve(idempotency_key, fp, {"job_id": record.job_id})
+            if existing is not None:
+                if existing.fingerprint != fp:
+                    raise IdempotencyConflict(
+                        f"Idempotency key {idempotency_key!r} was used for another payload"
+                    )
+                job_id = existing.result["job_id"]
+                known = await self.get(job_id)
+                if known is None:
+                    # the first request has reserved the key but not stored its job yet
+                    known = JobRecord(job_id=job_id, fingerprint=fp, idempotency_key=idempotency_key)
+                return known, False
+
+        await self._repository.create_job(
+            record.job_id, {"fingerprint": fp, "idempotency_key": idempotency_key}, status=record.status
+        )
+        try:
+            await asyncio.to_thread(enqueue, record.job_id, payload)
+        except Exception:
+            record.status = "failed"
+            await self._repository.set_job_status(record.job_id, record.status)
+            if idempotency_key is not None:
+                # let the client retry with the same key
+                await self._idempotency.release(idempotency_key, fp)
+            raise
+
+        if idempotency_key is not None:
+            await self._idempotency.complete(idempotency_key, fp, {"job_id": record.job_id})
+        return record, True
@@ -0,0 +1,220 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api_gateway import main
+from api_gateway.jobs import JobRegistry
+from cache_client.idempotency import IdempotencyStore
+from cache_client.memory import InMemoryRedis
+from cache_client.rate_limit import TokenBucketLimiter
+from job_store.sqlite import SQLiteJobRepository
+from orchestrator.readiness import StoreReadiness
+
+
+def _project() -> dict:
+    shot = {
+        "id": "00000000-0000-0000-0000-000000000003",
+        "title": "shot",
+        "style": {"voice": "calm"},
+        "text": "text",
+        "hierarchy_id": "Pr0-Ep0-Seq0-Sh0",
+    }
+    sequence = {
+        "id": "00000000-0000-0000-0000-000000000002",
+        "title": "sequence",
+        "style": {"image": "rome", "music": "ambient"},
+        "shots": [shot, {**shot, "hierarchy_id": "Pr0-Ep0-Seq0-Sh1"}],
+        "hierarchy_id": "Pr0-Ep0-Seq0",
+    }
+    episode = {
+        "id": "00000000-0000-0000-0000-000000000001",
+        "title": "episode",
+        "style": "calm",
+        "sequences": [sequence],
+        "hierarchy_id": "Pr0-Ep0",
+    }
+    return {
+        "id": "00000000-0000-0000-0000-000000000000",
+        "title": "project",
+        "style": "documentary",
+        "episodes": [episode],
+        "hierarchy_id": "Pr0",
+    }
+
+
+NODES = ["Pr0-Ep0-Seq0", "Pr0-Ep0-Seq0-Sh0", "Pr0-Ep0-Seq0-Sh1"]
+
+
+@pytest.fixture
+def readiness(tmp_path):
+    """The orchestrator side: writes node statuses into the job store shared with the gateway."""
+    store = StoreReadiness(SQLiteJobRepository(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def redis():
+    return InMemoryRedis()
+
+
+@pytest.fixture
+def enqueued(tmp_path, redis):
+    calls = []
+
+    def enqueue(job_id, payload):
+        calls.append((job_id, payload))
+
+    repository = SQLiteJobRepository(tmp_path / "jobs.db")
+    asyncio.run(repository.create_schema())
+    main.app.dependency_overrides[main.get_enqueuer] = lambda: enqueue
+    main.app.dependency_overrides[main.get_repository] = lambda: repository
+    registry = JobRegistry(IdempotencyStore(redis), repository)
+    limiter = TokenBucketLimiter(redis, rate=100, capacity=100)
+    main.app.dependency_overrides[main.get_registry] = lambda: registry
+    main.app.dependency_overrides[main.get_rate_limiter] = lambda: limiter
+    yield calls
+    main.app.dependency_overrides.clear()
+    asyncio.run(repository.close())
+
+
+@pytest.fixture
+def client(enqueued):
+    return TestClient(main.app)
+
+
+class TestCreateJob:
+    def test_accepts_and_enqueues(self, client, enqueued):
+        resp = client.post("/create_job", json={"project": _project()})
+        assert resp.status_code == 202
+        assert resp.json()["status"] == "accepted"
+        [(job_id, payload)] = enqueued
+        assert job_id == resp.json()["job_id"]
+        assert payload["hierarchy_id"] == {"project": 0}
+
+    def test_rejects_invalid_project(self, client, enqueued):
+        project = _project()
+        project["episodes"][0]["hierarchy_id"] = "Pr0-Seq0"
+        resp = client.post("/create_job", json={"project": project})
+        assert resp.status_code == 422
+        assert enqueued == []
+
+    def test_idempotency_key_deduplicates_retries(self, client, enqueued):
+        headers = {"Idempotency-Key": "abc"}
+        first = client.post("/create_job", json={"project": _project()}, headers=headers)
+        second = client.post("/create_job", json={"project": _project()}, headers=headers)
+        assert first.status_code == 202
+        assert second.status_code == 200
+        assert first.json()["job_id"] == second.json()["job_id"]
+        assert len(enqueued) == 1
+
+    def test_idempotency_key_reused_for_other_payload(self, client, enqueued):
+        headers = {"Idempotency-Key": "abc"}
+        client.post("/create_job", json={"project": _project()}, headers=headers)
+        other = _project()
+        other["title"] = "other"
+        resp = client.post("/create_job", json={"project": other}, headers=headers)
+        assert resp.status_code == 409
+        assert len(enqueued) == 1
+
+    def test_enqueue_failure_releases_key(self, client, enqueued):
+        def broken(job_id, payload):
+            raise ConnectionError("broker is down")
+
+        main.app.dependency_overrides[main.get_enqueuer] = lambda: broken
+        headers = {"Idempotency-Key": "abc"}
+        assert client.post("/create_job", json={"project": _project()}, headers=headers).status_code == 503
+
+        main.app.dependency_overrides[main.get_enqueuer] = lambda: (lambda job_id, payload: enqueued.append(job_id))
+        assert client.post("/create_job", json={"project": _project()}, headers=headers).status_code == 202
+
+    def test_failed_job_is_reported(self, client):
+        job_ids = []
+
+        def broken(job_id, payload):
+            job_ids.append(job_id)
+            raise ConnectionError("broker is down")
+
+        main.app.dependency_overrides[main.get_enqueuer] = lambda: broken
+        assert client.post("/create_job", json={"project": _project()}).status_code == 503
+        assert client.get(f"/jobs/{job_ids[0]}").json()["status"] == "failed"
+
+    def test_jobs_are_shared_between_replicas(self, client, enqueued, redis, tmp_path):
+        headers = {"Idempotency-Key": "abc"}
+        job_id = client.post("/create_job", json={"project": _project()}, headers=headers).json()["job_id"]
+
+        # another gateway process: own connections to the same job store and cache
+        other = SQLiteJobRepository(tmp_path / "jobs.db")
+        main.app.dependency_overrides[main.get_repository] = lambda: other
+        main.app.dependency_overrides[main.get_registry] = lambda: JobRegistry(IdempotencyStore(redis), other)
+        try:
+            assert client.get(f"/jobs/{job_id}").status_code == 200
+            retry = client.post("/create_job", json={"project": _project()}, headers=headers)
+            assert (retry.status_code, retry.json()["job_id"]) == (200, job_id)
+        finally:
+            asyncio.run(other.close())
+        assert len(enqueued) == 1
+
+    def test_rate_limited(self, client, enqueued):
+        limiter = TokenBucketLimiter(InMemoryRedis(), rate=0.5, capacity=1)
+        main.app.dependency_overrides[main.get_rate_limiter] = lambda: limiter
+        assert client.post("/create_job", json={"project": _project()}).status_code == 202
+
+        resp = client.post("/create_job", json={"project": _project()})
+        assert resp.status_code == 429
+        assert resp.headers["Retry-After"] == "2"
+        assert len(enqueued) == 1
+
+
+class TestJobProgress:
+    def test_unknown_job(self, client):
+        assert client.get("/jobs/missing").status_code == 404
+
+    def test_queued_until_a_node_is_ready(self, client, readiness):
+        job_id = client.post("/create_job", json={"project": _project()}).json()["job_id"]
+        readiness.expect(job_id, NODES)
+
+        body = client.get(f"/jobs/{job_id}").json()
+        assert body["status"] == "queued"
+        assert body["shots"] == {"ready": 0, "total": 2}
+
+    def test_per_level_completion(self, client, readiness):
+        job_id = client.post("/create_job", json={"project": _project()}).json()["job_id"]
+        readiness.expect(job_id, NODES)
+        readiness.mark_ready(job_id, "Pr0-Ep0-Seq0-Sh0", "a.wav")
+        readiness.flush()
+
+        body = client.get(f"/jobs/{job_id}").json()
+        assert body["status"] == "running"
+        assert body["shots"] == {"ready": 1, "total": 2}
+        assert body["sequences"] == {"ready": 0, "total": 1}
+        assert body["nodes"]["Pr0-Ep0-Seq0-Sh0"] is True
+
+    def test_event_stream_ends_on_completion(self, client, readiness):
+        job_id = client.post("/create_job", json={"project": _project()}).json()["job_id"]
+        readiness.expect(job_id, NODES)
+        for hid in NODES:
+            readiness.mark_ready(job_id, hid, f"{hid}.bin")
+        readiness.flush()
+
+        with client.stream("GET", f"/jobs/{job_id}/events") as resp:
+            assert resp.headers["content-type"].startswith("text/event-stream")
+            events = [line for line in resp.iter_lines() if line.startswith("data: ")]
+
+        last = json.loads(events[-1].removeprefix("data: "))
+        assert last["status"] == "completed"
+        assert last["shots"] == {"ready": 2, "total": 2}
+
+    def test_event_stream_times_out(self, client, readiness, monkeypatch):
+        monkeypatch.setattr(main, "PROGRESS_STREAM_TIMEOUT", 0.0)
+        job_id = client.post("/create_job", json={"project": _project()}).json()["job_id"]
+        readiness.expect(job_id, NODES)
+
+        with client.stream("GET", f"/jobs/{job_id}/events") as resp:
+            lines = list(resp.iter_lines())
+
+        assert "event: timeout" in lines
+        last = json.loads([line for line in lines if line.startswith("data: ")][-1].removeprefix("data: "))
+        assert last["status"] == "queued"
@@ -1,9 +1,48 @@
+import io
 import aioboto3
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 from botocore.config import Config
 from botocore.exceptions import ClientError
 
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable file object over a buffer.
+
+    ``put_object`` accepts bytes or file objects only; this lets it upload a
+    ``memoryview`` chunk by chunk instead of copying the whole buffer first.
+    """
+
+    def __init__(self, data: Buffer):
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
 class S3AsyncSaver:
     def __init__(
         self,
@@ -41,7 +80,7 @@ class S3AsyncSaver:
         except ClientError:
             await self._s3.create_bucket(Bucket=self.bucket)
 
-    async def save(self, data: bytes, key: str, *, content_type: Optional[str] = None):
+    async def save(self, data: Buffer, key: str, *, content_type: Optional[str] = None):
         if content_type is None:
             ext = Path(key).suffix.lower()
             content_type = {
@@ -50,10 +89,41 @@ class S3AsyncSaver:
                 ".jpeg": "image/jpeg",
                 ".webp": "image/webp",
                 ".wav": "audio/wav",
+                ".flac": "audio/flac",
+                ".opus": "audio/ogg",
+                ".m4a": "audio/mp4",
                 ".yaml": "application/x-yaml",
                 ".yml": "application/x-yaml",
             }.get(ext, "application/octet-stream")
-        await self._s3.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type)
+        body = data if isinstance(data, (bytes, bytearray)) else BufferReader(data)
+        await self._s3.put_object(Bucket=self.bucket, Key=key, Body=body, ContentType=content_type)
+
+    async def create_multipart(self, key: str, *, content_type: str = "application/octet-stream") -> str:
+        response = await self._s3.create_multipart_upload(Bucket=self.bucket, Key=key, ContentType=content_type)
+        return response["UploadId"]
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: Buffer) -> str:
+        """Upload one part (at least 5 MiB except the last one) and return its ETag.
+
+        Uploading the same ``part_number`` again replaces the part.
+        """
+        body = data if isinstance(data, (bytes, bytearray)) else BufferReader(data)
+        response = await self._s3.upload_part(
+            Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body
+        )
+        return response["ETag"]
+
+    async def complete_multipart(self, key: str, upload_id: str, etags: list[str]) -> None:
+        parts = [{"PartNumber": i, "ETag": etag} for i, etag in enumerate(etags, 1)]
+        await self._s3.complete_multipart_upload(
+            Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        await self._s3.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+    async def delete(self, key: str) -> None:
+        await self._s3.delete_object(Bucket=self.bucket, Key=key)
 
     async def download(self, key: str) -> bytes:
         response = await self._s3.get_object(Bucket=self.bucket, Key=key)
@@ -0,0 +1,146 @@
+import array
+import io
+
+import aioboto3
+import pytest
+from botocore.stub import ANY, Stubber
+
+from saver.s3_saver import BufferReader, S3AsyncSaver
+
+BUCKET = "assets"
+
+
+@pytest.fixture
+async def s3():
+    session = aioboto3.Session()
+    async with session.client(
+        "s3",
+        region_name="us-east-1",
+        endpoint_url="http://s3.test",
+        aws_access_key_id="key",
+        aws_secret_access_key="secret",
+    ) as client:
+        with Stubber(client) as stubber:
+            yield client, stubber
+            stubber.assert_no_pending_responses()
+
+
+@pytest.fixture
+def saver(s3):
+    saver = S3AsyncSaver(bucket=BUCKET)
+    saver._s3 = s3[0]
+    return saver
+
+
+def _bodies(client, operation: str) -> list[bytes]:
+    """Read the ``Body`` of every ``operation`` call as botocore receives it."""
+    bodies = []
+
+    def capture(params, **kwargs):
+        body = params["Body"]
+        bodies.append(body if isinstance(body, (bytes, bytearray)) else body.read())
+        if hasattr(body, "seek"):
+            body.seek(0)
+
+    client.meta.events.register(f"before-parameter-build.s3.{operation}", capture)
+    return bodies
+
+
+class TestBufferReader:
+    def test_reads_in_chunks(self):
+        data = bytes(range(256)) * 4
+        reader = BufferReader(memoryview(data)[100:900])
+        assert len(reader) == 800
+        assert reader.read(300) == data[100:400]
+        assert reader.tell() == 300
+        assert reader.read() == data[400:900]
+        assert reader.read(10) == b""
+
+    def test_seek(self):
+        reader = BufferReader(b"0123456789")
+        assert reader.seek(-3, io.SEEK_END) == 7
+        assert reader.read() == b"789"
+        reader.seek(2)
+        assert reader.seek(3, io.SEEK_CUR) == 5
+        assert reader.read(2) == b"56"
+        assert reader.seek(-100, io.SEEK_CUR) == 0
+
+    def test_multi_byte_views_are_read_as_bytes(self):
+        values = array.array("h", [1, -1, 256])
+        assert BufferReader(memoryview(values)).read() == values.tobytes()
+
+
+class TestS3AsyncSaver:
+    async def test_creates_missing_bucket(self, saver, s3):
+        _, stubber = s3
+        stubber.add_client_error("head_bucket", "404", expected_params={"Bucket": BUCKET})
+        stubber.add_response("create_bucket", {}, {"Bucket": BUCKET})
+        await saver._ensure_bucket()
+
+    async def test_save_memoryview_through_buffer_reader(self, saver, s3):
+        client, stubber = s3
+        bodies = _bodies(client, "PutObject")
+        data = bytes(range(256)) * 64
+        stubber.add_response(
+            "put_object",
+            {"ETag": '"etag"'},
+            {"Bucket": BUCKET, "Key": "Pr0/Ep0/Seq0/Pr0-Ep0-Seq0.webp", "Body": ANY, "ContentType": "image/webp"},
+        )
+        await saver.save(memoryview(data)[256:], "Pr0/Ep0/Seq0/Pr0-Ep0-Seq0.webp")
+        assert bodies == [data[256:]]
+
+    async def test_save_bytes_as_is(self, saver, s3):
+        _, stubber = s3
+        stubber.add_response(
+            "put_object",
+            {},
+            {"Bucket": BUCKET, "Key": "a.bin", "Body": b"data", "ContentType": "application/octet-stream"},
+        )
+        await saver.save(b"data", "a.bin")
+
+    async def test_multipart_upload(self, saver, s3):
+        client, stubber = s3
+        bodies = _bodies(client, "UploadPart")
+        stubber.add_response(
+            "create_multipart_upload",
+            {"UploadId": "u1"},
+            {"Bucket": BUCKET, "Key": "take.wav", "ContentType": "audio/wav"},
+        )
+        for number in (1, 2):
+            stubber.add_response(
+                "upload_part",
+                {"ETag": f'"e{number}"'},
+                {"Bucket": BUCKET, "Key": "take.wav", "UploadId": "u1", "PartNumber": number, "Body": ANY},
+            )
+        stubber.add_response(
+            "complete_multipart_upload",
+            {},
+            {
+                "Bucket": BUCKET,
+                "Key": "take.wav",
+                "UploadId": "u1",
+                "MultipartUpload": {"Parts": [{"PartNumber": 1, "ETag": '"e1"'}, {"PartNumber": 2, "ETag": '"e2"'}]},
+            },
+        )
+
+        upload_id = await saver.create_multipart("take.wav", content_type="audio/wav")
+        part = bytearray(b"x" * 100)
+        etags = [
+            await saver.upload_part("take.wav", upload_id, 1, memoryview(part)),
+            await saver.upload_part("take.wav", upload_id, 2, b"tail"),
+        ]
+        await saver.complete_multipart("take.wav", upload_id, etags)
+        assert etags == ['"e1"', '"e2"']
+        assert bodies == [bytes(part), b"tail"]
+
+    async def test_abort_multipart(self, saver, s3):
+        _, stubber = s3
+        stubber.add_response(
+            "abort_multipart_upload", {}, {"Bucket": BUCKET, "Key": "take.wav", "UploadId": "u1"}
+        )
+        await saver.abort_multipart("take.wav", "u1")
+
+    async def test_delete(self, saver, s3):
+        _, stubber = s3
+        stubber.add_response("delete_object", {}, {"Bucket": BUCKET, "Key": "take.flac"})
+        await saver.delete("take.flac")
@@ -0,0 +1,61 @@
+from typing import Any, Literal, Optional, Sequence
+
+from pydantic import BaseModel
+
+from cache_client.scripts import COMPARE_AND_SET, RESERVE
+
+
+class IdempotencyRecord(BaseModel):
+    fingerprint: str
+    status: Literal["pending", "done"] = "pending"
+    result: Optional[dict[str, Any]] = None
+
+
+class IdempotencyStore:
+    """Idempotency keys stored in Redis with atomic reserve / complete / release."""
+
+    def __init__(self, client, *, prefix: str = "idempotency:", ttl: float = 24 * 3600):
+        self._client = client
+        self._prefix = prefix
+        self._ttl_ms = int(ttl * 1000)
+
+    async def reserve(
+        self,
+        key: str,
+        fingerprint: str,
+        result: Optional[dict[str, Any]] = None,
+    ) -> Optional[IdempotencyRecord]:
+        """Reserve ``key`` for a request.
+
+        Returns:
+            ``None`` if the key was free and is now reserved, otherwise the record
+            stored by the first request.
+        """
+        record = IdempotencyRecord(fingerprint=fingerprint, result=result)
+        existing = await RESERVE(
+            self._client, [self._prefix + key], [record.model_dump_json(), self._ttl_ms]
+        )
+        if existing is None:
+            return None
+        return IdempotencyRecord.model_validate_json(existing)
+
+    async def complete(self, key: str, fingerprint: str, result: Optional[dict[str, Any]] = None) -> bool:
+        """Mark a reservation done. Returns ``False`` if it is missing or owned by another payload."""
+        record = IdempotencyRecord(fingerprint=fingerprint, status="done", result=result)
+        done = await COMPARE_AND_SET(
+            self._client, [self._prefix + key], [fingerprint, record.model_dump_json()]
+        )
+        return bool(int(done))
+
+    async def release(self, key: str, fingerprint: str) -> bool:
+        """Drop a reservation so the client can retry, e.g. after a failed enqueue."""
+        done = await COMPARE_AND_SET(self._client, [self._prefix + key], [fingerprint, ""])
+        return bool(int(done))
+
+    async def get_many(self, keys: Sequence[str]) -> list[Optional[IdempotencyRecord]]:
+        """Fetch several records in one pipelined round trip."""
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(self._prefix + key)
+            replies = await pipe.execute()
+        return [None if raw is None else IdempotencyRecord.model_validate_json(raw) for raw in replies]
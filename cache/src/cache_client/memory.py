@@ -0,0 +1,150 @@
+import json
+import math
+import time
+from typing import Any, Callable, Optional
+
+from redis.exceptions import NoScriptError
+
+from cache_client import scripts
+
+
+class InMemoryRedis:
+    """Single-process stand-in for ``redis.asyncio.Redis`` for local runs and tests.
+
+    Supports the commands used by ``cache_client``. Lua scripts are not interpreted:
+    every script from :mod:`cache_client.scripts` has a Python equivalent here,
+    dispatched by its SHA1.
+    """
+
+    def __init__(self, *, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+        self._scripts = {
+            scripts.TOKEN_BUCKET.sha: self._token_bucket,
+            scripts.SLIDING_WINDOW.sha: self._sliding_window,
+            scripts.RESERVE.sha: self._reserve,
+            scripts.COMPARE_AND_SET.sha: self._compare_and_set,
+        }
+
+    # --- storage helpers ---------------------------------------------------------
+    def _lookup(self, key: str, default=None):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= self._clock():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return self._data.get(key, default)
+
+    def _store(self, key: str, value, *, ttl: Optional[float] = None, keep_ttl: bool = False) -> None:
+        self._data[key] = value
+        if ttl is not None:
+            self._expires[key] = self._clock() + ttl
+        elif not keep_ttl:
+            self._expires.pop(key, None)
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    # --- commands ----------------------------------------------------------------
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._lookup(key)
+
+    async def set(self, key: str, value, *, px: Optional[int] = None) -> bool:
+        self._store(key, self._encode(value), ttl=None if px is None else px / 1000)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._lookup(key) is not None:
+                removed += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removed
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args):
+        impl = self._scripts.get(sha)
+        if impl is None:
+            raise NoScriptError("No matching script. Please use EVAL.")
+        return impl(list(keys_and_args[:numkeys]), list(keys_and_args[numkeys:]))
+
+    async def eval(self, source: str, numkeys: int, *keys_and_args):
+        return await self.evalsha(scripts.LuaScript(source).sha, numkeys, *keys_and_args)
+
+    def pipeline(self, transaction: bool = True) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
+
+    async def aclose(self) -> None:
+        pass
+
+    # --- script equivalents --------------------------------------------------------
+    def _token_bucket(self, keys, args):
+        rate, capacity, cost = float(args[0]), float(args[1]), float(args[2])
+        now = self._clock()
+        state = self._lookup(keys[0], {})
+        tokens = state.get("tokens", capacity)
+        ts = state.get("ts", now)
+        tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+        allowed, retry_after = 0, 0.0
+        if tokens >= cost:
+            tokens -= cost
+            allowed = 1
+        else:
+            retry_after = (cost - tokens) / rate
+        self._store(keys[0], {"tokens": tokens, "ts": now}, ttl=math.ceil(capacity / rate * 1000) / 1000 + 1)
+        return [allowed, str(retry_after)]
+
+    def _sliding_window(self, keys, args):
+        window, limit, cost, member = float(args[0]), int(args[1]), int(args[2]), args[3]
+        now = self._clock()
+        log = {m: s for m, s in self._lookup(keys[0], {}).items() if s > now - window}
+        if len(log) + cost <= limit:
+            for i in range(1, cost + 1):
+                log[f"{member}:{i}"] = now
+            self._store(keys[0], log, ttl=window)
+            return [1, "0"]
+        self._store(keys[0], log, keep_ttl=True)
+        if not log:
+            return [0, str(window)]
+        return [0, str(window - (now - min(log.values())))]
+
+    def _reserve(self, keys, args):
+        existing = self._lookup(keys[0])
+        if existing is not None:
+            return existing
+        self._store(keys[0], self._encode(args[0]), ttl=int(args[1]) / 1000)
+        return None
+
+    def _compare_and_set(self, keys, args):
+        existing = self._lookup(keys[0])
+        if existing is None or json.loads(existing)["fingerprint"] != args[0]:
+            return 0
+        if args[1] == "":
+            self._data.pop(keys[0], None)
+            self._expires.pop(keys[0], None)
+        else:
+            self._store(keys[0], self._encode(args[1]), keep_ttl=True)
+        return 1
+
+
+class InMemoryPipeline:
+    def __init__(self, client: InMemoryRedis):
+        self._client = client
+        self._commands: list[tuple[str, tuple]] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._commands.clear()
+
+    def __getattr__(self, name: str):
+        def queue(*args):
+            self._commands.append((name, args))
+            return self
+        return queue
+
+    async def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._client, name)(*args) for name, args in commands]
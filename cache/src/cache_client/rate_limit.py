@@ -0,0 +1,117 @@
+import abc
+import asyncio
+import os
+import time
+import uuid
+from typing import Optional, Sequence
+
+from cache_client.scripts import LuaScript, SLIDING_WINDOW, TOKEN_BUCKET
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {key!r}, retry after {retry_after:.3f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class RateLimiter(abc.ABC):
+    """Distributed rate limiter. State lives in Redis, so limits hold across processes."""
+
+    _script: LuaScript
+
+    def __init__(self, client, *, prefix: str = "ratelimit:"):
+        self._client = client
+        self._prefix = prefix
+
+    @abc.abstractmethod
+    def _args(self, cost: int) -> list: ...
+
+    @staticmethod
+    def _parse(reply) -> tuple[bool, float]:
+        allowed, retry_after = reply
+        return bool(int(allowed)), float(retry_after)
+
+    async def try_acquire(self, key: str, cost: int = 1) -> tuple[bool, float]:
+        """Take ``cost`` units from ``key`` if available.
+
+        Returns:
+            ``(allowed, retry_after)`` where ``retry_after`` is the number of
+            seconds to wait before the request may succeed.
+        """
+        reply = await self._script(self._client, [self._prefix + key], self._args(cost))
+        return self._parse(reply)
+
+    async def try_acquire_many(self, keys: Sequence[str], cost: int = 1) -> list[tuple[bool, float]]:
+        """Check several limits (e.g. per client and global) in one round trip."""
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                self._script.queue(pipe, [self._prefix + key], self._args(cost))
+            replies = await pipe.execute()
+        return [self._parse(reply) for reply in replies]
+
+    async def acquire(self, key: str, cost: int = 1, *, timeout: Optional[float] = None) -> None:
+        """Wait until ``cost`` units of ``key`` are available.
+
+        Raises:
+            RateLimitExceeded: If the units are not available within ``timeout`` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            allowed, retry_after = await self.try_acquire(key, cost)
+            if allowed:
+                return
+            if deadline is not None and time.monotonic() + retry_after > deadline:
+                raise RateLimitExceeded(key, retry_after)
+            await asyncio.sleep(retry_after)
+
+
+class TokenBucketLimiter(RateLimiter):
+    """Token bucket refilled with ``rate`` tokens per second up to ``capacity``."""
+
+    _script = TOKEN_BUCKET
+
+    def __init__(self, client, *, rate: float, capacity: int, prefix: str = "ratelimit:tb:"):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        super().__init__(client, prefix=prefix)
+        self.rate = rate
+        self.capacity = capacity
+
+    def _args(self, cost: int) -> list:
+        return [self.rate, self.capacity, cost]
+
+
+class SlidingWindowLimiter(RateLimiter):
+    """At most ``limit`` units within any ``window`` seconds."""
+
+    _script = SLIDING_WINDOW
+
+    def __init__(self, client, *, limit: int, window: float, prefix: str = "ratelimit:sw:"):
+        if limit <= 0 or window <= 0:
+            raise ValueError("limit and window must be positive")
+        super().__init__(client, prefix=prefix)
+        self.limit = limit
+        self.window = window
+
+    def _args(self, cost: int) -> list:
+        return [self.window, self.limit, cost, uuid.uuid4().hex]
+
+
+def openai_limiter_from_env() -> Optional[RateLimiter]:
+    """Limiter shared by every OpenAI client that uses the Redis at ``REDIS_URL``.
+
+    ``OPENAI_RATE`` requests per second per model, bursts of ``OPENAI_BURST``.
+    Returns ``None`` without ``REDIS_URL``: a per-process limit would not hold
+    across workers.
+    """
+    url = os.getenv("REDIS_URL")
+    if not url:
+        return None
+    from redis.asyncio import Redis
+
+    return TokenBucketLimiter(
+        Redis.from_url(url),
+        rate=float(os.getenv("OPENAI_RATE", "1")),
+        capacity=int(os.getenv("OPENAI_BURST", "5")),
+    )
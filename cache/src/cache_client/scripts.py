@@ -0,0 +1,100 @@
+import hashlib
+from typing import Any, Sequence
+
+from redis.exceptions import NoScriptError
+
+
+class LuaScript:
+    """Lua script executed with ``EVALSHA`` and loaded on first ``NOSCRIPT`` error.
+
+    Works with ``redis.asyncio.Redis``, its pipelines and ``InMemoryRedis``.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    async def __call__(self, client, keys: Sequence[str], args: Sequence[Any]) -> Any:
+        try:
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            return await client.eval(self.source, len(keys), *keys, *args)
+
+    def queue(self, pipe, keys: Sequence[str], args: Sequence[Any]) -> None:
+        """Queue the script on a pipeline. ``EVAL`` is used so a cold script cache cannot fail the batch."""
+        pipe.eval(self.source, len(keys), *keys, *args)
+
+
+# KEYS[1] - bucket; ARGV - rate (tokens/s), capacity, cost
+TOKEN_BUCKET = LuaScript("""
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+""")
+
+# KEYS[1] - window log; ARGV - window (s), limit, cost, unique member prefix
+SLIDING_WINDOW = LuaScript("""
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count + cost <= limit then
+    for i = 1, cost do
+        redis.call('ZADD', KEYS[1], now, ARGV[4] .. ':' .. i)
+    end
+    redis.call('PEXPIRE', KEYS[1], math.ceil(window * 1000))
+    return {1, '0'}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] == nil then
+    return {0, tostring(window)}
+end
+return {0, tostring(window - (now - tonumber(oldest[2])))}
+""")
+
+# KEYS[1] - idempotency key; ARGV - record, ttl (ms). Returns the existing record or nil.
+RESERVE = LuaScript("""
+local existing = redis.call('GET', KEYS[1])
+if existing then
+    return existing
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return false
+""")
+
+# KEYS[1] - idempotency key; ARGV - expected fingerprint, new record (empty to delete)
+COMPARE_AND_SET = LuaScript("""
+local existing = redis.call('GET', KEYS[1])
+if not existing then
+    return 0
+end
+if cjson.decode(existing)['fingerprint'] ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == '' then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], ARGV[2], 'KEEPTTL')
+end
+return 1
+""")
@@ -0,0 +1,168 @@
+import pytest
+
+from cache_client.idempotency import IdempotencyStore
+from cache_client.memory import InMemoryRedis
+from cache_client.rate_limit import RateLimitExceeded, SlidingWindowLimiter, TokenBucketLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def client(clock):
+    return InMemoryRedis(clock=clock)
+
+
+class TestTokenBucketLimiter:
+    async def test_burst_then_refill(self, client, clock):
+        limiter = TokenBucketLimiter(client, rate=2, capacity=3)
+        assert [(await limiter.try_acquire("k"))[0] for _ in range(4)] == [True, True, True, False]
+
+        allowed, retry_after = await limiter.try_acquire("k")
+        assert not allowed
+        assert retry_after == pytest.approx(0.5)
+
+        clock.now += 0.5
+        assert (await limiter.try_acquire("k"))[0]
+
+    async def test_keys_are_independent(self, client):
+        limiter = TokenBucketLimiter(client, rate=1, capacity=1)
+        assert (await limiter.try_acquire("a"))[0]
+        assert (await limiter.try_acquire("b"))[0]
+
+    async def test_shared_state_between_limiters(self, client):
+        # two processes configured with the same limit share one bucket
+        first = TokenBucketLimiter(client, rate=1, capacity=1)
+        second = TokenBucketLimiter(client, rate=1, capacity=1)
+        assert (await first.try_acquire("k"))[0]
+        assert not (await second.try_acquire("k"))[0]
+
+    async def test_acquire_timeout(self, client):
+        limiter = TokenBucketLimiter(client, rate=0.1, capacity=1)
+        await limiter.acquire("k")
+        with pytest.raises(RateLimitExceeded) as exc:
+            await limiter.acquire("k", timeout=1)
+        assert exc.value.retry_after == pytest.approx(10)
+
+    async def test_pipelined_check(self, client):
+        limiter = TokenBucketLimiter(client, rate=1, capacity=1)
+        await limiter.try_acquire("global")
+        results = await limiter.try_acquire_many(["global", "client"])
+        assert [allowed for allowed, _ in results] == [False, True]
+
+
+class TestSlidingWindowLimiter:
+    async def test_window(self, client, clock):
+        limiter = SlidingWindowLimiter(client, limit=2, window=10)
+        assert (await limiter.try_acquire("k"))[0]
+        clock.now += 4
+        assert (await limiter.try_acquire("k"))[0]
+
+        allowed, retry_after = await limiter.try_acquire("k")
+        assert not allowed
+        assert retry_after == pytest.approx(6)
+
+        clock.now += 6.1
+        assert (await limiter.try_acquire("k"))[0]
+
+    async def test_cost_above_limit(self, client):
+        limiter = SlidingWindowLimiter(client, limit=2, window=10)
+        assert not (await limiter.try_acquire("k", cost=3))[0]
+
+
+class TestIdempotencyStore:
+    async def test_reserve_once(self, client):
+        store = IdempotencyStore(client)
+        assert await store.reserve("key", "fp", {"job_id": "1"}) is None
+
+        existing = await store.reserve("key", "fp", {"job_id": "2"})
+        assert existing.fingerprint == "fp"
+        assert existing.result == {"job_id": "1"}
+        assert existing.status == "pending"
+
+    async def test_complete_and_release(self, client):
+        store = IdempotencyStore(client)
+        await store.reserve("key", "fp")
+        assert not await store.complete("key", "other")
+        assert await store.complete("key", "fp", {"job_id": "1"})
+        assert (await store.reserve("key", "fp")).status == "done"
+
+        assert await store.release("key", "fp")
+        assert await store.reserve("key", "fp") is None
+
+    async def test_ttl(self, client, clock):
+        store = IdempotencyStore(client, ttl=60)
+        await store.reserve("key", "fp")
+        await store.complete("key", "fp")
+        clock.now += 61
+        assert await store.reserve("key", "fp") is None
+
+    async def test_get_many(self, client):
+        store = IdempotencyStore(client)
+        await store.reserve("a", "fp-a")
+        records = await store.get_many(["a", "b"])
+        assert records[0].fingerprint == "fp-a"
+        assert records[1] is None
+
+
+@pytest.fixture
+async def redis():
+    """The Lua scripts themselves, run by fakeredis with the lupa interpreter."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.aclose()
+
+
+class TestLuaScripts:
+    async def test_token_bucket(self, redis):
+        limiter = TokenBucketLimiter(redis, rate=0.01, capacity=3)
+        assert [(await limiter.try_acquire("k"))[0] for _ in range(4)] == [True, True, True, False]
+
+        allowed, retry_after = await limiter.try_acquire("k", cost=2)
+        assert not allowed
+        assert 100 < retry_after <= 200
+        assert 0 < await redis.pttl("ratelimit:tb:k") <= 301_000
+
+    async def test_token_bucket_pipelined(self, redis):
+        limiter = TokenBucketLimiter(redis, rate=0.01, capacity=1)
+        await limiter.try_acquire("global")
+        results = await limiter.try_acquire_many(["global", "client"])
+        assert [allowed for allowed, _ in results] == [False, True]
+
+    async def test_sliding_window(self, redis):
+        limiter = SlidingWindowLimiter(redis, limit=2, window=10)
+        assert (await limiter.try_acquire("k"))[0]
+        assert (await limiter.try_acquire("k"))[0]
+
+        allowed, retry_after = await limiter.try_acquire("k")
+        assert not allowed
+        assert 9 < retry_after <= 10
+        assert not (await limiter.try_acquire("other", cost=3))[0]
+
+    async def test_idempotency(self, redis):
+        store = IdempotencyStore(redis, ttl=60)
+        assert await store.reserve("key", "fp", {"job_id": "1"}) is None
+        assert (await store.reserve("key", "fp", {"job_id": "2"})).result == {"job_id": "1"}
+
+        assert not await store.complete("key", "other")
+        assert await store.complete("key", "fp", {"job_id": "1"})
+        assert (await store.reserve("key", "fp")).status == "done"
+        # KEEPTTL: completing does not make the key permanent
+        assert 0 < await redis.pttl("idempotency:key") <= 60_000
+
+        assert not await store.release("key", "other")
+        assert await store.release("key", "fp")
+        assert await store.reserve("key", "fp") is None
+        assert not await store.complete("missing", "fp")
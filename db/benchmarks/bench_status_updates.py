@@ -0,0 +1,53 @@
+"""Status updates/sec: one write per event vs. coalesced batched upserts (SQLite).
+
+Run from the ``db`` directory::
+
+    PYTHONPATH=src python benchmarks/bench_status_updates.py
+"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from job_store.batcher import StatusBatcher
+from job_store.models import StatusUpdate
+from job_store.sqlite import SQLiteJobRepository
+
+SHOTS = 2000
+STATES = ("pending", "running", "ready")
+
+
+def _events():
+    for status in STATES:
+        for shot in range(SHOTS):
+            yield f"Pr0-Ep{shot // 200}-Seq{shot // 20 % 10}-Sh{shot % 20}", status
+
+
+async def per_event(repo: SQLiteJobRepository) -> float:
+    start = time.perf_counter()
+    for hid, status in _events():
+        await repo.apply_batch([StatusUpdate(job_id="naive", hierarchy_id=hid, status=status)])
+    return time.perf_counter() - start
+
+
+async def batched(repo: SQLiteJobRepository) -> tuple[float, int]:
+    start = time.perf_counter()
+    async with StatusBatcher(repo, max_batch=500) as batcher:
+        for hid, status in _events():
+            await batcher.submit("batched", hid, status)
+    return time.perf_counter() - start, batcher.flushes
+
+
+async def main() -> None:
+    total = SHOTS * len(STATES)
+    with tempfile.TemporaryDirectory() as tmp:
+        async with SQLiteJobRepository(Path(tmp) / "bench.db") as repo:
+            naive = await per_event(repo)
+            fast, flushes = await batched(repo)
+    print(f"per-event writes: {total / naive:12.0f} updates/s ({naive:.3f}s, {total} transactions)")
+    print(f"batched upserts:  {total / fast:12.0f} updates/s ({fast:.3f}s, {flushes} transactions)")
+    print(f"speedup: x{naive / fast:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
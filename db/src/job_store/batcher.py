@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from typing import Optional
+
+from job_store.models import NodeState, StatusUpdate
+from job_store.repository import JobRepository
+
+PROGRESS_TOPIC = "job.progress"
+
+logger = logging.getLogger(__name__)
+
+
+class StatusBatcher:
+    """Coalesce per-node status updates into batched upserts.
+
+    Updates are buffered by ``(job_id, hierarchy_id)``, so only the latest status
+    of a node is written. The buffer is flushed when it reaches ``max_batch``
+    entries or every ``flush_interval`` seconds. Each flush writes all statuses
+    plus one ``job.progress`` outbox event per touched job in a single transaction;
+    the event carries the job's cumulative counts per status, not the batch's.
+    A failed periodic flush is logged and retried on the next tick.
+    """
+
+    def __init__(self, repository: JobRepository, *, max_batch: int = 500, flush_interval: float = 0.2):
+        self._repository = repository
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._pending: dict[tuple[str, str], StatusUpdate] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.written = 0
+        self.failures = 0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def submit(
+        self,
+        job_id: str,
+        hierarchy_id: str,
+        status: NodeState,
+        asset_key: Optional[str] = None,
+    ) -> None:
+        previous = self._pending.get((job_id, hierarchy_id))
+        # a node expected again as pending drops the asset key of its previous run
+        if asset_key is None and previous is not None and status != "pending":
+            asset_key = previous.asset_key
+        self._pending[(job_id, hierarchy_id)] = StatusUpdate(
+            job_id=job_id, hierarchy_id=hierarchy_id, status=status, asset_key=asset_key
+        )
+        if len(self._pending) >= self._max_batch:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write buffered updates. Returns the number of rows written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            updates = list(self._pending.values())
+            self._pending = {}
+            try:
+                await self._repository.apply_batch(updates, progress_topic=PROGRESS_TOPIC)
+            except Exception:
+                # keep newer updates that arrived meanwhile, restore the rest
+                for update in updates:
+                    self._pending.setdefault((update.job_id, update.hierarchy_id), update)
+                raise
+            self.flushes += 1
+            self.written += len(updates)
+            return len(updates)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # the updates are back in the buffer, the next tick retries them
+                self.failures += 1
+                logger.exception("Flushing %d job status updates failed", len(self._pending))
@@ -0,0 +1,18 @@
+import os
+
+from job_store.repository import JobRepository
+
+
+def repository_from_env() -> JobRepository:
+    """PostgreSQL with ``JOB_STORE_DSN``, otherwise a SQLite file at ``JOB_STORE_PATH``.
+
+    Every process that reads or writes job progress must point at the same store.
+    """
+    dsn = os.getenv("JOB_STORE_DSN")
+    if dsn:
+        from job_store.postgres import PostgresJobRepository
+
+        return PostgresJobRepository(dsn)
+    from job_store.sqlite import SQLiteJobRepository
+
+    return SQLiteJobRepository(os.getenv("JOB_STORE_PATH", "jobs.db"))
@@ -0,0 +1,41 @@
+import time
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+NodeState = Literal["pending", "running", "ready", "failed"]
+
+
+class JobRow(BaseModel):
+    job_id: str
+    status: str
+    payload: dict[str, Any]
+    created_at: float
+    updated_at: float
+
+
+class StatusUpdate(BaseModel):
+    """Status of a single hierarchy node (shot or sequence) of a job."""
+
+    job_id: str
+    hierarchy_id: str
+    status: NodeState
+    asset_key: Optional[str] = None
+    updated_at: float = Field(default_factory=time.time)
+
+
+class AssetRow(BaseModel):
+    job_id: str
+    hierarchy_id: str
+    kind: str
+    key: str
+    content_type: Optional[str] = None
+
+
+class OutboxEvent(BaseModel):
+    """Broker event stored in the same transaction as the state change it describes."""
+
+    topic: str
+    payload: dict[str, Any]
+    id: Optional[int] = None
+    created_at: float = Field(default_factory=time.time)
@@ -0,0 +1,198 @@
+import json
+import time
+from typing import Iterable, Optional
+
+import asyncpg
+
+from job_store.models import AssetRow, JobRow, OutboxEvent, StatusUpdate
+from job_store.repository import JobRepository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    created_at DOUBLE PRECISION NOT NULL,
+    updated_at DOUBLE PRECISION NOT NULL
+);
+CREATE TABLE IF NOT EXISTS node_status (
+    job_id TEXT NOT NULL,
+    hierarchy_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    asset_key TEXT,
+    updated_at DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (job_id, hierarchy_id)
+);
+CREATE TABLE IF NOT EXISTS assets (
+    job_id TEXT NOT NULL,
+    hierarchy_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    content_type TEXT,
+    PRIMARY KEY (job_id, hierarchy_id, kind)
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id BIGSERIAL PRIMARY KEY,
+    topic TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    created_at DOUBLE PRECISION NOT NULL,
+    published_at DOUBLE PRECISION
+);
+CREATE INDEX IF NOT EXISTS outbox_unpublished ON outbox (id) WHERE published_at IS NULL;
+"""
+
+# unnest() turns the whole batch into a single statement and a single round trip
+UPSERT_STATUSES = """
+INSERT INTO node_status (job_id, hierarchy_id, status, asset_key, updated_at)
+SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::float8[])
+ON CONFLICT (job_id, hierarchy_id) DO UPDATE SET
+    status = excluded.status,
+    -- a node expected again as pending no longer points at its old asset
+    asset_key = CASE WHEN excluded.status = 'pending' THEN excluded.asset_key
+                     ELSE COALESCE(excluded.asset_key, node_status.asset_key) END,
+    updated_at = excluded.updated_at
+"""
+
+INSERT_EVENTS = """
+INSERT INTO outbox (topic, payload, created_at)
+SELECT topic, payload::jsonb, created_at FROM unnest($1::text[], $2::text[], $3::float8[])
+    AS e(topic, payload, created_at)
+"""
+
+# cumulative node counts per status of every job in $2, computed after the upsert
+INSERT_PROGRESS = """
+INSERT INTO outbox (topic, payload, created_at)
+SELECT $1, jsonb_build_object('job_id', job_id, 'statuses', jsonb_object_agg(status, n)), $3
+FROM (
+    SELECT job_id, status, COUNT(*) AS n FROM node_status
+    WHERE job_id = ANY($2::text[]) GROUP BY job_id, status
+) AS counts
+GROUP BY job_id
+"""
+
+
+class PostgresJobRepository(JobRepository):
+    """PostgreSQL implementation backed by an ``asyncpg`` connection pool."""
+
+    def __init__(self, dsn: str, *, min_size: int = 1, max_size: int = 10):
+        self._dsn = dsn
+        self._min_size = min_size
+        self._max_size = max_size
+        self._pool: Optional[asyncpg.Pool] = None
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(self._dsn, min_size=self._min_size, max_size=self._max_size)
+        return self._pool
+
+    async def create_schema(self) -> None:
+        pool = await self._get_pool()
+        await pool.execute(SCHEMA)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def create_job(self, job_id: str, payload: dict, *, status: str = "queued") -> JobRow:
+        now = time.time()
+        pool = await self._get_pool()
+        await pool.execute(
+            "INSERT INTO jobs (job_id, status, payload, created_at, updated_at) VALUES ($1, $2, $3::jsonb, $4, $4)",
+            job_id, status, json.dumps(payload), now,
+        )
+        return JobRow(job_id=job_id, status=status, payload=payload, created_at=now, updated_at=now)
+
+    async def get_job(self, job_id: str) -> Optional[JobRow]:
+        pool = await self._get_pool()
+        row = await pool.fetchrow(
+            "SELECT job_id, status, payload, created_at, updated_at FROM jobs WHERE job_id = $1", job_id
+        )
+        if row is None:
+            return None
+        return JobRow(**{**dict(row), "payload": json.loads(row["payload"])})
+
+    async def set_job_status(self, job_id: str, status: str) -> None:
+        pool = await self._get_pool()
+        await pool.execute(
+            "UPDATE jobs SET status = $1, updated_at = $2 WHERE job_id = $3", status, time.time(), job_id
+        )
+
+    async def apply_batch(
+        self,
+        updates: Iterable[StatusUpdate],
+        events: Iterable[OutboxEvent] = (),
+        *,
+        progress_topic: Optional[str] = None,
+    ) -> None:
+        updates = list(updates)
+        events = list(events)
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                if updates:
+                    await conn.execute(
+                        UPSERT_STATUSES,
+                        [u.job_id for u in updates],
+                        [u.hierarchy_id for u in updates],
+                        [u.status for u in updates],
+                        [u.asset_key for u in updates],
+                        [u.updated_at for u in updates],
+                    )
+                if events:
+                    await conn.execute(
+                        INSERT_EVENTS,
+                        [e.topic for e in events],
+                        [json.dumps(e.payload) for e in events],
+                        [e.created_at for e in events],
+                    )
+                if progress_topic is not None and updates:
+                    await conn.execute(
+                        INSERT_PROGRESS, progress_topic, sorted({u.job_id for u in updates}), time.time()
+                    )
+
+    async def prune_nodes(self, job_id: str, keep: Iterable[str]) -> None:
+        pool = await self._get_pool()
+        await pool.execute(
+            "DELETE FROM node_status WHERE job_id = $1 AND NOT hierarchy_id = ANY($2::text[])", job_id, list(keep)
+        )
+
+    async def node_statuses(self, job_id: str) -> dict[str, StatusUpdate]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            "SELECT job_id, hierarchy_id, status, asset_key, updated_at FROM node_status WHERE job_id = $1",
+            job_id,
+        )
+        return {row["hierarchy_id"]: StatusUpdate(**dict(row)) for row in rows}
+
+    async def save_asset(self, asset: AssetRow) -> None:
+        pool = await self._get_pool()
+        await pool.execute(
+            "INSERT INTO assets (job_id, hierarchy_id, kind, key, content_type) VALUES ($1, $2, $3, $4, $5) "
+            "ON CONFLICT (job_id, hierarchy_id, kind) DO UPDATE SET "
+            "key = excluded.key, content_type = excluded.content_type",
+            asset.job_id, asset.hierarchy_id, asset.kind, asset.key, asset.content_type,
+        )
+
+    async def assets(self, job_id: str) -> list[AssetRow]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            "SELECT job_id, hierarchy_id, kind, key, content_type FROM assets WHERE job_id = $1 "
+            "ORDER BY hierarchy_id, kind",
+            job_id,
+        )
+        return [AssetRow(**dict(row)) for row in rows]
+
+    async def fetch_outbox(self, limit: int = 100) -> list[OutboxEvent]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            "SELECT id, topic, payload, created_at FROM outbox WHERE published_at IS NULL ORDER BY id LIMIT $1",
+            limit,
+        )
+        return [OutboxEvent(**{**dict(row), "payload": json.loads(row["payload"])}) for row in rows]
+
+    async def mark_published(self, event_ids: Iterable[int]) -> None:
+        pool = await self._get_pool()
+        await pool.execute(
+            "UPDATE outbox SET published_at = $1 WHERE id = ANY($2::bigint[])", time.time(), list(event_ids)
+        )
@@ -0,0 +1,65 @@
+import abc
+from typing import Iterable, Optional
+
+from job_store.models import AssetRow, JobRow, OutboxEvent, StatusUpdate
+
+
+class JobRepository(abc.ABC):
+    """Async persistence of jobs, per-node statuses, assets and outbox events."""
+
+    @abc.abstractmethod
+    async def create_schema(self) -> None: ...
+
+    @abc.abstractmethod
+    async def close(self) -> None: ...
+
+    @abc.abstractmethod
+    async def create_job(self, job_id: str, payload: dict, *, status: str = "queued") -> JobRow: ...
+
+    @abc.abstractmethod
+    async def get_job(self, job_id: str) -> Optional[JobRow]: ...
+
+    @abc.abstractmethod
+    async def set_job_status(self, job_id: str, status: str) -> None: ...
+
+    @abc.abstractmethod
+    async def apply_batch(
+        self,
+        updates: Iterable[StatusUpdate],
+        events: Iterable[OutboxEvent] = (),
+        *,
+        progress_topic: Optional[str] = None,
+    ) -> None:
+        """Upsert node statuses and append outbox events in one transaction.
+
+        With ``progress_topic`` one more event per touched job is appended, with
+        the job's cumulative node counts per status after the upsert:
+        ``{"job_id": ..., "statuses": {"ready": 12, "pending": 4}}``.
+        """
+
+    @abc.abstractmethod
+    async def prune_nodes(self, job_id: str, keep: Iterable[str]) -> None:
+        """Delete the node statuses of ``job_id`` whose hierarchy id is not in ``keep``."""
+
+    @abc.abstractmethod
+    async def node_statuses(self, job_id: str) -> dict[str, StatusUpdate]: ...
+
+    @abc.abstractmethod
+    async def save_asset(self, asset: AssetRow) -> None: ...
+
+    @abc.abstractmethod
+    async def assets(self, job_id: str) -> list[AssetRow]: ...
+
+    @abc.abstractmethod
+    async def fetch_outbox(self, limit: int = 100) -> list[OutboxEvent]:
+        """Return unpublished outbox events, oldest first."""
+
+    @abc.abstractmethod
+    async def mark_published(self, event_ids: Iterable[int]) -> None: ...
+
+    async def __aenter__(self):
+        await self.create_schema()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from job_store.models import AssetRow, JobRow, OutboxEvent, StatusUpdate
+from job_store.repository import JobRepository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS node_status (
+    job_id TEXT NOT NULL,
+    hierarchy_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    asset_key TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, hierarchy_id)
+);
+CREATE TABLE IF NOT EXISTS assets (
+    job_id TEXT NOT NULL,
+    hierarchy_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    content_type TEXT,
+    PRIMARY KEY (job_id, hierarchy_id, kind)
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    published_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_unpublished ON outbox (id) WHERE published_at IS NULL;
+"""
+
+UPSERT_STATUS = """
+INSERT INTO node_status (job_id, hierarchy_id, status, asset_key, updated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (job_id, hierarchy_id) DO UPDATE SET
+    status = excluded.status,
+    -- a node expected again as pending no longer points at its old asset
+    asset_key = CASE WHEN excluded.status = 'pending' THEN excluded.asset_key
+                     ELSE COALESCE(excluded.asset_key, node_status.asset_key) END,
+    updated_at = excluded.updated_at
+"""
+
+
+class SQLiteJobRepository(JobRepository):
+    """SQLite implementation for local runs and tests.
+
+    Blocking ``sqlite3`` calls run in worker threads; connections are pooled so
+    concurrent coroutines do not serialize on a single connection.
+    """
+
+    def __init__(self, path: Union[str, Path], *, pool_size: int = 4):
+        self._path = str(path)
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._pool.put(conn)
+        self._pool_size = pool_size
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(fn, *args)
+
+    async def create_schema(self) -> None:
+        def run():
+            with self._connection() as conn:
+                conn.executescript(SCHEMA)
+        await self._run(run)
+
+    async def close(self) -> None:
+        for _ in range(self._pool_size):
+            self._pool.get().close()
+
+    async def create_job(self, job_id: str, payload: dict, *, status: str = "queued") -> JobRow:
+        now = time.time()
+
+        def run():
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT INTO jobs (job_id, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, status, json.dumps(payload), now, now),
+                )
+        await self._run(run)
+        return JobRow(job_id=job_id, status=status, payload=payload, created_at=now, updated_at=now)
+
+    async def get_job(self, job_id: str) -> Optional[JobRow]:
+        def run():
+            with self._connection() as conn:
+                return conn.execute(
+                    "SELECT job_id, status, payload, created_at, updated_at FROM jobs WHERE job_id = ?",
+                    (job_id,),
+                ).fetchone()
+        row = await self._run(run)
+        if row is None:
+            return None
+        return JobRow(job_id=row[0], status=row[1], payload=json.loads(row[2]), created_at=row[3], updated_at=row[4])
+
+    async def set_job_status(self, job_id: str, status: str) -> None:
+        def run():
+            with self._transaction() as conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                    (status, time.time(), job_id),
+                )
+        await self._run(run)
+
+    async def apply_batch(
+        self,
+        updates: Iterable[StatusUpdate],
+        events: Iterable[OutboxEvent] = (),
+        *,
+        progress_topic: Optional[str] = None,
+    ) -> None:
+        status_rows = [(u.job_id, u.hierarchy_id, u.status, u.asset_key, u.updated_at) for u in updates]
+        event_rows = [(e.topic, json.dumps(e.payload), e.created_at) for e in events]
+        jobs = sorted({row[0] for row in status_rows})
+
+        def run():
+            with self._transaction() as conn:
+                conn.executemany(UPSERT_STATUS, status_rows)
+                if progress_topic is not None and jobs:
+                    counts: dict[str, dict[str, int]] = {job_id: {} for job_id in jobs}
+                    for job_id, status, count in conn.execute(
+                        f"SELECT job_id, status, COUNT(*) FROM node_status "
+                        f"WHERE job_id IN ({', '.join('?' * len(jobs))}) GROUP BY job_id, status",
+                        jobs,
+                    ):
+                        counts[job_id][status] = count
+                    now = time.time()
+                    event_rows.extend(
+                        (progress_topic, json.dumps({"job_id": job_id, "statuses": statuses}), now)
+                        for job_id, statuses in counts.items()
+                    )
+                conn.executemany(
+                    "INSERT INTO outbox (topic, payload, created_at) VALUES (?, ?, ?)", event_rows
+                )
+        await self._run(run)
+
+    async def prune_nodes(self, job_id: str, keep: Iterable[str]) -> None:
+        keep = set(keep)
+
+        def run():
+            with self._transaction() as conn:
+                stored = conn.execute("SELECT hierarchy_id FROM node_status WHERE job_id = ?", (job_id,)).fetchall()
+                conn.executemany(
+                    "DELETE FROM node_status WHERE job_id = ? AND hierarchy_id = ?",
+                    [(job_id, hid) for (hid,) in stored if hid not in keep],
+                )
+        await self._run(run)
+
+    async def node_statuses(self, job_id: str) -> dict[str, StatusUpdate]:
+        def run():
+            with self._connection() as conn:
+                return conn.execute(
+                    "SELECT hierarchy_id, status, asset_key, updated_at FROM node_status WHERE job_id = ?",
+                    (job_id,),
+                ).fetchall()
+        rows = await self._run(run)
+        return {
+            hid: StatusUpdate(job_id=job_id, hierarchy_id=hid, status=status, asset_key=key, updated_at=ts)
+            for hid, status, key, ts in rows
+        }
+
+    async def save_asset(self, asset: AssetRow) -> None:
+        def run():
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT INTO assets (job_id, hierarchy_id, kind, key, content_type) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (job_id, hierarchy_id, kind) DO UPDATE SET "
+                    "key = excluded.key, content_type = excluded.content_type",
+                    (asset.job_id, asset.hierarchy_id, asset.kind, asset.key, asset.content_type),
+                )
+        await self._run(run)
+
+    async def assets(self, job_id: str) -> list[AssetRow]:
+        def run():
+            with self._connection() as conn:
+                return conn.execute(
+                    "SELECT hierarchy_id, kind, key, content_type FROM assets WHERE job_id = ? "
+                    "ORDER BY hierarchy_id, kind",
+                    (job_id,),
+                ).fetchall()
+        rows = await self._run(run)
+        return [
+            AssetRow(job_id=job_id, hierarchy_id=hid, kind=kind, key=key, content_type=ct)
+            for hid, kind, key, ct in rows
+        ]
+
+    async def fetch_outbox(self, limit: int = 100) -> list[OutboxEvent]:
+        def run():
+            with self._connection() as conn:
+                return conn.execute(
+                    "SELECT id, topic, payload, created_at FROM outbox WHERE published_at IS NULL "
+                    "ORDER BY id LIMIT ?",
+                    (limit,),
+                ).fetchall()
+        rows = await self._run(run)
+        return [
+            OutboxEvent(id=eid, topic=topic, payload=json.loads(payload), created_at=ts)
+            for eid, topic, payload, ts in rows
+        ]
+
+    async def mark_published(self, event_ids: Iterable[int]) -> None:
+        now = time.time()
+        rows = [(now, eid) for eid in event_ids]
+
+        def run():
+            with self._transaction() as conn:
+                conn.executemany("UPDATE outbox SET published_at = ? WHERE id = ?", rows)
+        await self._run(run)
@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from job_store.batcher import PROGRESS_TOPIC, StatusBatcher
+from job_store.models import AssetRow, OutboxEvent, StatusUpdate
+from job_store.sqlite import SQLiteJobRepository
+
+
+@pytest.fixture
+async def repo(tmp_path):
+    async with SQLiteJobRepository(tmp_path / "jobs.db") as repository:
+        yield repository
+
+
+class TestSQLiteJobRepository:
+    async def test_job_roundtrip(self, repo):
+        await repo.create_job("j1", {"title": "Rome"})
+        await repo.set_job_status("j1", "running")
+
+        job = await repo.get_job("j1")
+        assert job.status == "running"
+        assert job.payload == {"title": "Rome"}
+        assert await repo.get_job("missing") is None
+
+    async def test_upsert_keeps_asset_key(self, repo):
+        await repo.apply_batch([StatusUpdate(job_id="j1", hierarchy_id="Pr0-Ep0-Seq0-Sh0", status="ready",
+                                             asset_key="a.wav")])
+        await repo.apply_batch([StatusUpdate(job_id="j1", hierarchy_id="Pr0-Ep0-Seq0-Sh0", status="failed")])
+
+        status = (await repo.node_statuses("j1"))["Pr0-Ep0-Seq0-Sh0"]
+        assert status.status == "failed"
+        assert status.asset_key == "a.wav"
+
+    async def test_pending_drops_asset_key(self, repo):
+        await repo.apply_batch([StatusUpdate(job_id="j1", hierarchy_id="Pr0-Ep0-Seq0-Sh0", status="ready",
+                                             asset_key="a.wav")])
+        await repo.apply_batch([StatusUpdate(job_id="j1", hierarchy_id="Pr0-Ep0-Seq0-Sh0", status="pending")])
+
+        status = (await repo.node_statuses("j1"))["Pr0-Ep0-Seq0-Sh0"]
+        assert status.status == "pending"
+        assert status.asset_key is None
+
+    async def test_prune_nodes(self, repo):
+        await repo.apply_batch([
+            StatusUpdate(job_id=job_id, hierarchy_id=hid, status="pending")
+            for job_id in ("j1", "j2")
+            for hid in ("Pr0-Ep0-Seq0", "Pr0-Ep0-Seq1", "Pr0-Ep0-Seq1-Sh0")
+        ])
+        await repo.prune_nodes("j1", ["Pr0-Ep0-Seq0"])
+
+        assert list(await repo.node_statuses("j1")) == ["Pr0-Ep0-Seq0"]
+        assert len(await repo.node_statuses("j2")) == 3
+
+    async def test_outbox_is_written_with_statuses(self, repo):
+        await repo.apply_batch(
+            [StatusUpdate(job_id="j1", hierarchy_id="Pr0-Ep0-Seq0", status="running")],
+            [OutboxEvent(topic="t", payload={"a": 1})],
+        )
+        [event] = await repo.fetch_outbox()
+        assert (event.topic, event.payload) == ("t", {"a": 1})
+
+        await repo.mark_published([event.id])
+        assert await repo.fetch_outbox() == []
+
+    async def test_failed_batch_is_rolled_back(self, repo):
+        with pytest.raises(Exception):
+            await repo.apply_batch(
+                [StatusUpdate(job_id="j1", hierarchy_id="Pr0-Ep0-Seq0", status="running")],
+                [OutboxEvent.model_construct(topic=None, payload={}, created_at=0.0)],
+            )
+        assert await repo.node_statuses("j1") == {}
+
+    async def test_assets(self, repo):
+        await repo.save_asset(AssetRow(job_id="j1", hierarchy_id="Pr0-Ep0-Seq0", kind="image", key="old.png"))
+        await repo.save_asset(AssetRow(job_id="j1", hierarchy_id="Pr0-Ep0-Seq0", kind="image", key="new.png"))
+        [asset] = await repo.assets("j1")
+        assert asset.key == "new.png"
+
+
+class TestStatusBatcher:
+    async def test_coalesces_updates_per_node(self, repo):
+        batcher = StatusBatcher(repo, max_batch=100)
+        for status in ("pending", "running", "ready"):
+            for shot in range(10):
+                await batcher.submit("j1", f"Pr0-Ep0-Seq0-Sh{shot}", status, asset_key=None)
+        await batcher.submit("j1", "Pr0-Ep0-Seq0-Sh0", "ready", asset_key="a.wav")
+
+        assert await batcher.flush() == 10
+        statuses = await repo.node_statuses("j1")
+        assert {s.status for s in statuses.values()} == {"ready"}
+        assert statuses["Pr0-Ep0-Seq0-Sh0"].asset_key == "a.wav"
+
+        [event] = await repo.fetch_outbox()
+        assert event.topic == PROGRESS_TOPIC
+        assert event.payload == {"job_id": "j1", "statuses": {"ready": 10}}
+
+    async def test_pending_in_same_batch_drops_asset_key(self, repo):
+        batcher = StatusBatcher(repo)
+        await batcher.submit("j1", "Pr0-Ep0-Seq0-Sh0", "ready", asset_key="a.wav")
+        await batcher.submit("j1", "Pr0-Ep0-Seq0-Sh0", "pending")
+        await batcher.submit("j1", "Pr0-Ep0-Seq0-Sh1", "ready", asset_key="b.wav")
+        await batcher.submit("j1", "Pr0-Ep0-Seq0-Sh1", "running")
+        await batcher.flush()
+
+        statuses = await repo.node_statuses("j1")
+        assert statuses["Pr0-Ep0-Seq0-Sh0"].asset_key is None
+        assert statuses["Pr0-Ep0-Seq0-Sh1"].asset_key == "b.wav"
+
+    async def test_progress_counts_are_cumulative(self, repo):
+        batcher = StatusBatcher(repo)
+        for shot in range(4):
+            await batcher.submit("j1", f"Pr0-Ep0-Seq0-Sh{shot}", "pending")
+        await batcher.flush()
+        await batcher.submit("j1", "Pr0-Ep0-Seq0-Sh0", "ready", asset_key="a.wav")
+        await batcher.flush()
+
+        first, second = await repo.fetch_outbox()
+        assert first.payload == {"job_id": "j1", "statuses": {"pending": 4}}
+        assert second.payload == {"job_id": "j1", "statuses": {"pending": 3, "ready": 1}}
+
+    async def test_failed_periodic_flush_is_retried(self, repo, monkeypatch):
+        apply_batch = repo.apply_batch
+        calls = []
+
+        async def flaky(updates, events=(), **kwargs):
+            calls.append(len(updates))
+            if len(calls) == 1:
+                raise ConnectionError("database is down")
+            await apply_batch(updates, events, **kwargs)
+
+        monkeypatch.setattr(repo, "apply_batch", flaky)
+        async with StatusBatcher(repo, flush_interval=0.01) as batcher:
+            await batcher.submit("j1", "Pr0-Ep0-Seq0", "running")
+            while len(calls) < 2:
+                await asyncio.sleep(0.01)
+        assert batcher.failures == 1
+        assert (await repo.node_statuses("j1"))["Pr0-Ep0-Seq0"].status == "running"
+
+    async def test_flushes_when_batch_is_full(self, repo):
+        batcher = StatusBatcher(repo, max_batch=5)
+        for shot in range(12):
+            await batcher.submit("j1", f"Pr0-Ep0-Seq0-Sh{shot}", "ready")
+        assert batcher.flushes == 2
+        assert len(await repo.node_statuses("j1")) == 10
+
+    async def test_close_flushes_remaining(self, repo):
+        async with StatusBatcher(repo, flush_interval=60) as batcher:
+            await batcher.submit("j1", "Pr0-Ep0-Seq0", "running")
+        assert len(await repo.node_statuses("j1")) == 1
@@ -0,0 +1,58 @@
+"""HierarchyId parsing: legacy regex + Pydantic path vs. tokenizer + interning.
+
+Run from the ``dto`` directory::
+
+    PYTHONPATH=src python benchmarks/bench_hierarchy_id.py
+"""
+import timeit
+
+from pydantic import BaseModel, Field, create_model
+
+from scenario_dto.dto import HierarchyId, _intern, _from_values
+
+TARGET_SPEEDUP = 5.0
+IDS = [f"Pr0-Ep{e}-Seq{q}-Sh{s}" for e in range(10) for q in range(10) for s in range(10)]
+
+
+# the former Pydantic id models, one per level
+LEGACY_MODELS = [
+    create_model(t.__name__, **{name: (int, Field(ge=0)) for name in t._fields})
+    for t in HierarchyId._all_children
+]
+
+
+def legacy_parse(s: str) -> BaseModel:
+    """Previous implementation: try every compiled regex, then build a validated model."""
+    for t, model in zip(HierarchyId._all_children, LEGACY_MODELS):
+        m = t._regexp.fullmatch(s)
+        if m:
+            return model(**dict(zip(t._fields, map(int, m.groups()))))
+    raise ValueError(s)
+
+
+def cold_parse(s: str) -> HierarchyId:
+    _intern.cache_clear()
+    _from_values.cache_clear()
+    return HierarchyId.parse(s)
+
+
+def bench(fn, number: int = 5) -> float:
+    seconds = min(timeit.repeat(lambda: [fn(s) for s in IDS], number=number, repeat=5))
+    return len(IDS) * number / seconds
+
+
+def main() -> None:
+    legacy = bench(legacy_parse)
+    cold = bench(cold_parse, number=1)
+    warm = bench(HierarchyId.parse)
+    to_str = bench(lambda s: str(HierarchyId.parse(s)))
+    print(f"legacy regex + pydantic: {legacy:12.0f} ids/s")
+    print(f"tokenizer, cold cache:   {cold:12.0f} ids/s  x{cold / legacy:.1f}")
+    print(f"tokenizer, interned:     {warm:12.0f} ids/s  x{warm / legacy:.1f}")
+    print(f"interned parse + str():  {to_str:12.0f} ids/s")
+    status = "OK" if warm / legacy >= TARGET_SPEEDUP else "MISSED"
+    print(f"target x{TARGET_SPEEDUP:.0f} for repeated ids: {status}")
+
+
+if __name__ == "__main__":
+    main()
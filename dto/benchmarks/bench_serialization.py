@@ -0,0 +1,92 @@
+"""Project serialization: YAML and plain JSON vs. the JSON-lines format.
+
+Needs PyYAML for the YAML baseline. Run from the ``dto`` directory::
+
+    PYTHONPATH=src python benchmarks/bench_serialization.py
+"""
+import json
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from uuid import UUID
+
+import yaml
+
+from scenario_dto.dto import ProjectDTO
+from scenario_dto.serialization import ProjectReader, dumps_project, loads_project, write_project
+
+EPISODES, SEQUENCES, SHOTS = 5, 10, 20
+TEXT = "Рим был основан на семи холмах, и его история насчитывает более двух тысяч лет. " * 3
+
+
+def make_project() -> ProjectDTO:
+    counter = iter(range(1, 1 << 30))
+
+    def node(hid: str, **fields) -> dict:
+        return {"id": UUID(int=next(counter)), "title": f"title {hid}", "hierarchy_id": hid, **fields}
+
+    return ProjectDTO.model_validate(node(
+        "Pr0",
+        style="documentary",
+        episodes=[
+            node(f"Pr0-Ep{e}", style="calm", sequences=[
+                node(f"Pr0-Ep{e}-Seq{q}", style={"image": "forum at dawn", "music": "ambient"}, shots=[
+                    node(f"Pr0-Ep{e}-Seq{q}-Sh{s}", style={"voice": "eugene"}, text=TEXT)
+                    for s in range(SHOTS)
+                ])
+                for q in range(SEQUENCES)
+            ])
+            for e in range(EPISODES)
+        ],
+    ))
+
+
+def bench(fn, number: int = 3) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number
+
+
+def main() -> None:
+    project = make_project()
+    as_yaml = yaml.safe_dump(project.model_dump(mode="json"), allow_unicode=True, sort_keys=False)
+    as_json = project.model_dump_json()
+    as_jsonl = dumps_project(project)
+
+    rows = [
+        ("yaml", len(as_yaml.encode()),
+         bench(lambda: yaml.safe_dump(project.model_dump(mode="json"), allow_unicode=True, sort_keys=False)),
+         bench(lambda: ProjectDTO.model_validate(yaml.safe_load(as_yaml)), number=1)),
+        ("json", len(as_json.encode()),
+         bench(project.model_dump_json),
+         bench(lambda: ProjectDTO.model_validate_json(as_json))),
+        ("json-lines", len(as_jsonl),
+         bench(lambda: dumps_project(project)),
+         bench(lambda: loads_project(as_jsonl))),
+    ]
+    shots = EPISODES * SEQUENCES * SHOTS
+    print(f"project with {shots} shots")
+    print(f"{'format':<12}{'size, KiB':>12}{'dump, ms':>12}{'load, ms':>12}")
+    for name, size, dump, load in rows:
+        print(f"{name:<12}{size / 1024:12.1f}{dump * 1e3:12.2f}{load * 1e3:12.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "project.gvp"
+        write_project(project, path)
+        target = f"Pr0-Ep{EPISODES - 1}-Seq{SEQUENCES - 1}"
+
+        def lazy_sequence():
+            with ProjectReader(path) as reader:
+                return reader.sequence(target)
+
+        open_time = bench(lambda: ProjectReader(path).close())
+        lazy = bench(lazy_sequence)
+        start = time.perf_counter()
+        full = ProjectDTO.model_validate(yaml.safe_load(as_yaml))
+        yaml_sequence = time.perf_counter() - start
+        assert lazy_sequence() == full.episodes[-1].sequences[-1]
+    print(f"one sequence: yaml {yaml_sequence * 1e3:.2f} ms, "
+          f"lazy reader {lazy * 1e3:.2f} ms (scan {open_time * 1e3:.2f} ms)  x{yaml_sequence / lazy:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Structural diff and patch of storyboard projects.
+
+Nodes of two project versions are matched by hierarchy id. Node fields are
+compared flattened to dotted names (``text``, ``style.voice``, ``style.image``),
+so consumers can tell which downstream assets a change invalidates. The ``id``
+field is not compared: regenerated scenarios get fresh UUIDs for unchanged nodes.
+"""
+from __future__ import annotations
+from typing import Any, Iterable, Iterator, Literal, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+from scenario_dto.dto import HierarchyId, ProjectDTO, Storyboard
+from scenario_dto.index import ProjectIndex
+
+ChangeKind = Literal["added", "removed", "modified"]
+P = TypeVar("P", bound=ProjectDTO)
+
+# child list field per level: project -> episodes -> sequences -> shots
+_CHILDREN = ("episodes", "sequences", "shots")
+
+
+class PatchConflict(ValueError):
+    """Raised when a diff does not apply to the given project."""
+
+
+class NodeChange(BaseModel):
+    hierarchy_id: HierarchyId
+    kind: ChangeKind
+    # changed fields with their new values, flattened to dotted names;
+    # added nodes carry all their own fields, removed nodes none
+    values: dict[str, Any] = Field(default_factory=dict)
+
+    @property
+    def fields(self) -> frozenset[str]:
+        return frozenset(self.values)
+
+
+class ProjectDiff(BaseModel):
+    changes: list[NodeChange] = Field(default_factory=list)
+
+    def select(
+        self,
+        level: type[HierarchyId],
+        kinds: Iterable[ChangeKind] = ("added", "removed", "modified"),
+        fields: Optional[Iterable[str]] = None,
+    ) -> list[NodeChange]:
+        """Return changes of one level, e.g. ``ShotId``.
+
+        With ``fields`` only additions and modifications touching one of those
+        fields are returned; removals never match a field filter.
+        """
+        kinds = set(kinds)
+        wanted = None if fields is None else frozenset(fields)
+        return [
+            change
+            for change in self.changes
+            if type(change.hierarchy_id) is level
+            and change.kind in kinds
+            and (wanted is None or not wanted.isdisjoint(change.fields))
+        ]
+
+
+def _depth(hid: HierarchyId) -> int:
+    return len(hid.as_tuple()) - 1
+
+
+def _flatten(data: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    flat: dict[str, Any] = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _own_fields(node: Storyboard) -> dict[str, Any]:
+    """Return the node's own fields without children and hierarchy id, flattened."""
+    depth = _depth(node.hierarchy_id)
+    exclude = {"hierarchy_id"}
+    if depth < len(_CHILDREN):
+        exclude.add(_CHILDREN[depth])
+    return _flatten(node.model_dump(mode="json", exclude=exclude))
+
+
+def _nodes(index: ProjectIndex) -> Iterator[Storyboard]:
+    yield index.project
+    yield from index.iter_episodes()
+    yield from index.iter_sequences()
+    yield from index.iter_shots()
+
+
+def diff_projects(old: ProjectDTO, new: ProjectDTO) -> ProjectDiff:
+    """Return the changes that turn ``old`` into ``new``, ordered by hierarchy id.
+
+    Every node of an added or removed subtree is reported on its own.
+    """
+    old_index, new_index = ProjectIndex(old), ProjectIndex(new)
+    changes: list[NodeChange] = []
+    for node in _nodes(new_index):
+        hid = node.hierarchy_id
+        previous = old_index.get(hid)
+        values = _own_fields(node)
+        if previous is None:
+            changes.append(NodeChange(hierarchy_id=hid, kind="added", values=values))
+            continue
+        before = _own_fields(previous)
+        changed = {
+            name: value
+            for name, value in values.items()
+            if name != "id" and (name not in before or before[name] != value)
+        }
+        if changed:
+            changes.append(NodeChange(hierarchy_id=hid, kind="modified", values=changed))
+    for node in _nodes(old_index):
+        if node.hierarchy_id not in new_index:
+            changes.append(NodeChange(hierarchy_id=node.hierarchy_id, kind="removed"))
+    changes.sort(key=lambda change: change.hierarchy_id)
+    return ProjectDiff(changes=changes)
+
+
+def _assign(data: dict[str, Any], dotted: str, value: Any) -> None:
+    *path, last = dotted.split(".")
+    for key in path:
+        data = data.setdefault(key, {})
+    data[last] = value
+
+
+def apply_diff(project: P, diff: ProjectDiff) -> P:
+    """Return a new project with ``diff`` applied; ``project`` is left unchanged.
+
+    Raises:
+        PatchConflict: If a change targets a missing node or adds an existing one.
+    """
+    root = project.model_dump(mode="json")
+    # hierarchy id -> (node dict, the parent's child list it lives in)
+    nodes: dict[HierarchyId, tuple[dict[str, Any], Optional[list]]] = {}
+
+    def register(node: Storyboard, data: dict[str, Any], siblings: Optional[list]) -> None:
+        nodes[node.hierarchy_id] = (data, siblings)
+        depth = _depth(node.hierarchy_id)
+        if depth < len(_CHILDREN):
+            field = _CHILDREN[depth]
+            for child, child_data in zip(getattr(node, field), data[field]):
+                register(child, child_data, data[field])
+
+    register(project, root, None)
+    removed: set[HierarchyId] = set()
+
+    for change in sorted(diff.changes, key=lambda c: c.hierarchy_id):
+        hid, depth = change.hierarchy_id, _depth(change.hierarchy_id)
+        entry = nodes.get(hid)
+        if change.kind == "added":
+            parent = nodes.get(hid.parent()) if depth else None
+            if entry is not None or parent is None:
+                reason = "node already exists" if entry is not None else "parent is missing"
+                raise PatchConflict(f"Cannot add {hid}: {reason}")
+            data: dict[str, Any] = {"hierarchy_id": hid.as_dict()}
+            for name, value in change.values.items():
+                _assign(data, name, value)
+            if depth < len(_CHILDREN):
+                data[_CHILDREN[depth]] = []
+            siblings = parent[0][_CHILDREN[depth - 1]]
+            siblings.append(data)
+            siblings.sort(key=lambda child: tuple(child["hierarchy_id"].values()))
+            nodes[hid] = (data, siblings)
+        elif entry is None:
+            if change.kind == "removed" and hid in removed:
+                # reported on its own, but already gone with its parent
+                continue
+            raise PatchConflict(f"Cannot apply {change.kind} change to {hid}: node is missing")
+        elif change.kind == "removed":
+            data, siblings = entry
+            if siblings is None:
+                raise PatchConflict("Cannot remove the project itself")
+            siblings.remove(data)
+            for known in [k for k in nodes if k.as_tuple()[:depth + 1] == hid.as_tuple()]:
+                del nodes[known]
+                removed.add(known)
+        else:
+            for name, value in change.values.items():
+                _assign(entry[0], name, value)
+
+    return type(project).model_validate(root)
@@ -1,34 +1,159 @@
 from __future__ import annotations
 import abc, re
 from functools import lru_cache
-from typing import ClassVar, Pattern, List, NoReturn
-from pydantic import BaseModel, Field, field_validator
+from typing import Any, ClassVar, Pattern, List, NoReturn
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, GetJsonSchemaHandler, field_validator
+from pydantic_core import core_schema
 from uuid import UUID
 
 
-class HierarchyId(abc.ABC, BaseModel):
+class HierarchyId(abc.ABC):
+    """Immutable id of a node in the ``project -> episode -> sequence -> shot`` tree.
+
+    The numbers are packed into one tuple: ids hash natively and order like the
+    render traversal (parents before children, siblings by number). Instances are
+    interned, so equal ids are usually the same object.
+    """
+
+    __slots__ = ("_values", "_text", "_parent_id")
     _pattern_str: ClassVar[str] = ""
+    _prefix: ClassVar[str] = ""
+    _field: ClassVar[str] = ""
+    _fields: ClassVar[tuple[str, ...]] = ()
     _sep: ClassVar[str] = "-"
     _regexp: ClassVar[Pattern[str]]
-    model_config = {"extra": "forbid"}
     _all_children: ClassVar[list[type[HierarchyId]]] = []
+    # bits per level in the packed form; each level stores ``value + 1``, 0 means absent
+    _bits: ClassVar[int] = 16
+    max_value: ClassVar[int] = (1 << 16) - 2
+
+    _values: tuple[int, ...]
+    _text: str | None
+    _parent_id: HierarchyId | None
 
     def __init_subclass__(cls, **kw):
         super().__init_subclass__(**kw)
-        base = getattr(super(cls, cls), "_pattern_str", "")
+        parent = super(cls, cls)
+        base = getattr(parent, "_pattern_str", "")
         seg = cls._segment()
         cls._pattern_str = seg if not base else (base + (cls._sep + seg if seg else ""))
         cls._regexp = re.compile(rf"^{cls._pattern_str}$")
+        cls._fields = parent._fields + (cls._field,)
+
+    def __new__(cls, **fields: int) -> HierarchyId:
+        return cls._from_fields(fields)
+
+    @classmethod
+    def _from_fields(cls, fields: dict[str, int]) -> HierarchyId:
+        values = tuple(fields.values())
+        # fast path: fields in canonical order, all plain ints in range
+        if (
+            values
+            and tuple(fields) == cls._fields
+            and all(type(value) is int for value in values)
+            and 0 <= min(values)
+            and max(values) <= cls.max_value
+        ):
+            return _from_values(values)
+        if cls is HierarchyId or fields.keys() != set(cls._fields):
+            raise ValueError(
+                f"{cls.__name__} expects fields {list(cls._fields)}, got {list(fields)}"
+            )
+        values = tuple(fields[name] for name in cls._fields)
+        for name, value in zip(cls._fields, values):
+            if type(value) is not int or not 0 <= value <= cls.max_value:
+                raise ValueError(
+                    f"{cls.__name__}.{name} must be an int in [0, {cls.max_value}], got {value!r}"
+                )
+        return _from_values(values)
 
     @classmethod
     @abc.abstractmethod
     def _segment(cls) -> str:
         return ""
 
-    @abc.abstractmethod
+    # --- immutability, hashing and ordering ----------------------------------------
+    def __setattr__(self, name: str, value: Any) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return _from_values, (self._values,)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, HierarchyId):
+            return self._values == other._values
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._values)
+
+    def __lt__(self, other: HierarchyId) -> bool:
+        if isinstance(other, HierarchyId):
+            return self._values < other._values
+        return NotImplemented
+
+    def __le__(self, other: HierarchyId) -> bool:
+        if isinstance(other, HierarchyId):
+            return self._values <= other._values
+        return NotImplemented
+
+    def __gt__(self, other: HierarchyId) -> bool:
+        if isinstance(other, HierarchyId):
+            return self._values > other._values
+        return NotImplemented
+
+    def __ge__(self, other: HierarchyId) -> bool:
+        if isinstance(other, HierarchyId):
+            return self._values >= other._values
+        return NotImplemented
+
+    # --- representations -----------------------------------------------------------
     def __str__(self) -> str:
-        return ""
+        if self._text is None:
+            text = self._sep.join(f"{p}{v}" for p, v in zip(_PREFIXES, self._values))
+            object.__setattr__(self, "_text", text)
+        return self._text
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{n}={v}" for n, v in zip(self._fields, self._values))
+        return f"{type(self).__name__}({args})"
+
+    def as_tuple(self) -> tuple[int, ...]:
+        return self._values
+
+    def as_dict(self) -> dict[str, int]:
+        return dict(zip(self._fields, self._values))
+
+    @property
+    def packed(self) -> int:
+        """The id packed into one integer. Integer order equals id order."""
+        packed = 0
+        for level in range(len(_PREFIXES)):
+            value = self._values[level] + 1 if level < len(self._values) else 0
+            packed = (packed << self._bits) | value
+        return packed
 
+    @classmethod
+    def from_packed(cls, packed: int) -> HierarchyId:
+        mask = (1 << cls._bits) - 1
+        slots = [(packed >> (cls._bits * shift)) & mask for shift in reversed(range(len(_PREFIXES)))]
+        depth = slots.index(0) if 0 in slots else len(slots)
+        if packed >> (cls._bits * len(_PREFIXES)) or depth == 0 or any(slots[depth:]):
+            raise ValueError(f"Invalid packed {cls.__name__}: {packed}")
+        hid = _from_values(tuple(v - 1 for v in slots[:depth]))
+        if cls is not HierarchyId and type(hid) is not cls:
+            raise ValueError(f"Invalid packed {cls.__name__}: got {type(hid).__name__}")
+        return hid
+
+    def _parent(self) -> HierarchyId:
+        if self._parent_id is None:
+            object.__setattr__(self, "_parent_id", _from_values(self._values[:-1]))
+        return self._parent_id
+
+    # --- parsing -------------------------------------------------------------------
     @classmethod
     def all_descendants(cls):
         res = []
@@ -38,8 +163,15 @@ class HierarchyId(abc.ABC, BaseModel):
         return res
 
     @classmethod
-    @abc.abstractmethod
-    def from_str(cls, s: str) -> HierarchyId: ...
+    def from_str(cls, s: str) -> HierarchyId:
+        """Parse ``s`` into an instance of exactly ``cls``.
+
+        Equal strings return the same (immutable) instance.
+        """
+        hid = _intern(s)
+        if hid is None or type(hid) is not cls:
+            cls._err(s)
+        return hid
 
     @classmethod
     def _err(cls, value: str) -> NoReturn:
@@ -53,93 +185,142 @@ class HierarchyId(abc.ABC, BaseModel):
 
     @classmethod
     def parse(cls, s: str) -> HierarchyId | ValueError:
-        for t in cls._all_children:
-            if t._regexp.fullmatch(s):
-                return t.from_str(s)
-        cls._err(s)
+        hid = _intern(s)
+        if hid is None:
+            cls._err(s)
+        return hid
 
+    # --- pydantic integration --------------------------------------------------------
+    @classmethod
+    def _validate(cls, v: Any) -> HierarchyId:
+        if type(v) is cls or (cls is HierarchyId and isinstance(v, HierarchyId)):
+            return v
+        if isinstance(v, str):
+            return cls.parse(v) if cls is HierarchyId else cls.from_str(v)
+        if isinstance(v, dict):
+            if cls is not HierarchyId:
+                return cls._from_fields(v)
+            if 0 < len(v) <= len(cls._all_children):
+                # the number of fields selects the id type, as for parsed strings
+                return cls._all_children[len(v) - 1]._from_fields(v)
+        raise ValueError(f"Expected {cls.__name__} | str | dict, got {type(v).__name__}")
 
-class ProjectId(HierarchyId):
-    project: int = Field(ge=0)
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        # dumps as {"project": 0, "episode": 1, ...} like the former model-based ids
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(HierarchyId.as_dict),
+        )
 
     @classmethod
-    def _segment(cls) -> str:
-        return r"Pr(\d+)"
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler) -> dict:
+        return {
+            "title": cls.__name__,
+            "type": "object",
+            "properties": {name: {"type": "integer", "minimum": 0} for name in cls._fields},
+            "required": list(cls._fields),
+            "additionalProperties": False,
+        }
+
+
+def _tokenize(s: str) -> tuple[int, ...] | None:
+    """Split ``Pr1-Ep2-...`` into its numbers in one pass; ``None`` if malformed."""
+    parts = s.split(HierarchyId._sep)
+    if len(parts) > len(_PREFIXES):
+        return None
+    values = []
+    for part, prefix in zip(parts, _PREFIXES):
+        digits = part[len(prefix):]
+        if not part.startswith(prefix) or not digits.isdecimal():
+            return None
+        value = int(digits)
+        if value > HierarchyId.max_value:
+            return None
+        values.append(value)
+    return tuple(values)
+
+
+@lru_cache(maxsize=1 << 16)
+def _from_values(values: tuple[int, ...]) -> HierarchyId:
+    # the number of segments selects the id type; values are already validated
+    cls = HierarchyId._all_children[len(values) - 1]
+    obj = object.__new__(cls)
+    object.__setattr__(obj, "_values", values)
+    object.__setattr__(obj, "_text", None)
+    object.__setattr__(obj, "_parent_id", None)
+    return obj
+
+
+@lru_cache(maxsize=1 << 16)
+def _intern(s: str) -> HierarchyId | None:
+    values = _tokenize(s)
+    return None if values is None else _from_values(values)
 
 
+class ProjectId(HierarchyId):
+    __slots__ = ()
+    _prefix: ClassVar[str] = "Pr"
+    _field: ClassVar[str] = "project"
+
     @classmethod
-    def from_str(cls, s: str) -> ProjectId:
-        m = cls._regexp.fullmatch(s)
-        if not m: cls._err(s)
-        return cls(project=int(m.group(1)))
+    def _segment(cls) -> str:
+        return r"Pr(\d+)"
 
-    def __str__(self) -> str:
-        return f"Pr{self.project}"
+    @property
+    def project(self) -> int:
+        return self._values[0]
 
 
 class EpisodeId(ProjectId):
-    episode: int = Field(ge=0)
+    __slots__ = ()
+    _prefix: ClassVar[str] = "Ep"
+    _field: ClassVar[str] = "episode"
 
     @classmethod
     def _segment(cls) -> str:
         return r"Ep(\d+)"
 
-    @classmethod
-    def from_str(cls, s: str) -> "EpisodeId":
-        m = cls._regexp.fullmatch(s)
-        if not m: cls._err(s)
-        return cls(project=int(m.group(1)), episode=int(m.group(2)))
-
-    def __str__(self) -> str:
-        return f"{super().__str__()}{self._sep}Ep{self.episode}"
+    @property
+    def episode(self) -> int:
+        return self._values[1]
 
     def parent(self) -> ProjectId:
-        return ProjectId(project=self.project)
+        return self._parent()
 
 
 class SequenceId(EpisodeId):
-    sequence: int = Field(ge=0)
+    __slots__ = ()
+    _prefix: ClassVar[str] = "Seq"
+    _field: ClassVar[str] = "sequence"
 
     @classmethod
     def _segment(cls) -> str:
         return r"Seq(\d+)"
 
-    @classmethod
-    def from_str(cls, s: str) -> "SequenceId":
-        m = cls._regexp.fullmatch(s)
-        if not m: cls._err(s)
-        return cls(project=int(m.group(1)), episode=int(m.group(2)), sequence=int(m.group(3)))
-
-    def __str__(self) -> str:
-        return f"{super().__str__()}{self._sep}Seq{self.sequence}"
+    @property
+    def sequence(self) -> int:
+        return self._values[2]
 
     def parent(self) -> EpisodeId:
-        return EpisodeId(project=self.project, episode=self.episode)
+        return self._parent()
 
 
 class ShotId(SequenceId):
-    shot: int = Field(ge=0)
+    __slots__ = ()
+    _prefix: ClassVar[str] = "Sh"
+    _field: ClassVar[str] = "shot"
 
     @classmethod
     def _segment(cls) -> str:
         return r"Sh(\d+)"
 
-    @classmethod
-    def from_str(cls, s: str) -> "ShotId":
-        m = cls._regexp.fullmatch(s)
-        if not m: cls._err(s)
-        return cls(
-            project=int(m.group(1)),
-            episode=int(m.group(2)),
-            sequence=int(m.group(3)),
-            shot=int(m.group(4)),
-        )
-
-    def __str__(self) -> str:
-        return f"{super().__str__()}{self._sep}Sh{self.shot}"
+    @property
+    def shot(self) -> int:
+        return self._values[3]
 
     def parent(self) -> SequenceId:
-        return SequenceId(project=self.project, episode=self.episode, sequence=self.sequence)
+        return self._parent()
 
 
 class ShotStyle(BaseModel):
@@ -151,24 +332,48 @@ class SequenceStyle(BaseModel):
     music: str
 
 
+class AudioFormat(BaseModel):
+    """Audio format every stage from TTS to the final video agrees on."""
+
+    sample_rate: int = 48000
+    channels: int = Field(default=1, ge=1, le=2)
+    # audio codec and bitrate of the rendered video
+    codec: str = "aac"
+    bitrate: str = "192k"
+
+
+class RenderProfile(BaseModel):
+    fps: int = 30
+    width: int = 1920
+    height: int = 1080
+    audio: AudioFormat = Field(default_factory=AudioFormat)
+
+
 class Storyboard(abc.ABC, BaseModel):
     id: UUID
     title: str
     style: str | ShotStyle | SequenceStyle
     hierarchy_id: HierarchyId
 
+    _hid_type: ClassVar[type[HierarchyId]] = HierarchyId
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        cls._hid_type = cls.model_fields["hierarchy_id"].annotation
+
     @field_validator("hierarchy_id", mode="before")
     @classmethod
     def _coerce_hid(cls, v):
-        target = cls.model_fields["hierarchy_id"].annotation
+        target = cls._hid_type
         if type(v) is target:
             return v
-        if isinstance(v, HierarchyId):
-            raise ValueError(f"Expected {target.__name__}, got {type(v).__name__}")
+        if isinstance(v, dict):
+            return target._from_fields(v)
         if isinstance(v, str):
             return target.from_str(v.strip())
-        if isinstance(v, dict):
-            return target(**v)
+        if isinstance(v, HierarchyId):
+            raise ValueError(f"Expected {target.__name__}, got {type(v).__name__}")
         raise ValueError(f"hierarchy_id must be {target.__name__} | str | dict")
 
 
@@ -194,6 +399,8 @@ class ProjectDTO(Storyboard):
     episodes: List[EpisodeDTO]
     style: str
     hierarchy_id: ProjectId
+    render: RenderProfile = Field(default_factory=RenderProfile)
 
 
 HierarchyId._all_children = HierarchyId.all_descendants()
+_PREFIXES = tuple(t._prefix for t in HierarchyId._all_children)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+from array import array
+from typing import Iterator, Optional, Union
+
+from scenario_dto.dto import (
+    EpisodeDTO,
+    HierarchyId,
+    ProjectDTO,
+    SequenceDTO,
+    ShotDTO,
+    Storyboard,
+)
+
+NodeRef = Union[HierarchyId, str, Storyboard]
+
+
+class ProjectIndex:
+    """Flat, read-only view of a ``ProjectDTO`` for O(1) lookups by hierarchy id.
+
+    Built once per project. Episodes, sequences and shots are stored as columns
+    in render order (sorted by hierarchy id); parent links are stored as integer
+    positions into the parent column. The index does not copy the DTOs and must
+    be rebuilt if the project is modified.
+    """
+
+    def __init__(self, project: ProjectDTO):
+        self.project = project
+        self.episodes: list[EpisodeDTO] = sorted(project.episodes, key=lambda ep: ep.hierarchy_id)
+        self.sequences: list[SequenceDTO] = []
+        self.shots: list[ShotDTO] = []
+        # parent positions: sequence -> episode, shot -> sequence
+        self.sequence_episode = array("l")
+        self.shot_sequence = array("l")
+        # shots of sequence ``i`` are ``shots[sequence_shots[i]:sequence_shots[i + 1]]``
+        self.sequence_shots = array("l", [0])
+        # sequences of episode ``i`` are ``sequences[episode_sequences[i]:episode_sequences[i + 1]]``
+        self.episode_sequences = array("l", [0])
+
+        self._nodes: dict[HierarchyId, Storyboard] = {}
+        self._parents: dict[HierarchyId, Storyboard] = {}
+        self._positions: dict[HierarchyId, int] = {}
+
+        self._add(project, None, 0)
+        for ep_pos, episode in enumerate(self.episodes):
+            self._add(episode, project, ep_pos)
+            for sequence in sorted(episode.sequences, key=lambda seq: seq.hierarchy_id):
+                seq_pos = len(self.sequences)
+                self._add(sequence, episode, seq_pos)
+                self.sequences.append(sequence)
+                self.sequence_episode.append(ep_pos)
+                for shot in sorted(sequence.shots, key=lambda sh: sh.hierarchy_id):
+                    self._add(shot, sequence, len(self.shots))
+                    self.shots.append(shot)
+                    self.shot_sequence.append(seq_pos)
+                self.sequence_shots.append(len(self.shots))
+            self.episode_sequences.append(len(self.sequences))
+
+    def _add(self, node: Storyboard, parent: Optional[Storyboard], position: int) -> None:
+        hid = node.hierarchy_id
+        if hid in self._nodes:
+            raise ValueError(f"Duplicate hierarchy id {hid}")
+        if parent is not None:
+            if hid.parent() != parent.hierarchy_id:
+                raise ValueError(f"{hid} is placed under {parent.hierarchy_id}")
+            self._parents[hid] = parent
+        self._nodes[hid] = node
+        self._positions[hid] = position
+
+    @staticmethod
+    def _key(ref: NodeRef) -> HierarchyId:
+        if isinstance(ref, HierarchyId):
+            return ref
+        if isinstance(ref, Storyboard):
+            return ref.hierarchy_id
+        return HierarchyId.parse(ref)
+
+    # --- lookups -------------------------------------------------------------------
+    def __getitem__(self, ref: NodeRef) -> Storyboard:
+        return self._nodes[self._key(ref)]
+
+    def get(self, ref: NodeRef, default: Optional[Storyboard] = None) -> Optional[Storyboard]:
+        return self._nodes.get(self._key(ref), default)
+
+    def __contains__(self, ref: NodeRef) -> bool:
+        return self._key(ref) in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def parent(self, ref: NodeRef) -> Optional[Storyboard]:
+        """Return the parent node, ``None`` for the project."""
+        return self._parents.get(self._key(ref))
+
+    def position(self, ref: NodeRef) -> int:
+        """Return the render-order position of a node within its level."""
+        return self._positions[self._key(ref)]
+
+    def shots_of(self, ref: NodeRef) -> list[ShotDTO]:
+        pos = self._positions[self._key(ref)]
+        return self.shots[self.sequence_shots[pos]:self.sequence_shots[pos + 1]]
+
+    def sequences_of(self, ref: NodeRef) -> list[SequenceDTO]:
+        pos = self._positions[self._key(ref)]
+        return self.sequences[self.episode_sequences[pos]:self.episode_sequences[pos + 1]]
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return {
+            "episodes": len(self.episodes),
+            "sequences": len(self.sequences),
+            "shots": len(self.shots),
+        }
+
+    # --- traversal in render order ----------------------------------------------------
+    def iter_episodes(self) -> Iterator[EpisodeDTO]:
+        return iter(self.episodes)
+
+    def iter_sequences(self) -> Iterator[SequenceDTO]:
+        return iter(self.sequences)
+
+    def iter_shots(self) -> Iterator[ShotDTO]:
+        return iter(self.shots)
+
+    def iter_sequence_shots(self) -> Iterator[tuple[SequenceDTO, list[ShotDTO]]]:
+        """Yield every sequence together with its shots."""
+        bounds = self.sequence_shots
+        for pos, sequence in enumerate(self.sequences):
+            yield sequence, self.shots[bounds[pos]:bounds[pos + 1]]
+
+    def iter_shots_with_sequence(self) -> Iterator[tuple[ShotDTO, SequenceDTO]]:
+        sequences = self.sequences
+        for shot, seq_pos in zip(self.shots, self.shot_sequence):
+            yield shot, sequences[seq_pos]
+
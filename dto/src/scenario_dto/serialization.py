@@ -0,0 +1,232 @@
+"""JSON-lines storage format for storyboard projects.
+
+A project is written as one line per node in render order, parents before
+children::
+
+    GVP1
+    Pr0\t{"id": "...", "title": "...", "style": "..."}
+    Pr0-Ep0\t{...}
+    Pr0-Ep0-Seq0\t{...}
+    Pr0-Ep0-Seq0-Sh0\t{...}
+
+Each line starts with the node's hierarchy id, so a reader can find a subtree
+by looking at line prefixes and only decode and validate the nodes it needs.
+Child lists and the hierarchy id are not repeated inside the JSON payload.
+"""
+from __future__ import annotations
+import json
+import typing
+from pathlib import Path
+from typing import IO, Any, Generic, Iterator, Optional, TypeVar, Union
+
+from pydantic import BaseModel
+
+from scenario_dto.dto import EpisodeId, HierarchyId, ProjectDTO, SequenceId, ShotId, Storyboard
+
+MAGIC = b"GVP1"
+# child list field per level: project -> episodes -> sequences -> shots
+_CHILDREN = ("episodes", "sequences", "shots")
+
+P = TypeVar("P", bound=ProjectDTO)
+PathLike = Union[str, Path]
+
+
+def _encode(node: Storyboard, depth: int) -> bytes:
+    exclude = {"hierarchy_id"}
+    if depth < len(_CHILDREN):
+        exclude.add(_CHILDREN[depth])
+    payload = node.model_dump_json(exclude=exclude).encode("utf-8")
+    return b"%s\t%s\n" % (str(node.hierarchy_id).encode("ascii"), payload)
+
+
+def _iter_lines(node: Storyboard, depth: int = 0) -> Iterator[bytes]:
+    yield _encode(node, depth)
+    if depth < len(_CHILDREN):
+        for child in sorted(getattr(node, _CHILDREN[depth]), key=lambda c: c.hierarchy_id):
+            yield from _iter_lines(child, depth + 1)
+
+
+def dump_project(project: ProjectDTO, fp: IO[bytes]) -> None:
+    """Write ``project`` to a binary file object."""
+    fp.write(MAGIC + b"\n")
+    fp.writelines(_iter_lines(project))
+
+
+def dumps_project(project: ProjectDTO) -> bytes:
+    return b"".join([MAGIC + b"\n", *_iter_lines(project)])
+
+
+def write_project(project: ProjectDTO, path: PathLike) -> None:
+    with open(path, "wb") as fp:
+        dump_project(project, fp)
+
+
+def _split(line: bytes) -> tuple[str, bytes]:
+    hid, sep, payload = line.rstrip(b"\n").partition(b"\t")
+    if not sep:
+        raise ValueError(f"Malformed project line: {line[:80]!r}")
+    return hid.decode("ascii"), payload
+
+
+def _check_magic(line: bytes) -> None:
+    if line.rstrip(b"\n") != MAGIC:
+        raise ValueError("Not a project file: missing GVP1 header")
+
+
+def _child_model(model: type[BaseModel], field: str) -> type[BaseModel]:
+    """Return the item model of a list field, e.g. ``EpisodeEntity`` for ``episodes``."""
+    (item,) = typing.get_args(model.model_fields[field].annotation)
+    return item
+
+
+def _model_chain(project_cls: type[ProjectDTO]) -> tuple[type[BaseModel], ...]:
+    models: list[type[BaseModel]] = [project_cls]
+    for field in _CHILDREN:
+        models.append(_child_model(models[-1], field))
+    return tuple(models)
+
+
+def _assemble(entries: list[tuple[str, bytes]]) -> dict[str, Any]:
+    """Rebuild a nested dict from the lines of one subtree, first line is the root."""
+    root: Optional[dict[str, Any]] = None
+    stack: list[dict[str, Any]] = []
+    root_depth = 0
+    for hid, payload in entries:
+        depth = hid.count(HierarchyId._sep)
+        if depth > len(_CHILDREN):
+            raise ValueError(f"Malformed hierarchy id {hid}")
+        data = json.loads(payload)
+        data["hierarchy_id"] = hid
+        if depth < len(_CHILDREN):
+            data[_CHILDREN[depth]] = []
+        if root is None:
+            root, root_depth = data, depth
+        else:
+            level = depth - root_depth
+            parent = hid.rpartition(HierarchyId._sep)[0]
+            if not 0 < level <= len(stack) or stack[level - 1]["hierarchy_id"] != parent:
+                raise ValueError(f"{hid} is not preceded by its parent")
+            del stack[level:]
+            stack[-1][_CHILDREN[depth - 1]].append(data)
+        stack.append(data)
+    if root is None:
+        raise ValueError("Empty project data")
+    return root
+
+
+def loads_project(data: bytes, cls: type[P] = ProjectDTO) -> P:
+    """Decode and validate a whole project."""
+    lines = data.splitlines()
+    if not lines:
+        raise ValueError("Empty project data")
+    _check_magic(lines[0])
+    return cls.model_validate(_assemble([_split(line) for line in lines[1:] if line]))
+
+
+def read_project(path: PathLike, cls: type[P] = ProjectDTO) -> P:
+    return loads_project(Path(path).read_bytes(), cls)
+
+
+class ProjectReader(Generic[P]):
+    """Lazy reader of a project file.
+
+    Only line prefixes are scanned when the file is opened; nodes are decoded
+    and validated when requested, one subtree at a time::
+
+        with ProjectReader("project.gvp", ProjectEntity) as reader:
+            sequence = reader.sequence("Pr0-Ep1-Seq2")
+    """
+
+    def __init__(self, path: PathLike, cls: type[P] = ProjectDTO):
+        self._fp: IO[bytes] = open(path, "rb")
+        self._models = _model_chain(cls)
+        # hierarchy id -> (offset of the node line, offset after its subtree)
+        self._spans: dict[HierarchyId, tuple[int, int]] = {}
+        try:
+            self._scan()
+        except Exception:
+            self._fp.close()
+            raise
+
+    def _scan(self) -> None:
+        _check_magic(self._fp.readline())
+        open_nodes: list[tuple[HierarchyId, int]] = []
+        offset = self._fp.tell()
+        for line in self._fp:
+            hid = HierarchyId.parse(_split(line)[0])
+            depth = len(hid.as_tuple()) - 1
+            while len(open_nodes) > depth:
+                done, start = open_nodes.pop()
+                self._spans[done] = (start, offset)
+            if not depth and self._spans:
+                raise ValueError(f"More than one project root: {hid}")
+            if len(open_nodes) != depth or (depth and open_nodes[-1][0] != hid.parent()):
+                raise ValueError(f"{hid} is not preceded by its parent")
+            if hid in self._spans:
+                raise ValueError(f"Duplicate hierarchy id {hid}")
+            # registered on open to keep render order, the end is filled in on close
+            self._spans[hid] = (offset, offset)
+            open_nodes.append((hid, offset))
+            offset += len(line)
+        for done, start in open_nodes:
+            self._spans[done] = (start, offset)
+        if not self._spans:
+            raise ValueError("Empty project data")
+
+    def close(self) -> None:
+        self._fp.close()
+
+    def __enter__(self) -> ProjectReader[P]:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __contains__(self, hierarchy_id: Union[HierarchyId, str]) -> bool:
+        return self._key(hierarchy_id) in self._spans
+
+    def ids(self) -> list[HierarchyId]:
+        """Return all hierarchy ids in render order without decoding any node."""
+        return list(self._spans)
+
+    @staticmethod
+    def _key(hierarchy_id: Union[HierarchyId, str]) -> HierarchyId:
+        return hierarchy_id if isinstance(hierarchy_id, HierarchyId) else HierarchyId.parse(hierarchy_id)
+
+    def _entries(self, hid: HierarchyId) -> list[tuple[str, bytes]]:
+        start, stop = self._spans[hid]
+        self._fp.seek(start)
+        return [_split(line) for line in self._fp.read(stop - start).splitlines()]
+
+    def node(self, hierarchy_id: Union[HierarchyId, str]) -> Storyboard:
+        """Validate and return a node together with its whole subtree."""
+        hid = self._key(hierarchy_id)
+        model = self._models[len(hid.as_tuple()) - 1]
+        return model.model_validate(_assemble(self._entries(hid)))
+
+    def project(self) -> P:
+        return self.node(next(iter(self._spans)))
+
+    def _typed(self, hierarchy_id: Union[HierarchyId, str], expected: type[HierarchyId]) -> Storyboard:
+        hid = self._key(hierarchy_id)
+        if type(hid) is not expected:
+            raise ValueError(f"Expected {expected.__name__}, got {type(hid).__name__}")
+        return self.node(hid)
+
+    def episode(self, hierarchy_id: Union[HierarchyId, str]) -> Storyboard:
+        return self._typed(hierarchy_id, EpisodeId)
+
+    def sequence(self, hierarchy_id: Union[HierarchyId, str]) -> Storyboard:
+        return self._typed(hierarchy_id, SequenceId)
+
+    def shot(self, hierarchy_id: Union[HierarchyId, str]) -> Storyboard:
+        return self._typed(hierarchy_id, ShotId)
+
+    def iter_level(self, depth: int) -> Iterator[Storyboard]:
+        """Yield nodes of one level (1 episodes, 2 sequences, 3 shots) in render order."""
+        for hid in self._spans:
+            if len(hid.as_tuple()) - 1 == depth:
+                yield self.node(hid)
+
+    def iter_sequences(self) -> Iterator[Storyboard]:
+        return self.iter_level(2)
@@ -0,0 +1,100 @@
+# tests/test_diff.py
+import pytest
+from uuid import UUID
+
+from scenario_dto.dto import EpisodeId, ProjectDTO, SequenceId, ShotId
+from scenario_dto.diff import PatchConflict, ProjectDiff, apply_diff, diff_projects
+
+
+def _project(sequences: int = 2, shots: int = 2) -> ProjectDTO:
+    def node(hid: str, **fields) -> dict:
+        return {"id": UUID(int=len(hid)), "title": hid, "hierarchy_id": hid, **fields}
+
+    return ProjectDTO.model_validate(node(
+        "Pr0",
+        style="documentary",
+        episodes=[node("Pr0-Ep0", style="calm", sequences=[
+            node(f"Pr0-Ep0-Seq{q}", style={"image": "rome", "music": "ambient"}, shots=[
+                node(f"Pr0-Ep0-Seq{q}-Sh{s}", style={"voice": "calm"}, text=f"text {s}")
+                for s in range(shots)
+            ])
+            for q in range(sequences)
+        ])],
+    ))
+
+
+def _kinds(diff: ProjectDiff) -> list[tuple[str, str]]:
+    return [(str(c.hierarchy_id), c.kind) for c in diff.changes]
+
+
+# ---------- Diff --------------------------------------------------------------
+class TestDiffProjects:
+    def test_identical(self):
+        assert diff_projects(_project(), _project()).changes == []
+
+    def test_ignores_uuid(self):
+        new = _project()
+        new.episodes[0].sequences[0].shots[0].id = UUID(int=999)
+        assert diff_projects(_project(), new).changes == []
+
+    def test_modified_fields(self):
+        new = _project()
+        seq = new.episodes[0].sequences[1]
+        seq.style.image = "carthage"
+        seq.shots[0].text = "new text"
+        seq.shots[1].style.voice = "baya"
+        diff = diff_projects(_project(), new)
+        assert [(str(c.hierarchy_id), c.values) for c in diff.changes] == [
+            ("Pr0-Ep0-Seq1", {"style.image": "carthage"}),
+            ("Pr0-Ep0-Seq1-Sh0", {"text": "new text"}),
+            ("Pr0-Ep0-Seq1-Sh1", {"style.voice": "baya"}),
+        ]
+        assert [str(c.hierarchy_id) for c in diff.select(ShotId, fields={"text"})] == ["Pr0-Ep0-Seq1-Sh0"]
+        assert [str(c.hierarchy_id) for c in diff.select(SequenceId, fields={"style.image"})] == ["Pr0-Ep0-Seq1"]
+
+    def test_added_and_removed_subtrees(self):
+        diff = diff_projects(_project(sequences=2, shots=2), _project(sequences=1, shots=3))
+        assert _kinds(diff) == [
+            ("Pr0-Ep0-Seq0-Sh2", "added"),
+            ("Pr0-Ep0-Seq1", "removed"),
+            ("Pr0-Ep0-Seq1-Sh0", "removed"),
+            ("Pr0-Ep0-Seq1-Sh1", "removed"),
+        ]
+        assert diff.select(EpisodeId) == []
+        assert diff.select(ShotId, kinds=["added"])[0].values["text"] == "text 2"
+
+    def test_serializable(self):
+        new = _project(shots=3)
+        new.episodes[0].sequences[0].shots[0].text = "x"
+        diff = diff_projects(_project(), new)
+        assert ProjectDiff.model_validate(diff.model_dump(mode="json")) == diff
+
+
+# ---------- Patch -------------------------------------------------------------
+class TestApplyDiff:
+    @pytest.mark.parametrize("old_shape,new_shape", [
+        ((2, 2), (2, 2)),
+        ((2, 2), (1, 3)),
+        ((1, 1), (3, 2)),
+    ])
+    def test_roundtrip(self, old_shape, new_shape):
+        old, new = _project(*old_shape), _project(*new_shape)
+        new.episodes[0].sequences[0].style.music = "drums"
+        new.episodes[0].sequences[0].shots[0].text = "changed"
+        patched = apply_diff(old, diff_projects(old, new))
+        assert diff_projects(patched, new).changes == []
+        assert patched == new
+
+    def test_does_not_mutate_input(self):
+        old, new = _project(), _project(sequences=1)
+        apply_diff(old, diff_projects(old, new))
+        assert old == _project()
+
+    def test_conflicts(self):
+        old, new = _project(sequences=1), _project(sequences=2)
+        diff = diff_projects(old, new)
+        patched = apply_diff(old, diff)
+        with pytest.raises(PatchConflict, match="already exists"):
+            apply_diff(patched, diff)
+        with pytest.raises(PatchConflict, match="node is missing"):
+            apply_diff(old, diff_projects(new, old))
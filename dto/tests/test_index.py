@@ -0,0 +1,117 @@
+# tests/test_index.py
+import pytest
+from uuid import UUID
+
+from scenario_dto.dto import ProjectDTO, SequenceId, ShotId
+from scenario_dto.index import ProjectIndex
+
+
+def _project(episodes: int = 2, sequences: int = 2, shots: int = 3, reverse: bool = False) -> ProjectDTO:
+    def order(n):
+        return reversed(range(n)) if reverse else range(n)
+
+    def node(hid: str, **fields) -> dict:
+        return {"id": UUID(int=len(hid)), "title": hid, "hierarchy_id": hid, **fields}
+
+    return ProjectDTO.model_validate(node(
+        "Pr0",
+        style="documentary",
+        episodes=[
+            node(
+                f"Pr0-Ep{e}",
+                style="calm",
+                sequences=[
+                    node(
+                        f"Pr0-Ep{e}-Seq{q}",
+                        style={"image": "rome", "music": "ambient"},
+                        shots=[
+                            node(f"Pr0-Ep{e}-Seq{q}-Sh{s}", style={"voice": "calm"}, text=f"text {s}")
+                            for s in order(shots)
+                        ],
+                    )
+                    for q in order(sequences)
+                ],
+            )
+            for e in order(episodes)
+        ],
+    ))
+
+
+# ---------- Lookup ------------------------------------------------------------
+class TestProjectIndexLookup:
+    def test_counts(self):
+        index = ProjectIndex(_project())
+        assert index.counts == {"episodes": 2, "sequences": 4, "shots": 12}
+        assert len(index) == 1 + 2 + 4 + 12
+
+    @pytest.mark.parametrize("ref", ["Pr0-Ep1-Seq0-Sh2", ShotId.from_str("Pr0-Ep1-Seq0-Sh2")])
+    def test_getitem_by_id_or_str(self, ref):
+        shot = ProjectIndex(_project())[ref]
+        assert str(shot.hierarchy_id) == "Pr0-Ep1-Seq0-Sh2"
+        assert shot.text == "text 2"
+
+    def test_missing(self):
+        index = ProjectIndex(_project())
+        assert "Pr0-Ep5" not in index
+        assert index.get("Pr0-Ep5") is None
+        with pytest.raises(KeyError):
+            index["Pr0-Ep5"]
+
+    def test_parent(self):
+        project = _project()
+        index = ProjectIndex(project)
+        shot = index["Pr0-Ep1-Seq1-Sh0"]
+        sequence = index.parent(shot)
+        assert sequence.hierarchy_id == SequenceId.from_str("Pr0-Ep1-Seq1")
+        assert index.parent(index.parent(sequence)) is project
+        assert index.parent(project) is None
+
+    def test_children(self):
+        index = ProjectIndex(_project())
+        assert [str(s.hierarchy_id) for s in index.shots_of("Pr0-Ep0-Seq1")] == [
+            "Pr0-Ep0-Seq1-Sh0", "Pr0-Ep0-Seq1-Sh1", "Pr0-Ep0-Seq1-Sh2",
+        ]
+        assert [str(s.hierarchy_id) for s in index.sequences_of("Pr0-Ep1")] == ["Pr0-Ep1-Seq0", "Pr0-Ep1-Seq1"]
+        assert list(index.episode_sequences) == [0, 2, 4]
+
+
+# ---------- Render order ------------------------------------------------------
+class TestProjectIndexOrder:
+    def test_shots_sorted_by_hierarchy_id(self):
+        index = ProjectIndex(_project(reverse=True))
+        ids = [shot.hierarchy_id for shot in index.iter_shots()]
+        assert ids == sorted(ids)
+        assert index.position("Pr0-Ep0-Seq0-Sh0") == 0
+        assert index.position("Pr0-Ep1-Seq1-Sh2") == 11
+
+    def test_iter_sequence_shots(self):
+        index = ProjectIndex(_project(episodes=1, sequences=2, shots=2))
+        assert [
+            (str(seq.hierarchy_id), [str(s.hierarchy_id) for s in shots])
+            for seq, shots in index.iter_sequence_shots()
+        ] == [
+            ("Pr0-Ep0-Seq0", ["Pr0-Ep0-Seq0-Sh0", "Pr0-Ep0-Seq0-Sh1"]),
+            ("Pr0-Ep0-Seq1", ["Pr0-Ep0-Seq1-Sh0", "Pr0-Ep0-Seq1-Sh1"]),
+        ]
+
+    def test_iter_shots_with_sequence(self):
+        index = ProjectIndex(_project())
+        for shot, sequence in index.iter_shots_with_sequence():
+            assert shot.hierarchy_id.parent() == sequence.hierarchy_id
+
+
+# ---------- Validation --------------------------------------------------------
+class TestProjectIndexValidation:
+    def test_duplicate_ids(self):
+        project = _project(episodes=1, sequences=1, shots=2)
+        shots = project.episodes[0].sequences[0].shots
+        shots.append(shots[0])
+        with pytest.raises(ValueError, match="Duplicate hierarchy id"):
+            ProjectIndex(project)
+
+    def test_misplaced_node(self):
+        project = _project(episodes=1, sequences=2, shots=1)
+        seq0, seq1 = project.episodes[0].sequences
+        seq0.shots.extend(seq1.shots)
+        with pytest.raises(ValueError, match="is placed under"):
+            ProjectIndex(project)
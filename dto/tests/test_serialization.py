@@ -0,0 +1,145 @@
+# tests/test_serialization.py
+import pytest
+from uuid import UUID
+
+from scenario_dto.dto import ProjectDTO, SequenceDTO, ShotDTO, EpisodeDTO
+from scenario_dto.serialization import (
+    ProjectReader,
+    dumps_project,
+    loads_project,
+    read_project,
+    write_project,
+)
+
+
+def _project(episodes: int = 2, sequences: int = 2, shots: int = 2) -> ProjectDTO:
+    def node(hid: str, **fields) -> dict:
+        return {"id": UUID(int=len(hid)), "title": f"«{hid}»", "hierarchy_id": hid, **fields}
+
+    return ProjectDTO.model_validate(node(
+        "Pr0",
+        style="documentary",
+        episodes=[
+            node(f"Pr0-Ep{e}", style="calm", sequences=[
+                node(f"Pr0-Ep{e}-Seq{q}", style={"image": "rome", "music": "ambient"}, shots=[
+                    node(f"Pr0-Ep{e}-Seq{q}-Sh{s}", style={"voice": "calm"}, text=f"Текст {s}\tи\nещё")
+                    for s in range(shots)
+                ])
+                for q in range(sequences)
+            ])
+            for e in range(episodes)
+        ],
+    ))
+
+
+# ---------- Full round trip ---------------------------------------------------
+class TestRoundTrip:
+    def test_bytes(self):
+        project = _project()
+        assert loads_project(dumps_project(project)) == project
+
+    def test_file(self, tmp_path):
+        project = _project()
+        path = tmp_path / "project.gvp"
+        write_project(project, path)
+        assert read_project(path) == project
+
+    def test_one_line_per_node(self):
+        lines = dumps_project(_project()).splitlines()
+        assert lines[0] == b"GVP1"
+        assert [line.split(b"\t", 1)[0] for line in lines[1:4]] == [b"Pr0", b"Pr0-Ep0", b"Pr0-Ep0-Seq0"]
+        assert len(lines) == 1 + 1 + 2 + 4 + 8
+
+    def test_render_profile(self):
+        project = _project()
+        project.render.audio.sample_rate = 24000
+        project.render.audio.channels = 2
+        loaded = loads_project(dumps_project(project))
+        assert loaded.render.audio.sample_rate == 24000 and loaded.render.audio.channels == 2
+
+    def test_render_profile_defaults_for_older_files(self):
+        data = dumps_project(_project()).replace(b',"render":', b',"_":')
+        assert loads_project(data).render.audio.sample_rate == 48000
+
+    def test_subclass_models(self):
+        class Project(ProjectDTO):
+            pass
+
+        loaded = loads_project(dumps_project(_project()), Project)
+        assert type(loaded) is Project
+
+    @pytest.mark.parametrize("data", [
+        b"",
+        b"GVP0\n",
+        b"GVP1\nPr0 {}\n",
+        # a second root, a skipped level, a node under the wrong parent, too deep
+        b"GVP1\nPr0\t{}\nPr0-Ep0\t{}\nPr1\t{}\n",
+        b"GVP1\nPr0\t{}\nPr0-Ep0-Seq0\t{}\n",
+        b"GVP1\nPr0\t{}\nPr0-Ep0\t{}\nPr0-Ep1-Seq0\t{}\n",
+        b"GVP1\nPr0\t{}\nPr0-Ep0\t{}\nPr0-Ep0-Seq0\t{}\nPr0-Ep0-Seq0-Sh0\t{}\nPr0-Ep0-Seq0-Sh0-Sh0\t{}\n",
+    ])
+    def test_malformed(self, data):
+        with pytest.raises(ValueError):
+            loads_project(data)
+
+
+# ---------- Lazy reader -------------------------------------------------------
+class TestProjectReader:
+    @pytest.fixture
+    def path(self, tmp_path):
+        path = tmp_path / "project.gvp"
+        write_project(_project(), path)
+        return path
+
+    def test_ids_in_render_order(self, path):
+        with ProjectReader(path) as reader:
+            ids = reader.ids()
+        assert str(ids[0]) == "Pr0"
+        assert ids == sorted(ids)
+        assert len(ids) == 15
+
+    def test_sequence_on_demand(self, path):
+        expected = _project().episodes[1].sequences[0]
+        with ProjectReader(path) as reader:
+            sequence = reader.sequence("Pr0-Ep1-Seq0")
+        assert isinstance(sequence, SequenceDTO)
+        assert sequence == expected
+
+    def test_episode_and_shot(self, path):
+        expected = _project().episodes[0]
+        with ProjectReader(path) as reader:
+            episode = reader.episode("Pr0-Ep0")
+            shot = reader.shot("Pr0-Ep0-Seq1-Sh1")
+            assert reader.project() == _project()
+        assert isinstance(episode, EpisodeDTO) and episode == expected
+        assert isinstance(shot, ShotDTO) and shot == expected.sequences[1].shots[1]
+
+    def test_does_not_decode_other_nodes(self, tmp_path):
+        data = dumps_project(_project()).replace(
+            b"Pr0-Ep0-Seq0-Sh0\t{", b"Pr0-Ep0-Seq0-Sh0\t{broken"
+        )
+        path = tmp_path / "project.gvp"
+        path.write_bytes(data)
+        with ProjectReader(path) as reader:
+            assert reader.sequence("Pr0-Ep1-Seq1").hierarchy_id.sequence == 1
+            with pytest.raises(ValueError):
+                reader.sequence("Pr0-Ep0-Seq0")
+
+    def test_wrong_level(self, path):
+        with ProjectReader(path) as reader:
+            with pytest.raises(ValueError, match="Expected SequenceId, got EpisodeId"):
+                reader.sequence("Pr0-Ep0")
+            with pytest.raises(KeyError):
+                reader.sequence("Pr0-Ep9-Seq0")
+
+    def test_orphan_node(self, tmp_path):
+        path = tmp_path / "project.gvp"
+        path.write_bytes(b'GVP1\nPr0\t{}\nPr0-Ep0-Seq0\t{}\n')
+        with pytest.raises(ValueError, match="not preceded by its parent"):
+            ProjectReader(path)
+
+    def test_second_root(self, tmp_path):
+        path = tmp_path / "project.gvp"
+        path.write_bytes(b'GVP1\nPr0\t{}\nPr0-Ep0\t{}\nPr1\t{}\nPr1-Ep0\t{}\n')
+        with pytest.raises(ValueError, match="More than one project root"):
+            ProjectReader(path)
@@ -278,3 +278,106 @@ class TestProjectDTO:
                          episodes=[], hierarchy_id=ProjectId.from_str("Pr9"))
         assert dto.model_dump()["hierarchy_id"] == {"project": 9}
 
+
+
+# ---------- Fast path / interning ---------------------------------------------
+class TestHierarchyIdInterning:
+    def test_same_string_same_instance(self):
+        assert HierarchyId.parse("Pr7-Ep1-Seq2-Sh3") is ShotId.from_str("Pr7-Ep1-Seq2-Sh3")
+
+    def test_parent_is_cached_and_interned(self):
+        sh = ShotId.from_str("Pr7-Ep1-Seq2-Sh3")
+        assert sh.parent() is sh.parent()
+        assert sh.parent() is SequenceId.from_str("Pr7-Ep1-Seq2")
+        assert sh.parent().parent().parent() is ProjectId.from_str("Pr7")
+
+    def test_interned_ids_are_immutable(self):
+        sh = ShotId.from_str("Pr7-Ep1-Seq2-Sh3")
+        with pytest.raises(AttributeError):
+            sh.shot = 4  # type: ignore[misc]
+        assert str(ShotId.from_str("Pr7-Ep1-Seq2-Sh3")) == "Pr7-Ep1-Seq2-Sh3"
+
+    def test_constructor_is_interned(self):
+        parsed = ShotId.from_str("Pr7-Ep1-Seq2-Sh3")
+        built = ShotId(project=7, episode=1, sequence=2, shot=3)
+        assert parsed == built
+        assert hash(parsed) == hash(built)
+        assert parsed is built
+        assert parsed.as_dict() == {"project": 7, "episode": 1, "sequence": 2, "shot": 3}
+
+    @pytest.mark.parametrize("s", ["Pr1-", "-Pr1", "Pr1-Ep2-Seq3-Sh4-Sh5", "Pr1--Ep2", "Pr+1", "Pr 1"])
+    def test_malformed(self, s):
+        with pytest.raises(ValueError):
+            HierarchyId.parse(s)
+
+
+# ---------- Compact ids: hashing, ordering, packing ----------------------------
+class TestHierarchyIdCompact:
+    def test_usable_as_dict_key(self):
+        assets = {ShotId.from_str("Pr0-Ep0-Seq0-Sh1"): "a.wav"}
+        assert assets[ShotId(project=0, episode=0, sequence=0, shot=1)] == "a.wav"
+        assert ShotId.from_str("Pr0-Ep0-Seq0-Sh1") != SequenceId.from_str("Pr0-Ep0-Seq0")
+
+    def test_render_order(self):
+        ids = [HierarchyId.parse(s) for s in [
+            "Pr0-Ep1", "Pr0-Ep0-Seq1", "Pr0-Ep0-Seq0-Sh10", "Pr0-Ep0-Seq0-Sh2", "Pr0-Ep0-Seq0", "Pr0",
+        ]]
+        assert [str(i) for i in sorted(ids)] == [
+            "Pr0", "Pr0-Ep0-Seq0", "Pr0-Ep0-Seq0-Sh2", "Pr0-Ep0-Seq0-Sh10", "Pr0-Ep0-Seq1", "Pr0-Ep1",
+        ]
+
+    @pytest.mark.parametrize("s", ["Pr0", "Pr3-Ep0", "Pr1-Ep2-Seq3", "Pr65534-Ep0-Seq0-Sh65534"])
+    def test_packed_roundtrip(self, s):
+        hid = HierarchyId.parse(s)
+        assert HierarchyId.from_packed(hid.packed) is hid
+        assert type(hid).from_packed(hid.packed) is hid
+
+    def test_packed_order_matches_id_order(self):
+        ids = sorted(HierarchyId.parse(s) for s in ["Pr0-Ep0-Seq5", "Pr0-Ep1", "Pr0-Ep0", "Pr0-Ep0-Seq0-Sh9"])
+        assert sorted(ids, key=lambda i: i.packed) == ids
+
+    @pytest.mark.parametrize("packed", [0, 1, 1 << 64, (1 << 48) | 1])
+    def test_packed_invalid(self, packed):
+        with pytest.raises(ValueError):
+            HierarchyId.from_packed(packed)
+
+    def test_packed_wrong_type(self):
+        with pytest.raises(ValueError):
+            ShotId.from_packed(SequenceId.from_str("Pr0-Ep0-Seq0").packed)
+
+    @pytest.mark.parametrize("fields", [
+        {"project": -1},
+        {"project": 65535},
+        {"project": "1"},
+        {"project": 1, "episode": 1},
+        {},
+    ])
+    def test_constructor_validation(self, fields):
+        with pytest.raises(ValueError):
+            ProjectId(**fields)
+
+    def test_json_roundtrip(self):
+        dto = ShotDTO(id=UUID(int=1), title="t", style=ShotStyle(voice="s"), text="x",
+                      hierarchy_id="Pr1-Ep2-Seq3-Sh4")
+        data = dto.model_dump_json()
+        assert '"hierarchy_id":{"project":1,"episode":2,"sequence":3,"shot":4}' in data
+        assert ShotDTO.model_validate_json(data) == dto
+
+    def test_pickle(self):
+        import pickle
+        hid = ShotId.from_str("Pr1-Ep2-Seq3-Sh4")
+        assert pickle.loads(pickle.dumps(hid)) is hid
+
+
+# ---------- Dict ids -----------------------------------------------------------
+class TestDictIds:
+    def test_validated_dict_ids_still_checked(self):
+        # fields out of order are fine, bools and wrong levels are not
+        assert ShotDTO(id=UUID(int=5), title="t", style=ShotStyle(voice="v"), text="x",
+                       hierarchy_id={"shot": 3, "sequence": 2, "episode": 1, "project": 0}
+                       ).hierarchy_id == ShotId.from_str("Pr0-Ep1-Seq2-Sh3")
+        for wrong in ({"project": 0, "episode": 1, "sequence": 2, "shot": True},
+                      {"project": 0, "episode": 1, "sequence": 2}):
+            with pytest.raises(ValidationError):
+                ShotDTO(id=UUID(int=6), title="t", style=ShotStyle(voice="v"), text="x",
+                        hierarchy_id=wrong)
@@ -0,0 +1,42 @@
+"""Images per minute of the resident Stable Diffusion worker, per profile.
+
+Needs ``torch`` and ``diffusers``. The ``tiny`` profile uses a random-weight
+test model and runs on CPU in seconds. Run from the ``image_service`` directory::
+
+    PYTHONPATH=src python benchmarks/bench_stable_diffusion.py tiny turbo
+"""
+import sys
+import time
+
+from stable_diffusion.worker import DiffusionWorker
+
+PROMPTS = [f"Roman forum, scene {i}, documentary still" for i in range(8)]
+
+
+def bench(profile: str, max_batch: int) -> None:
+    started = time.perf_counter()
+    with DiffusionWorker(profile, max_batch=max_batch, batch_window=0.1) as worker:
+        load = time.perf_counter() - started
+        worker.submit("warmup").result()
+
+        started = time.perf_counter()
+        for prompt in PROMPTS:
+            worker.submit(prompt).result()
+        sequential = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for future in [worker.submit(prompt) for prompt in PROMPTS]:
+            future.result()
+        batched = time.perf_counter() - started
+
+    per_minute = 60 * len(PROMPTS)
+    print(
+        f"{profile:8} batch={max_batch}  load {load:6.1f} s  "
+        f"sequential {per_minute / sequential:7.1f} img/min  "
+        f"batched {per_minute / batched:7.1f} img/min"
+    )
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or ["tiny"]:
+        bench(name, max_batch=4)
@@ -0,0 +1,40 @@
+"""Latency and peak memory of the tiled upscale stage per tile size.
+
+Each tile size runs in a fresh process so peak RSS is not shared. Run from the
+``image_service`` directory::
+
+    PYTHONPATH=src python benchmarks/bench_upscale.py
+"""
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from image_jobs.upscale import UpscaleStage
+
+TILES = [64, 128, 256, 512, 1024]
+DRAFT = 512
+REPEAT = 3
+
+
+def run(tile: int) -> tuple[float, float]:
+    rng = np.random.default_rng(0)
+    draft = Image.fromarray(rng.integers(0, 255, (DRAFT, DRAFT, 3), dtype=np.uint8))
+    with UpscaleStage(tile=tile) as stage:
+        stage.process(draft)
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            stage.process(draft)
+        elapsed = (time.perf_counter() - started) / REPEAT
+    # ru_maxrss is in kilobytes on Linux
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    print(f"{DRAFT}x{DRAFT} draft -> 1080p, lanczos x2")
+    for tile in TILES:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            elapsed, peak = pool.submit(run, tile).result()
+        print(f"tile {tile:5}  {elapsed * 1000:8.1f} ms/image  peak RSS {peak:7.1f} MiB")
@@ -0,0 +1,134 @@
+"""Content-addressed image cache kept in the asset store and on local disk.
+
+Images are keyed by the hash of the normalized prompt and the generation
+settings, so a prompt that was already rendered for any project is served
+from storage instead of the image API.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import unicodedata
+from pathlib import Path
+from typing import Optional, Protocol, Union
+
+from botocore.exceptions import ClientError
+
+CACHE_PREFIX = "cache/images"
+
+# images are passed around as buffers, so slices and encoder output need no copies
+Buffer = Union[bytes, bytearray, memoryview]
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s.,;:!?…]+$")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, unicode forms, whitespace and trailing punctuation of ``prompt``."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = _SPACES.sub(" ", text).strip()
+    return _TRAILING.sub("", text)
+
+
+def prompt_hash(prompt: str, *, model: str, size: str, quality: Optional[str], output_format: str) -> str:
+    raw = "\x1f".join([model, size, quality or "", output_format, normalize_prompt(prompt)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_key(digest: str, variant: int, output_format: str) -> str:
+    """Asset store key of ``variant`` of the image with ``digest``."""
+    return f"{CACHE_PREFIX}/{digest[:2]}/{digest}/{variant}.{output_format}"
+
+
+class ImageCache(Protocol):
+    async def get(self, key: str) -> Optional[Buffer]: ...
+
+    async def put(self, key: str, data: Buffer) -> None: ...
+
+
+class MemoryImageCache:
+    """Process-local cache, used in tests and for one-off runs."""
+
+    def __init__(self):
+        self.items: dict[str, Buffer] = {}
+
+    async def get(self, key: str) -> Optional[Buffer]:
+        return self.items.get(key)
+
+    async def put(self, key: str, data: Buffer) -> None:
+        self.items[key] = data
+
+
+class LocalImageCache:
+    """Cache in a local directory shared by all workers of the host.
+
+    Files are written to a temporary name and renamed, so concurrent readers
+    never see a partial image.
+    """
+
+    def __init__(self, root: Union[str, Path, None] = None):
+        self.root = Path(root or os.getenv("IMAGE_CACHE_DIR", ".image_cache"))
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, data: Buffer) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{id(data):x}")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def put(self, key: str, data: Buffer) -> None:
+        await asyncio.to_thread(self._write, key, data)
+
+
+class TieredImageCache:
+    """Local cache in front of the asset store.
+
+    Writes go to both in one pass over the same buffer; remote hits are copied
+    to the local cache.
+    """
+
+    def __init__(self, local: ImageCache, remote: ImageCache):
+        self.local = local
+        self.remote = remote
+
+    async def get(self, key: str) -> Optional[Buffer]:
+        data = await self.local.get(key)
+        if data is None:
+            data = await self.remote.get(key)
+            if data is not None:
+                await self.local.put(key, data)
+        return data
+
+    async def put(self, key: str, data: Buffer) -> None:
+        await asyncio.gather(self.local.put(key, data), self.remote.put(key, data))
+
+
+class AssetImageCache:
+    """Cache on top of an opened asset store saver (``S3AsyncSaver``)."""
+
+    def __init__(self, saver):
+        self.saver = saver
+
+    async def get(self, key: str) -> Optional[Buffer]:
+        try:
+            return await self.saver.download(key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+
+    async def put(self, key: str, data: Buffer) -> None:
+        await self.saver.save(data, key)
@@ -0,0 +1,160 @@
+"""Batched image generation.
+
+Requests of one run are grouped by generation settings and normalized prompt:
+every distinct prompt costs one API call, repeated prompts are served by
+``n > 1`` variants of that call, and images already in the cache cost nothing.
+"""
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Optional, Protocol
+
+from image_jobs.cache import Buffer, ImageCache, MemoryImageCache, cache_key, prompt_hash
+from image_jobs.transcode import ImageTranscoder
+
+# images per call accepted by gpt-image-1
+MAX_IMAGES_PER_CALL = 10
+
+
+class ImageBackend(Protocol):
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        size: str,
+        quality: Optional[str],
+        output_format: str,
+        n: int,
+    ) -> list[bytes]: ...
+
+
+@dataclass(frozen=True)
+class ImageRequest:
+    name: str
+    prompt: str
+    model: str = "gpt-image-1"
+    size: str = "1024x1024"
+    quality: Optional[str] = "low"
+    output_format: str = "png"
+
+    @property
+    def digest(self) -> str:
+        return prompt_hash(
+            self.prompt, model=self.model, size=self.size, quality=self.quality, output_format=self.output_format
+        )
+
+
+@dataclass(frozen=True)
+class ImageResult:
+    request: ImageRequest
+    data: Buffer
+    cache_key: str
+    cached: bool
+
+
+@dataclass
+class ImageJobStats:
+    requests: int = 0
+    hits: int = 0
+    calls: int = 0
+    generated: int = 0
+
+
+class ImageJobRunner:
+    """Generates images for a batch of requests through ``backend``.
+
+    Requests with the same normalized prompt and settings get different
+    variants (``0, 1, ...`` in request order), so sequences sharing a prompt
+    still get distinct images; with ``distinct=False`` they share one image.
+    With a ``transcoder`` generated images are re-encoded before they are
+    cached and returned.
+    """
+
+    def __init__(
+        self,
+        backend: ImageBackend,
+        cache: Optional[ImageCache] = None,
+        *,
+        max_n: int = 4,
+        max_concurrency: int = 4,
+        distinct: bool = True,
+        transcoder: Optional[ImageTranscoder] = None,
+    ):
+        if not 1 <= max_n <= MAX_IMAGES_PER_CALL:
+            raise ValueError(f"max_n must be between 1 and {MAX_IMAGES_PER_CALL}, got {max_n}")
+        self.backend = backend
+        self.cache = cache if cache is not None else MemoryImageCache()
+        self.max_n = max_n
+        self.max_concurrency = max_concurrency
+        self.distinct = distinct
+        self.transcoder = transcoder
+        self.stats = ImageJobStats()
+
+    def _stored_format(self, request: ImageRequest) -> str:
+        return self.transcoder.output_format if self.transcoder is not None else request.output_format
+
+    def _slots(self, requests: list[ImageRequest]) -> list[tuple[str, int]]:
+        seen: Counter = Counter()
+        slots = []
+        for request in requests:
+            digest = request.digest
+            slots.append((digest, seen[digest] if self.distinct else 0))
+            seen[digest] += 1
+        return slots
+
+    async def run(self, requests: Iterable[ImageRequest]) -> list[ImageResult]:
+        """Return one result per request, in request order."""
+        requests = list(requests)
+        slots = self._slots(requests)
+        first: dict[str, ImageRequest] = {}
+        keys: dict[tuple[str, int], str] = {}
+        for request, slot in zip(requests, slots):
+            first.setdefault(slot[0], request)
+            keys[slot] = cache_key(slot[0], slot[1], self._stored_format(request))
+
+        found = await asyncio.gather(*(self.cache.get(key) for key in keys.values()))
+        images = {slot: data for slot, data in zip(keys, found) if data is not None}
+        cached = set(images)
+
+        missing: dict[str, list[int]] = {}
+        for digest, variant in keys:
+            if (digest, variant) not in images:
+                missing.setdefault(digest, []).append(variant)
+        batches = [
+            (digest, variants[i:i + self.max_n])
+            for digest, variants in missing.items()
+            for i in range(0, len(variants), self.max_n)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def generate(digest: str, variants: list[int]) -> None:
+            request = first[digest]
+            async with semaphore:
+                data = await self.backend.generate(
+                    request.prompt,
+                    model=request.model,
+                    size=request.size,
+                    quality=request.quality,
+                    output_format=request.output_format,
+                    n=len(variants),
+                )
+            if len(data) < len(variants):
+                raise ValueError(f"Backend returned {len(data)} images, {len(variants)} requested")
+            self.stats.calls += 1
+            self.stats.generated += len(variants)
+            data = data[:len(variants)]
+            if self.transcoder is not None:
+                data = await asyncio.gather(*(self.transcoder.transcode(image) for image in data))
+            for variant, image in zip(variants, data):
+                images[(digest, variant)] = image
+            await asyncio.gather(*(self.cache.put(keys[(digest, v)], images[(digest, v)]) for v in variants))
+
+        await asyncio.gather(*(generate(digest, variants) for digest, variants in batches))
+
+        self.stats.requests += len(requests)
+        self.stats.hits += sum(slot in cached for slot in slots)
+        return [
+            ImageResult(request, images[slot], keys[slot], cached=slot in cached)
+            for request, slot in zip(requests, slots)
+        ]
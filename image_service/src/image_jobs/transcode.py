@@ -0,0 +1,40 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from PIL import Image
+
+from image_jobs.cache import Buffer
+
+FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+
+
+class ImageTranscoder:
+    """Re-encodes images in a thread pool, off the event loop.
+
+    Pillow releases the GIL while encoding, so a few threads encode in parallel.
+    The result is a view of the encoder buffer, not a copy of it.
+    """
+
+    def __init__(self, output_format: str = "webp", quality: int = 85, workers: Optional[int] = None):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        self.output_format = output_format
+        self.quality = quality
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcode")
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def encode(self, data: Buffer) -> memoryview:
+        with Image.open(io.BytesIO(data)) as image:
+            if self.output_format == "jpeg" and image.mode != "RGB":
+                image = image.convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, format=FORMATS[self.output_format], quality=self.quality)
+        return buffer.getbuffer()
+
+    async def transcode(self, data: Buffer) -> memoryview:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.encode, data)
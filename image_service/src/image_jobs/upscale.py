@@ -0,0 +1,223 @@
+"""Upscale stage between image generation and rendering.
+
+Drafts are generated small and upscaled to the render height tile by tile, so
+memory stays bounded by the output image plus the tiles in flight.
+"""
+import asyncio
+import io
+import os
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Protocol
+
+from PIL import Image
+
+from image_jobs.cache import CACHE_PREFIX, Buffer, ImageCache, MemoryImageCache
+
+UPSCALED_PREFIX = "cache/upscaled"
+# render_service composes frames at 1920x1080
+RENDER_HEIGHT = 1080
+# images this close to the target height are only resampled, not upscaled
+FIT_TOLERANCE = 0.9
+
+
+class TileUpscaler(Protocol):
+    name: str
+    scale: int
+
+    def __call__(self, tile: Image.Image) -> Image.Image: ...
+
+
+def _check_scale(scale: int) -> None:
+    # UpscaleStage repeats passes until the image is tall enough, x1 would never get there
+    if scale < 2:
+        raise ValueError(f"Upscale factor must be >= 2, got {scale}")
+
+
+class LanczosUpscaler:
+    """Plain resampling, no model weights needed."""
+
+    def __init__(self, scale: int = 2):
+        _check_scale(scale)
+        self.name = f"lanczos-x{scale}"
+        self.scale = scale
+
+    def __call__(self, tile: Image.Image) -> Image.Image:
+        return tile.resize((tile.width * self.scale, tile.height * self.scale), Image.Resampling.LANCZOS)
+
+
+class RealESRGANUpscaler:
+    """Real-ESRGAN from ``py_real_esrgan``; the model is loaded on first use."""
+
+    def __init__(self, scale: int = 4, weights: str = "weights/RealESRGAN_x4.pth", device: Optional[str] = None):
+        _check_scale(scale)
+        self.name = f"realesrgan-x{scale}"
+        self.scale = scale
+        self.weights = weights
+        self.device = device
+        self._model = None
+
+    def _load(self):
+        import sys
+
+        import huggingface_hub
+        import torch
+
+        # py_real_esrgan still imports the removed huggingface_hub.cached_download
+        if not hasattr(huggingface_hub, "cached_download"):
+            huggingface_hub.cached_download = huggingface_hub.hf_hub_download
+            sys.modules["huggingface_hub"].cached_download = huggingface_hub.hf_hub_download
+        from py_real_esrgan.model import RealESRGAN
+
+        device = self.device or ("mps" if torch.backends.mps.is_available() else "cpu")
+        model = RealESRGAN(torch.device(device), scale=self.scale)
+        model.load_weights(self.weights, download=True)
+        return model
+
+    def __call__(self, tile: Image.Image) -> Image.Image:
+        if self._model is None:
+            self._model = self._load()
+        return self._model.predict(tile.convert("RGB"))
+
+
+def upscale_tiled(
+    image: Image.Image,
+    upscaler: TileUpscaler,
+    *,
+    tile: int = 256,
+    overlap: int = 16,
+    executor: Optional[Executor] = None,
+    max_in_flight: int = 4,
+) -> Image.Image:
+    """Upscale ``image`` by ``upscaler.scale`` in ``tile`` sized pieces.
+
+    Every tile is upscaled with ``overlap`` pixels of context on each side that
+    are cut off again before pasting, which hides the seams of models that look
+    at neighbouring pixels. At most ``max_in_flight`` tiles are queued on
+    ``executor`` at a time.
+    """
+    if tile <= 0 or overlap < 0:
+        raise ValueError(f"Invalid tiling: tile={tile}, overlap={overlap}")
+    scale = upscaler.scale
+    result = Image.new(image.mode, (image.width * scale, image.height * scale))
+
+    def work(box: tuple[int, int, int, int]) -> tuple[tuple[int, int, int, int], Image.Image]:
+        left, top, right, bottom = box
+        padded = (max(0, left - overlap), max(0, top - overlap),
+                  min(image.width, right + overlap), min(image.height, bottom + overlap))
+        upscaled = upscaler(image.crop(padded))
+        dx, dy = (left - padded[0]) * scale, (top - padded[1]) * scale
+        return box, upscaled.crop((dx, dy, dx + (right - left) * scale, dy + (bottom - top) * scale))
+
+    def paste(box, piece: Image.Image) -> None:
+        result.paste(piece.convert(image.mode), (box[0] * scale, box[1] * scale))
+
+    boxes = [
+        (x, y, min(x + tile, image.width), min(y + tile, image.height))
+        for y in range(0, image.height, tile)
+        for x in range(0, image.width, tile)
+    ]
+    if executor is None:
+        for box in boxes:
+            paste(*work(box))
+        return result
+
+    pending: deque = deque()
+    for box in boxes:
+        if len(pending) >= max_in_flight:
+            paste(*pending.popleft().result())
+        pending.append(executor.submit(work, box))
+    while pending:
+        paste(*pending.popleft().result())
+    return result
+
+
+def fit_height(image: Image.Image, height: int) -> Image.Image:
+    if image.height == height:
+        return image
+    width = round(image.width * height / image.height)
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def upscaled_key(source_key: str, upscaler: str, height: int) -> str:
+    """Cache key of the upscaled version of the image stored under ``source_key``."""
+    path = source_key.removeprefix(CACHE_PREFIX + "/")
+    return f"{UPSCALED_PREFIX}/{upscaler}/{height}/{Path(path).with_suffix('.png').as_posix()}"
+
+
+@dataclass
+class UpscaleStats:
+    hits: int = 0
+    upscaled: int = 0
+
+
+class UpscaleStage:
+    """Upscales generated images to the render height, caching results per image key.
+
+    The upscaler runs as many passes as needed to get near ``height`` and the
+    result is fitted to exactly ``height`` with Lanczos resampling. Tiles of
+    all images share one worker pool.
+    """
+
+    def __init__(
+        self,
+        upscaler: Optional[TileUpscaler] = None,
+        cache: Optional[ImageCache] = None,
+        *,
+        height: int = RENDER_HEIGHT,
+        tile: int = 256,
+        overlap: int = 16,
+        workers: Optional[int] = None,
+    ):
+        self.upscaler = upscaler or LanczosUpscaler()
+        _check_scale(self.upscaler.scale)
+        self.cache = cache if cache is not None else MemoryImageCache()
+        self.height = height
+        self.tile = tile
+        self.overlap = overlap
+        self.workers = workers or os.cpu_count() or 1
+        self.stats = UpscaleStats()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="upscale")
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "UpscaleStage":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def process(self, image: Image.Image) -> Image.Image:
+        while image.height < self.height * FIT_TOLERANCE:
+            image = upscale_tiled(
+                image,
+                self.upscaler,
+                tile=self.tile,
+                overlap=self.overlap,
+                executor=self._executor,
+                max_in_flight=2 * self.workers,
+            )
+        return fit_height(image, self.height)
+
+    def _process_bytes(self, data: Buffer) -> memoryview:
+        with Image.open(io.BytesIO(data)) as image:
+            result = self.process(image.convert("RGB"))
+        buffer = io.BytesIO()
+        result.save(buffer, format="PNG")
+        # a view of the encoder buffer, the upload and the cache read it without copies
+        return buffer.getbuffer()
+
+    async def upscale(self, source_key: str, data: Buffer) -> Buffer:
+        """Return PNG data of ``data`` upscaled to the render height."""
+        key = upscaled_key(source_key, self.upscaler.name, self.height)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            self.stats.hits += 1
+            return cached
+        result = await asyncio.to_thread(self._process_bytes, data)
+        await self.cache.put(key, result)
+        self.stats.upscaled += 1
+        return result
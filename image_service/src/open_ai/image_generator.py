@@ -1,10 +1,16 @@
 from pathlib import Path
-from typing import Union, List, Optional, Literal
+from typing import Union, List, Optional, Literal, TYPE_CHECKING
 
 from gpt_api.chatgpt_api import ChatGPTAPIAsync
 
+if TYPE_CHECKING:
+    from cache_client.rate_limit import RateLimiter
+
 
 class ImageGenerator:
+    def __init__(self, rate_limiter: Optional["RateLimiter"] = None):
+        self.rate_limiter = rate_limiter
+
     async def generate_image(
         self,
         prompt: str,
@@ -24,7 +30,7 @@ class ImageGenerator:
         role = """
         Create good quality images. You are creating images for videos.
         """
-        api = ChatGPTAPIAsync(gpt_role=role, model=model, timeout=200)
+        api = ChatGPTAPIAsync(gpt_role=role, model=model, timeout=200, rate_limiter=self.rate_limiter)
 
         # just await the API call, no asyncio.run here
         result = await api.generate_image(
@@ -39,3 +45,18 @@ class ImageGenerator:
         )
         return result
 
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        model: str = "gpt-image-1",
+        size: str = "1024x1024",
+        quality: Optional[str] = "low",
+        output_format: str = "png",
+        n: int = 1,
+    ) -> List[bytes]:
+        """Backend interface of ``image_jobs.ImageJobRunner``, always returns a list."""
+        result = await self.generate_image(
+            prompt, model=model, size=size, quality=quality, output_format=output_format, n=n
+        )
+        return [result] if isinstance(result, bytes) else list(result)
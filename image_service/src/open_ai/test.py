@@ -1,9 +1,17 @@
 import asyncio
+import os
 from typing import Any
 
+from cache_client.rate_limit import openai_limiter_from_env
+from image_jobs.cache import AssetImageCache, LocalImageCache, TieredImageCache
+from image_jobs.jobs import ImageJobRunner, ImageRequest
+from image_jobs.transcode import ImageTranscoder
+from image_jobs.upscale import UpscaleStage
 from open_ai.image_generator import ImageGenerator
 from saver.s3_saver import S3AsyncSaver
-from scenarist.scenarist import ScenarioGenerator, get_json_scheme_example
+from scenario_dto.index import ProjectIndex
+from scenarist.scenarist import ScenarioGenerator
+from stable_diffusion.worker import DiffusionWorker, StableDiffusionBackend
 
 
 def _extract_hierarchy_id(entity: Any) -> str:
@@ -64,20 +72,39 @@ async def generate_and_save(
     await saver.save(data, key, content_type="image/png")
     return key
 
+
+def image_request(seq, model: str) -> ImageRequest:
+    # the profile decides the draft resolution, "auto" keeps its 512x512
+    return ImageRequest(name=str(seq.hierarchy_id), prompt=seq.style.image + ". No Text", model=model, size="auto")
+
+
 async def run_pipeline():
-    s_gen = ScenarioGenerator()
-    a = await s_gen.gen("Roman Empire", "Documentary", 30, schema=get_json_scheme_example(), is_backup=True)
-    img_gen = ImageGenerator()
+    # with REDIS_URL scenario requests share one OpenAI limit across processes
+    limiter = openai_limiter_from_env()
+    s_gen = ScenarioGenerator(rate_limiter=limiter)
+    a = await s_gen.gen("Roman Empire", "Documentary", 30, is_backup=True)
+    sequences = list(ProjectIndex(a).iter_sequences())
+    # drafts come from the local 512 px turbo profile; 1024 px OpenAI images are already
+    # within FIT_TOLERANCE of the render height and would only be resampled, not upscaled
+    with DiffusionWorker("turbo") as worker:
+        await save_drafts(sequences, StableDiffusionBackend(worker), worker.profile.model_id)
+
+
+async def save_drafts(sequences, backend, model: str):
     async with S3AsyncSaver(bucket="GenVideoAI") as saver:
-        tasks = []
-        for ep in a.episodes:
-            for seq in ep.sequences:
-                print("Create task:", seq.hierarchy_id)
-                tasks.append(asyncio.create_task(generate_and_save(seq, img_gen, saver)))
-
-        # as ready
-        for coro in asyncio.as_completed(tasks):
-            saved_key = await coro
-            print("Saved:", saved_key)
+        # one call per distinct prompt, prompts rendered before are read from the asset store
+        # a local copy next to the asset store, both written from the same buffer
+        cache = TieredImageCache(LocalImageCache(), AssetImageCache(saver))
+        fmt = os.getenv("IMAGE_TRANSCODE")  # e.g. webp or jpeg
+        runner = ImageJobRunner(backend, cache, transcoder=ImageTranscoder(fmt) if fmt else None)
+        results = await runner.run(image_request(seq, model) for seq in sequences)
+        # drafts are upscaled to the render height once per generated image
+        with UpscaleStage(cache=cache) as upscale:
+            for seq, result in zip(sequences, results):
+                data = await upscale.upscale(result.cache_key, result.data)
+                key = build_entity_asset_path(seq)
+                await saver.save(data, key, content_type="image/png")
+                print("Saved:", key, "(cached)" if result.cached else "")
+        print(runner.stats, upscale.stats)
 
 asyncio.run(run_pipeline())
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class DiffusionProfile:
+    """Model and inference settings of a Stable Diffusion pipeline."""
+
+    name: str
+    model_id: str
+    steps: int
+    guidance_scale: float
+    height: int = 512
+    width: int = 512
+    negative_prompt: Optional[str] = None
+    attention_slicing: bool = True
+    vae_slicing: bool = True
+    vae_tiling: bool = False
+    # fp16 weights on GPU/MPS, CPU always runs in fp32
+    half: bool = True
+    variant: Optional[str] = None
+    safetensors: bool = True
+
+    def resolution(self, size: str = "auto") -> tuple[int, int]:
+        """Return ``(height, width)`` for an OpenAI style ``size``.
+
+        The profile resolution is the pixel budget, ``size`` only sets the aspect
+        ratio; both sides are rounded down to multiples of 8 as the VAE requires.
+        """
+        if size == "auto":
+            return self.height, self.width
+        width, height = (int(v) for v in size.lower().split("x"))
+        scale = max(self.height, self.width) / max(height, width)
+        return int(height * scale) // 8 * 8, int(width * scale) // 8 * 8
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        # one step distilled model, the default for drafts
+        DiffusionProfile("turbo", "stabilityai/sd-turbo", steps=1, guidance_scale=0.0, variant="fp16"),
+        DiffusionProfile(
+            "quality",
+            "runwayml/stable-diffusion-v1-5",
+            steps=30,
+            guidance_scale=5.0,
+            vae_tiling=True,
+        ),
+        # random weights, only for tests and benchmarks on CPU
+        DiffusionProfile(
+            "tiny",
+            "hf-internal-testing/tiny-stable-diffusion-torch",
+            steps=2,
+            guidance_scale=0.0,
+            height=64,
+            width=64,
+            attention_slicing=False,
+            vae_slicing=False,
+            half=False,
+            safetensors=False,
+        ),
+    )
+}
@@ -0,0 +1,247 @@
+"""Resident Stable Diffusion pipeline.
+
+The pipeline is loaded once by a worker thread that owns it for the whole
+process; prompts submitted from several sequences at the same time are
+rendered in one denoising call.
+"""
+import asyncio
+import io
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from stable_diffusion.profiles import PROFILES, DiffusionProfile
+
+
+def default_device() -> str:
+    import torch
+
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def load_pipeline(profile: DiffusionProfile, device: Optional[str] = None):
+    """Load the ``diffusers`` pipeline of ``profile`` with its memory settings applied."""
+    import torch
+    from diffusers import AutoPipelineForText2Image
+
+    device = device or default_device()
+    half = profile.half and device != "cpu"
+    kwargs = {"variant": profile.variant} if half and profile.variant else {}
+    pipe = AutoPipelineForText2Image.from_pretrained(
+        profile.model_id,
+        torch_dtype=torch.float16 if half else torch.float32,
+        use_safetensors=profile.safetensors,
+        low_cpu_mem_usage=True,
+        **kwargs,
+    )
+    pipe.to(device)
+    if profile.attention_slicing:
+        pipe.enable_attention_slicing()
+    if profile.vae_slicing:
+        pipe.vae.enable_slicing()
+    if profile.vae_tiling:
+        pipe.vae.enable_tiling()
+    if getattr(pipe, "safety_checker", None) is not None:
+        pipe.safety_checker = None
+    pipe.set_progress_bar_config(disable=True)
+    return pipe
+
+
+def _inference_mode():
+    try:
+        import torch
+    except ImportError:
+        return nullcontext()
+    return torch.inference_mode()
+
+
+@dataclass
+class _Job:
+    prompt: str
+    n: int
+    height: int
+    width: int
+    future: Future = field(default_factory=Future)
+
+
+@dataclass
+class WorkerStats:
+    load_seconds: float = 0.0
+    batches: int = 0
+    images: int = 0
+    render_seconds: float = 0.0
+
+
+class DiffusionWorker:
+    """Owns one pipeline in a background thread and renders submitted prompts in batches.
+
+    Jobs with the same resolution that arrive within ``batch_window`` seconds
+    are merged into one pipeline call of at most ``max_batch`` images.
+    """
+
+    def __init__(
+        self,
+        profile: DiffusionProfile | str = "turbo",
+        *,
+        device: Optional[str] = None,
+        max_batch: int = 4,
+        batch_window: float = 0.05,
+        loader: Callable[[DiffusionProfile, Optional[str]], Any] = load_pipeline,
+    ):
+        self.profile = PROFILES[profile] if isinstance(profile, str) else profile
+        self.device = device
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.stats = WorkerStats()
+        self._loader = loader
+        self._queue: queue.Queue[Optional[_Job]] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def start(self) -> "DiffusionWorker":
+        """Start the worker thread and wait until the pipeline is loaded."""
+        if self._thread is None:
+            self._error = None
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name=f"diffusion-{self.profile.name}", daemon=True)
+            self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            # the thread has exited, a later start() retries the load
+            self._thread.join()
+            self._thread = None
+            raise RuntimeError(f"Failed to load {self.profile.model_id}") from self._error
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "DiffusionWorker":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def submit(self, prompt: str, n: int = 1, size: str = "auto") -> Future:
+        """Queue ``n`` images of ``prompt``; the future resolves to a list of PIL images."""
+        if self._error is not None:
+            raise RuntimeError(f"Failed to load {self.profile.model_id}") from self._error
+        if self._thread is None:
+            raise RuntimeError("Worker is not started")
+        if not self._thread.is_alive():
+            raise RuntimeError("Worker is not running")
+        height, width = self.profile.resolution(size)
+        job = _Job(prompt, n, height, width)
+        self._queue.put(job)
+        return job.future
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        try:
+            pipe = self._loader(self.profile, self.device)
+        except BaseException as e:  # pylint: disable=broad-except
+            self._error = e
+            self._ready.set()
+            return
+        self.stats.load_seconds = time.perf_counter() - started
+        self._ready.set()
+
+        carry: Optional[_Job] = None
+        stopping = False
+        while not stopping:
+            job = carry if carry is not None else self._queue.get()
+            carry = None
+            if job is None:
+                break
+            batch, images = [job], job.n
+            deadline = time.monotonic() + self.batch_window
+            while images < self.max_batch:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                if (nxt.height, nxt.width) != (job.height, job.width) or images + nxt.n > self.max_batch:
+                    carry = nxt
+                    break
+                batch.append(nxt)
+                images += nxt.n
+            self._render(pipe, batch)
+
+        # fail whatever was submitted after close
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            if job is not None:
+                job.future.set_exception(RuntimeError("Worker is closed"))
+
+    def _render(self, pipe, batch: list[_Job]) -> None:
+        profile = self.profile
+        prompts = [job.prompt for job in batch for _ in range(job.n)]
+        kwargs = {}
+        if profile.negative_prompt:
+            kwargs["negative_prompt"] = [profile.negative_prompt] * len(prompts)
+        started = time.perf_counter()
+        try:
+            with _inference_mode():
+                images = pipe(
+                    prompt=prompts,
+                    num_inference_steps=profile.steps,
+                    guidance_scale=profile.guidance_scale,
+                    height=batch[0].height,
+                    width=batch[0].width,
+                    **kwargs,
+                ).images
+        except Exception as e:  # pylint: disable=broad-except
+            for job in batch:
+                job.future.set_exception(e)
+            return
+        self.stats.render_seconds += time.perf_counter() - started
+        self.stats.batches += 1
+        self.stats.images += len(images)
+        offset = 0
+        for job in batch:
+            job.future.set_result(images[offset:offset + job.n])
+            offset += job.n
+
+
+def encode_image(image, output_format: str = "png") -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG" if output_format == "jpeg" else output_format.upper())
+    return buffer.getvalue()
+
+
+class StableDiffusionBackend:
+    """Local image backend with the same ``generate`` interface as ``ImageGenerator``.
+
+    ``model`` and ``quality`` are ignored, the worker profile decides them.
+    """
+
+    def __init__(self, worker: DiffusionWorker):
+        self.worker = worker
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        model: str = "",
+        size: str = "auto",
+        quality: Optional[str] = None,
+        output_format: str = "png",
+        n: int = 1,
+    ) -> list[bytes]:
+        images = await asyncio.wrap_future(self.worker.submit(prompt, n, size))
+        return await asyncio.to_thread(lambda: [encode_image(image, output_format) for image in images])
@@ -0,0 +1,175 @@
+import io
+
+import pytest
+from botocore.exceptions import ClientError
+from PIL import Image
+
+from image_jobs.cache import (
+    AssetImageCache,
+    LocalImageCache,
+    MemoryImageCache,
+    TieredImageCache,
+    normalize_prompt,
+    prompt_hash,
+)
+from image_jobs.jobs import ImageJobRunner, ImageRequest
+from image_jobs.transcode import ImageTranscoder
+
+
+class StubBackend:
+    def __init__(self):
+        self.calls: list[tuple[str, int]] = []
+
+    async def generate(self, prompt, *, model, size, quality, output_format, n):
+        self.calls.append((prompt, n))
+        return [f"{prompt}|{len(self.calls)}|{i}".encode() for i in range(n)]
+
+
+class StubSaver:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+
+    async def save(self, data, key, *, content_type=None):
+        self.objects[key] = data
+
+    async def download(self, key):
+        if key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return self.objects[key]
+
+
+@pytest.fixture
+def backend():
+    return StubBackend()
+
+
+def _requests(*prompts: str, **kwargs) -> list[ImageRequest]:
+    return [ImageRequest(name=f"Pr0-Ep0-Seq{i}", prompt=p, **kwargs) for i, p in enumerate(prompts)]
+
+
+class TestPromptKey:
+    def test_normalization(self):
+        assert normalize_prompt("  Roman   Forum at DAWN.  No Text! ") == "roman forum at dawn. no text"
+        assert normalize_prompt("Forum") == normalize_prompt("forum...")
+
+    def test_settings_are_part_of_the_key(self):
+        base = dict(model="gpt-image-1", size="1024x1024", quality="low", output_format="png")
+        assert prompt_hash("Forum", **base) == prompt_hash("forum.", **base)
+        assert prompt_hash("Forum", **base) != prompt_hash("Forum", **{**base, "quality": "high"})
+
+
+class TestImageJobRunner:
+    async def test_repeated_prompts_use_one_call(self, backend):
+        runner = ImageJobRunner(backend)
+        results = await runner.run(_requests("Forum", "forum.", "Senate", "FORUM"))
+        assert sorted(backend.calls) == [("Forum", 3), ("Senate", 1)]
+        assert len({r.data for r in results}) == 4
+        assert [r.request.name for r in results] == [f"Pr0-Ep0-Seq{i}" for i in range(4)]
+        assert runner.stats.calls == 2 and runner.stats.generated == 4
+
+    async def test_shared_images_without_distinct(self, backend):
+        runner = ImageJobRunner(backend, distinct=False)
+        results = await runner.run(_requests("Forum", "forum"))
+        assert backend.calls == [("Forum", 1)]
+        assert results[0].data == results[1].data
+
+    async def test_large_groups_are_split_by_max_n(self, backend):
+        await ImageJobRunner(backend, max_n=2).run(_requests(*["Forum"] * 5))
+        assert [n for _, n in backend.calls] == [2, 2, 1]
+
+    async def test_cache_is_shared_between_projects(self, backend):
+        cache = MemoryImageCache()
+        first = await ImageJobRunner(backend, cache).run(_requests("Forum", "Senate"))
+        runner = ImageJobRunner(backend, cache)
+        second = await runner.run(_requests("forum", "Senate", "Senate", "Colosseum"))
+        assert sorted(backend.calls[2:]) == [("Colosseum", 1), ("Senate", 1)]
+        assert [r.cached for r in second] == [True, True, False, False]
+        assert second[0].data == first[0].data
+        assert runner.stats.hits == 2
+
+    async def test_settings_are_not_mixed(self, backend):
+        cache = MemoryImageCache()
+        await ImageJobRunner(backend, cache).run(_requests("Forum"))
+        results = await ImageJobRunner(backend, cache).run(_requests("Forum", quality="high"))
+        assert not results[0].cached
+        assert len(backend.calls) == 2
+
+    async def test_short_backend_answer_fails(self):
+        class Short(StubBackend):
+            async def generate(self, prompt, **kwargs):
+                return []
+
+        with pytest.raises(ValueError, match="returned 0 images"):
+            await ImageJobRunner(Short()).run(_requests("Forum"))
+
+    def test_max_n_is_checked(self, backend):
+        with pytest.raises(ValueError, match="max_n"):
+            ImageJobRunner(backend, max_n=11)
+
+
+class TestAssetImageCache:
+    async def test_missing_key_is_a_miss(self, backend):
+        saver = StubSaver()
+        results = await ImageJobRunner(backend, AssetImageCache(saver)).run(_requests("Forum"))
+        assert saver.objects == {results[0].cache_key: results[0].data}
+        assert results[0].cache_key.startswith("cache/images/") and results[0].cache_key.endswith("/0.png")
+
+        again = await ImageJobRunner(backend, AssetImageCache(saver)).run(_requests("forum"))
+        assert again[0].cached and len(backend.calls) == 1
+
+    async def test_other_errors_propagate(self):
+        class Broken(StubSaver):
+            async def download(self, key):
+                raise ClientError({"Error": {"Code": "AccessDenied"}}, "GetObject")
+
+        with pytest.raises(ClientError):
+            await AssetImageCache(Broken()).get("cache/images/x")
+
+
+class TestLocalCache:
+    async def test_local_cache_round_trip(self, tmp_path):
+        cache = LocalImageCache(tmp_path)
+        assert await cache.get("cache/images/ab/abcd/0.png") is None
+        await cache.put("cache/images/ab/abcd/0.png", memoryview(b"png-data"))
+        assert await cache.get("cache/images/ab/abcd/0.png") == b"png-data"
+        assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == ["0.png"]
+
+    async def test_tiered_cache_writes_both_and_fills_local(self, tmp_path, backend):
+        remote = MemoryImageCache()
+        results = await ImageJobRunner(backend, TieredImageCache(LocalImageCache(tmp_path), remote)).run(
+            _requests("Forum")
+        )
+        key = results[0].cache_key
+        assert remote.items[key] == results[0].data
+        assert (tmp_path / key).read_bytes() == results[0].data
+
+        other_host = LocalImageCache(tmp_path / "other")
+        again = await ImageJobRunner(backend, TieredImageCache(other_host, remote)).run(_requests("forum"))
+        assert again[0].cached and len(backend.calls) == 1
+        assert await other_host.get(key) == results[0].data
+
+
+class TestTranscode:
+    async def test_generated_images_are_transcoded(self):
+        image = Image.new("RGB", (32, 32), "red")
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+
+        class PngBackend(StubBackend):
+            async def generate(self, prompt, *, n, **kwargs):
+                self.calls.append((prompt, n))
+                return [buffer.getvalue()] * n
+
+        backend, cache = PngBackend(), MemoryImageCache()
+        transcoder = ImageTranscoder("webp", quality=80, workers=2)
+        try:
+            results = await ImageJobRunner(backend, cache, transcoder=transcoder).run(_requests("Forum", "Forum"))
+        finally:
+            transcoder.close()
+        assert [r.cache_key.rsplit(".", 1)[1] for r in results] == ["webp", "webp"]
+        assert Image.open(io.BytesIO(results[0].data)).format == "WEBP"
+        assert cache.items[results[1].cache_key] is results[1].data
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError, match="Unsupported output format"):
+            ImageTranscoder("gif")
@@ -0,0 +1,121 @@
+import io
+import threading
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from stable_diffusion.profiles import PROFILES
+from stable_diffusion.worker import DiffusionWorker, StableDiffusionBackend
+
+
+class FakePipeline:
+    def __init__(self):
+        self.calls: list[dict] = []
+        self.busy = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, *, prompt, num_inference_steps, guidance_scale, height, width, **kwargs):
+        self.busy.set()
+        self.gate.wait()
+        self.calls.append({"prompt": prompt, "height": height, "width": width, "steps": num_inference_steps})
+        return SimpleNamespace(images=[Image.new("RGB", (width, height)) for _ in prompt])
+
+
+@pytest.fixture
+def pipe():
+    return FakePipeline()
+
+
+def _worker(pipe, **kwargs) -> DiffusionWorker:
+    return DiffusionWorker("tiny", loader=lambda profile, device: pipe, **kwargs)
+
+
+class TestProfiles:
+    def test_resolution_keeps_pixel_budget(self):
+        turbo = PROFILES["turbo"]
+        assert turbo.resolution() == (512, 512)
+        assert turbo.resolution("1024x1024") == (512, 512)
+        assert turbo.resolution("1536x1024") == (336, 512)
+        assert turbo.resolution("1024x1536") == (512, 336)
+
+
+class TestDiffusionWorker:
+    def test_concurrent_prompts_share_a_call(self, pipe):
+        with _worker(pipe, max_batch=4, batch_window=0.05) as worker:
+            pipe.gate.clear()
+            futures = [worker.submit("warmup")]
+            # the rest queues up while the first call is rendering
+            pipe.busy.wait(5)
+            futures += [worker.submit(p) for p in ("forum", "senate")] + [worker.submit("arena", n=2)]
+            pipe.gate.set()
+            results = [f.result(timeout=5) for f in futures]
+        assert [len(r) for r in results] == [1, 1, 1, 2]
+        assert [c["prompt"] for c in pipe.calls] == [["warmup"], ["forum", "senate", "arena", "arena"]]
+        assert pipe.calls[0]["steps"] == PROFILES["tiny"].steps
+        assert worker.stats.batches == 2 and worker.stats.images == 5
+
+    def test_batches_split_by_resolution_and_size(self, pipe):
+        with _worker(pipe, max_batch=2, batch_window=0.05) as worker:
+            pipe.gate.clear()
+            futures = [worker.submit("warmup")]
+            pipe.busy.wait(5)
+            futures += [
+                worker.submit("a"),
+                worker.submit("b", size="1536x1024"),
+                worker.submit("c", size="1536x1024"),
+                worker.submit("d", size="1536x1024"),
+            ]
+            pipe.gate.set()
+            for f in futures:
+                f.result(timeout=5)
+        assert [(c["prompt"], c["height"]) for c in pipe.calls] == [
+            (["warmup"], 64), (["a"], 64), (["b", "c"], 40), (["d"], 40),
+        ]
+
+    def test_pipeline_errors_fail_the_batch(self):
+        def broken(**kwargs):
+            raise RuntimeError("out of memory")
+
+        with _worker(broken) as worker:
+            with pytest.raises(RuntimeError, match="out of memory"):
+                worker.submit("forum").result(timeout=5)
+
+    def test_load_errors_are_raised_on_start(self):
+        def loader(profile, device):
+            raise OSError("no weights")
+
+        worker = DiffusionWorker("tiny", loader=loader)
+        with pytest.raises(RuntimeError, match="Failed to load"):
+            worker.start()
+        # nothing would ever resolve the future
+        with pytest.raises(RuntimeError, match="Failed to load"):
+            worker.submit("forum")
+
+    def test_start_retries_a_failed_load(self, pipe):
+        attempts = []
+
+        def loader(profile, device):
+            attempts.append(profile)
+            if len(attempts) == 1:
+                raise OSError("no weights")
+            return pipe
+
+        worker = DiffusionWorker("tiny", loader=loader)
+        with pytest.raises(RuntimeError, match="Failed to load"):
+            worker.start()
+        with worker:
+            assert len(worker.submit("forum").result(timeout=5)) == 1
+
+    def test_submit_requires_start(self, pipe):
+        with pytest.raises(RuntimeError, match="not started"):
+            _worker(pipe).submit("forum")
+
+
+class TestStableDiffusionBackend:
+    async def test_generate_returns_encoded_images(self, pipe):
+        with _worker(pipe) as worker:
+            data = await StableDiffusionBackend(worker).generate("forum", output_format="jpeg", n=2)
+        assert len(data) == 2
+        assert Image.open(io.BytesIO(data[0])).format == "JPEG"
@@ -0,0 +1,106 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_jobs.cache import MemoryImageCache
+from image_jobs.upscale import RENDER_HEIGHT, LanczosUpscaler, UpscaleStage, upscale_tiled, upscaled_key
+from stable_diffusion.profiles import PROFILES
+
+
+class NearestUpscaler:
+    name = "nearest-x2"
+    scale = 2
+
+    def __init__(self):
+        self.tiles = 0
+
+    def __call__(self, tile):
+        self.tiles += 1
+        return tile.resize((tile.width * 2, tile.height * 2), Image.Resampling.NEAREST)
+
+
+def _noise(width: int, height: int) -> Image.Image:
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 255, (height, width, 3), dtype=np.uint8))
+
+
+def _png(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestUpscaleTiled:
+    @pytest.mark.parametrize("tile, overlap", [(32, 0), (50, 8), (1000, 4)])
+    def test_tiles_stitch_without_seams(self, tile, overlap):
+        image = _noise(120, 90)
+        upscaler = NearestUpscaler()
+        whole = upscaler(image)
+        with ThreadPoolExecutor(2) as executor:
+            tiled = upscale_tiled(image, upscaler, tile=tile, overlap=overlap, executor=executor, max_in_flight=2)
+        assert tiled.size == (240, 180)
+        assert np.array_equal(np.asarray(tiled), np.asarray(whole))
+
+    def test_tile_count(self):
+        upscaler = NearestUpscaler()
+        upscale_tiled(_noise(100, 60), upscaler, tile=50)
+        assert upscaler.tiles == 2 * 2
+
+    def test_invalid_tiling(self):
+        with pytest.raises(ValueError, match="Invalid tiling"):
+            upscale_tiled(_noise(8, 8), NearestUpscaler(), tile=0)
+
+
+class TestUpscaleStage:
+    def test_key_follows_the_source_image(self):
+        key = upscaled_key("cache/images/ab/abcd/1.jpeg", "lanczos-x2", 1080)
+        assert key == "cache/upscaled/lanczos-x2/1080/ab/abcd/1.png"
+
+    def test_draft_is_upscaled_to_render_height(self):
+        with UpscaleStage(NearestUpscaler(), height=300, tile=64, workers=2) as stage:
+            result = stage.process(_noise(64, 64))
+        assert result.size == (300, 300)
+
+    async def test_results_are_cached(self):
+        cache = MemoryImageCache()
+        upscaler = NearestUpscaler()
+        with UpscaleStage(upscaler, cache, height=200, tile=32, workers=2) as stage:
+            data = _png(_noise(64, 64))
+            first = await stage.upscale("cache/images/ab/abcd/0.png", data)
+            tiles = upscaler.tiles
+            second = await stage.upscale("cache/images/ab/abcd/0.png", data)
+        assert first == second and upscaler.tiles == tiles
+        assert Image.open(io.BytesIO(first)).size == (200, 200)
+        assert stage.stats.hits == 1 and stage.stats.upscaled == 1
+        assert list(cache.items) == ["cache/upscaled/nearest-x2/200/ab/abcd/0.png"]
+
+    def test_large_images_are_only_fitted(self):
+        upscaler = LanczosUpscaler()
+        with UpscaleStage(upscaler, height=100) as stage:
+            assert stage.process(_noise(300, 200)).size == (150, 100)
+
+    @pytest.mark.parametrize("size", ["auto", "1536x1024", "1024x1536"])
+    def test_turbo_drafts_are_upscaled_in_tiles(self, size):
+        height, width = PROFILES["turbo"].resolution(size)
+        upscaler = NearestUpscaler()
+        with UpscaleStage(upscaler, workers=2) as stage:
+            assert stage.process(_noise(width, height)).height == RENDER_HEIGHT
+        assert upscaler.tiles > 0
+
+    def test_near_target_is_not_upscaled(self):
+        upscaler = NearestUpscaler()
+        with UpscaleStage(upscaler, height=1080) as stage:
+            assert stage.process(_noise(1024, 1024)).size == (1080, 1080)
+        assert upscaler.tiles == 0
+
+    @pytest.mark.parametrize("scale", [0, 1])
+    def test_scale_below_two_is_rejected(self, scale):
+        with pytest.raises(ValueError, match="must be >= 2"):
+            LanczosUpscaler(scale)
+        upscaler = NearestUpscaler()
+        upscaler.scale = scale
+        with pytest.raises(ValueError, match="must be >= 2"):
+            UpscaleStage(upscaler)
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from typing import Iterable, Union
+
+from job_store.batcher import StatusBatcher
+from job_store.models import StatusUpdate
+from job_store.repository import JobRepository
+from scenario_dto.dto import HierarchyId
+
+NodeId = Union[HierarchyId, str]
+
+
+def _node(hierarchy_id: NodeId) -> HierarchyId:
+    if isinstance(hierarchy_id, HierarchyId):
+        return hierarchy_id
+    return HierarchyId.parse(hierarchy_id)
+
+
+class StoreReadiness:
+    """Asset readiness persisted in the shared job store.
+
+    Every orchestrator worker writes node statuses through a ``StatusBatcher``
+    and the gateway reads them back with ``JobRepository.node_statuses``, so
+    readiness survives restarts and is visible to all processes. Celery tasks are
+    synchronous; the batcher runs on an event loop in a daemon thread.
+    """
+
+    def __init__(self, repository: JobRepository, *, flush_interval: float = 0.2):
+        self.repository = repository
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="job-store", daemon=True)
+        self._thread.start()
+        self._batcher = StatusBatcher(repository, flush_interval=flush_interval)
+        self._call(self._start())
+
+    async def _start(self) -> None:
+        await self.repository.create_schema()
+        self._batcher.start()
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def expect(self, job_id: str, hierarchy_ids: Iterable[NodeId]) -> None:
+        """Register nodes of ``job_id`` as pending, also when they are regenerated."""
+        ids = [str(_node(hid)) for hid in hierarchy_ids]
+
+        async def run():
+            for hid in ids:
+                await self._batcher.submit(job_id, hid, "pending")
+            # totals are visible before the first node finishes
+            await self._batcher.flush()
+
+        self._call(run())
+
+    def retain(self, job_id: str, hierarchy_ids: Iterable[NodeId]) -> None:
+        """Forget nodes of ``job_id`` that are not in ``hierarchy_ids``, e.g. removed by an edit."""
+        ids = [str(_node(hid)) for hid in hierarchy_ids]
+
+        async def run():
+            # statuses still in the batch must not bring a pruned node back
+            await self._batcher.flush()
+            await self.repository.prune_nodes(job_id, ids)
+
+        self._call(run())
+
+    def mark_ready(self, job_id: str, hierarchy_id: NodeId, asset_key: str) -> None:
+        """Store the asset key produced for ``hierarchy_id``."""
+        self._call(self._batcher.submit(job_id, str(_node(hierarchy_id)), "ready", asset_key=asset_key))
+
+    def flush(self) -> None:
+        self._call(self._batcher.flush())
+
+    def statuses(self, job_id: str) -> dict[str, StatusUpdate]:
+        """Return the stored status of every node of ``job_id``, including unflushed updates."""
+        self.flush()
+        return self._call(self.repository.node_statuses(job_id))
+
+    def close(self) -> None:
+        self._call(self._batcher.close())
+        self._call(self.repository.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
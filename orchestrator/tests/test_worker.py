@@ -0,0 +1,205 @@
+import pytest
+
+from job_store.sqlite import SQLiteJobRepository
+from orchestrator import worker
+from orchestrator.readiness import StoreReadiness
+from orchestrator.worker import (
+    IMAGE_SEQUENCE,
+    RENDER_PROJECT,
+    TTS_SHOT,
+    app,
+    process_job,
+)
+from scenario_dto.diff import diff_projects
+from scenario_dto.dto import HierarchyId, ProjectDTO, SequenceDTO, ShotDTO
+
+
+def _project(episodes: int = 1, sequences: int = 2, shots: int = 3) -> dict:
+    def node(hid: str, **fields) -> dict:
+        return {"id": f"00000000-0000-0000-0000-{len(hid):012d}", "title": hid, "hierarchy_id": hid, **fields}
+
+    return node(
+        "Pr0",
+        style="documentary",
+        episodes=[
+            node(
+                f"Pr0-Ep{e}",
+                style="calm",
+                sequences=[
+                    node(
+                        f"Pr0-Ep{e}-Seq{q}",
+                        style={"image": "rome", "music": "ambient"},
+                        shots=[
+                            node(f"Pr0-Ep{e}-Seq{q}-Sh{s}", style={"voice": "calm"}, text="text")
+                            for s in range(shots)
+                        ],
+                    )
+                    for q in range(sequences)
+                ],
+            )
+            for e in range(episodes)
+        ],
+    )
+
+
+def _ready(readiness: StoreReadiness, job_id: str) -> bool:
+    statuses = readiness.statuses(job_id)
+    return bool(statuses) and all(status.status == "ready" for status in statuses.values())
+
+
+@pytest.fixture
+def readiness(tmp_path, monkeypatch):
+    """Readiness in a SQLite job store, in place of the one configured by the environment."""
+    store = StoreReadiness(SQLiteJobRepository(tmp_path / "jobs.db"), flush_interval=0.01)
+    monkeypatch.setattr(worker, "_readiness", store)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def services(readiness):
+    """Register eager stand-ins for the service tasks and record their calls."""
+    calls: dict[str, list] = {TTS_SHOT: [], IMAGE_SEQUENCE: [], RENDER_PROJECT: []}
+
+    @app.task(name=TTS_SHOT)
+    def tts_shot(job_id, shot):
+        hid = str(ShotDTO.model_validate(shot).hierarchy_id)
+        calls[TTS_SHOT].append(hid)
+        return f"{hid}.wav"
+
+    @app.task(name=IMAGE_SEQUENCE)
+    def image_sequence(job_id, sequence):
+        hid = str(SequenceDTO.model_validate(sequence).hierarchy_id)
+        calls[IMAGE_SEQUENCE].append(hid)
+        return f"{hid}.png"
+
+    @app.task(name=RENDER_PROJECT)
+    def render(results, job_id, project):
+        calls[RENDER_PROJECT].append(results)
+        return f"{job_id}.mp4"
+
+    app.conf.task_always_eager = True
+    app.conf.task_eager_propagates = True
+    yield calls
+    app.conf.task_always_eager = False
+    for name in calls:
+        app.tasks.pop(name, None)
+
+
+class TestRouting:
+    @pytest.mark.parametrize("name,queue", [
+        (TTS_SHOT, "tts"),
+        (IMAGE_SEQUENCE, "image"),
+        (RENDER_PROJECT, "render"),
+        (worker.PROCESS_JOB, "orchestrator"),
+        (worker.MARK_READY, "orchestrator"),
+    ])
+    def test_dedicated_queues(self, name, queue):
+        route = app.amqp.router.route({}, name)
+        assert route["queue"].name == queue
+
+
+class TestProcessJob:
+    def test_fan_out_and_render(self, services):
+        process_job.delay("job-1", _project(episodes=2, sequences=2, shots=3))
+
+        assert len(services[TTS_SHOT]) == 12
+        assert len(services[IMAGE_SEQUENCE]) == 4
+        [results] = services[RENDER_PROJECT]
+        assert len(results) == 16
+        assert {r["hierarchy_id"] for r in results} == set(services[TTS_SHOT]) | set(services[IMAGE_SEQUENCE])
+
+    def test_tracks_readiness_per_hierarchy_id(self, services, readiness):
+        process_job.delay("job-2", _project())
+
+        assert _ready(readiness, "job-2")
+        statuses = readiness.statuses("job-2")
+        assert statuses["Pr0-Ep0-Seq1"].asset_key == "Pr0-Ep0-Seq1.png"
+        assert statuses["Pr0-Ep0-Seq1-Sh2"].asset_key == "Pr0-Ep0-Seq1-Sh2.wav"
+
+    def test_readiness_is_shared_through_the_store(self, services, readiness, tmp_path):
+        process_job.delay("job-8", _project())
+        readiness.flush()
+
+        # another worker process, or this one after a restart
+        other = StoreReadiness(SQLiteJobRepository(tmp_path / "jobs.db"))
+        try:
+            assert _ready(other, "job-8")
+            assert len(other.statuses("job-8")) == 8
+        finally:
+            other.close()
+
+    def test_rejects_project_without_shots(self, services):
+        with pytest.raises(ValueError, match="any shots"):
+            process_job.delay("job-3", _project(shots=0))
+        assert services[RENDER_PROJECT] == []
+
+    def test_rejects_invalid_payload(self, services):
+        payload = _project()
+        payload["episodes"][0]["hierarchy_id"] = "Pr0-Seq1"
+        with pytest.raises(ValueError):
+            process_job.delay("job-4", payload)
+
+
+class TestStoreReadiness:
+    def test_regenerated_node_is_pending_again(self, readiness):
+        readiness.expect("j", ["Pr0-Ep0-Seq0", "Pr0-Ep0-Seq0-Sh0"])
+        readiness.mark_ready("j", "Pr0-Ep0-Seq0", "img.png")
+        readiness.mark_ready("j", "Pr0-Ep0-Seq0-Sh0", "take.wav")
+        readiness.expect("j", ["Pr0-Ep0-Seq0-Sh0"])
+
+        statuses = readiness.statuses("j")
+        assert statuses["Pr0-Ep0-Seq0"].status == "ready"
+        assert statuses["Pr0-Ep0-Seq0"].asset_key == "img.png"
+        assert statuses["Pr0-Ep0-Seq0-Sh0"].status == "pending"
+        assert statuses["Pr0-Ep0-Seq0-Sh0"].asset_key is None
+
+    def test_flushed_node_is_pending_again(self, readiness):
+        readiness.expect("j", ["Pr0-Ep0-Seq0-Sh0"])
+        readiness.mark_ready("j", "Pr0-Ep0-Seq0-Sh0", "take.wav")
+        readiness.flush()
+        readiness.expect("j", ["Pr0-Ep0-Seq0-Sh0"])
+
+        status = readiness.statuses("j")["Pr0-Ep0-Seq0-Sh0"]
+        assert (status.status, status.asset_key) == ("pending", None)
+
+
+class TestProcessUpdate:
+    @staticmethod
+    def _diff(old: dict, new: dict) -> dict:
+        return diff_projects(ProjectDTO.model_validate(old), ProjectDTO.model_validate(new)).model_dump(mode="json")
+
+    def test_only_affected_nodes(self, services, readiness):
+        old, new = _project(sequences=2, shots=3), _project(sequences=2, shots=4)
+        sequences = new["episodes"][0]["sequences"]
+        sequences[0]["shots"][1]["text"] = "edited"
+        sequences[1]["style"]["image"] = "carthage"
+        sequences[1]["title"] = "renamed"
+
+        worker.process_update.delay("job-5", new, self._diff(old, new))
+
+        assert sorted(services[TTS_SHOT]) == ["Pr0-Ep0-Seq0-Sh1", "Pr0-Ep0-Seq0-Sh3", "Pr0-Ep0-Seq1-Sh3"]
+        assert services[IMAGE_SEQUENCE] == ["Pr0-Ep0-Seq1"]
+        [results] = services[RENDER_PROJECT]
+        assert len(results) == 4
+        assert _ready(readiness, "job-5")
+
+    def test_render_only(self, services, readiness):
+        old, new = _project(sequences=2), _project(sequences=1)
+        process_job.delay("job-6", old)
+        new["episodes"][0]["sequences"][0]["style"]["music"] = "drums"
+        services[RENDER_PROJECT].clear()
+
+        worker.process_update.delay("job-6", new, self._diff(old, new))
+
+        assert services[RENDER_PROJECT] == [[]]
+        # the removed sequence and its shots no longer count towards the progress
+        assert sorted(readiness.statuses("job-6")) == [
+            "Pr0-Ep0-Seq0", "Pr0-Ep0-Seq0-Sh0", "Pr0-Ep0-Seq0-Sh1", "Pr0-Ep0-Seq0-Sh2",
+        ]
+        assert _ready(readiness, "job-6")
+
+    def test_no_changes(self, services):
+        project = _project()
+        assert worker.process_update.delay("job-7", project, self._diff(project, project)).get() is None
+        assert services[RENDER_PROJECT] == []
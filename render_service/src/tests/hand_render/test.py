@@ -1,43 +1,82 @@
 import asyncio
+import os
 
+from cache_client.rate_limit import openai_limiter_from_env
+from scenario_dto.index import ProjectIndex
 from scenarist.scenarist import ScenarioGenerator
+from tts_processors.ambient import AmbientBeds
+from tts_processors.audio_contract import check_audio_contract
+from tts_processors.calibration import DurationCalibrator, SpeechRateStore
 from tts_processors.silero_tts_processor import SileroTTSProcessor
+from tts_processors.text_frontend import TextFrontend
+from tts_processors.waveform_cache import WaveformCache
 
+SPEED = 0.87
 
-async def process_all(a):
-    for ep in a.episodes:
-        for seq in ep.sequences:
-            print("Queued", seq.hierarchy_id)
-            for sh in seq.shots:
-                print("Shot", sh.hierarchy_id)
 
-                tts = SileroTTSProcessor(speaker="eugene")
+async def process_all(a, target_seconds=None):
+    calibrator = DurationCalibrator(SpeechRateStore())
+    index = ProjectIndex(a)
+    if target_seconds is not None:
+        # trim overshooting sequences before spending any TTS time on them
+        estimates = calibrator.check(index.iter_sequences(), target_seconds, "eugene", speed=SPEED)
+        for estimate in estimates:
+            if estimate.exceeds:
+                print(f"Trim {estimate.hierarchy_id}: {estimate.seconds:.1f}s > {estimate.budget:.1f}s")
+                sequence = calibrator.trim(index[estimate.hierarchy_id], estimate.budget, "eugene", speed=SPEED)
+                episode = index.parent(sequence)
+                episode.sequences = [
+                    sequence if seq.hierarchy_id == sequence.hierarchy_id else seq for seq in episode.sequences
+                ]
+        index = ProjectIndex(a)
 
-                # synthesis
-                audio = tts.synthesize(sh.text)
+    # synthesize at the rate and layout of the render profile so nothing downstream resamples
+    audio_format = a.render.audio
+    for resample in check_audio_contract(audio_format.sample_rate, speed=SPEED, output_codec=audio_format.codec):
+        print("Resample", resample)
 
-                hierarchy_id = str(sh.hierarchy_id)
+    # re-runs only synthesize the sentences that changed
+    tts = SileroTTSProcessor(
+        speaker="eugene",
+        sample_rate=audio_format.sample_rate,
+        channels=audio_format.channels,
+        calibrator=calibrator,
+        frontend=TextFrontend(),
+        waveform_cache=WaveformCache(),
+    )
+    for seq, shots in index.iter_sequence_shots():
+        print("Queued", seq.hierarchy_id)
+        for sh in shots:
+            print("Shot", sh.hierarchy_id)
+
+            # synthesis with the backend and speaker picked from the shot voice
+            audio = tts.synthesize(sh.text, voice=sh.style.voice)
+
+            hierarchy_id = str(sh.hierarchy_id)
 
-                # save raw audio to S3
-                raw_key = await tts.save_audio(audio, hierarchy_id, variant="raw")
+            # save raw audio to S3
+            raw_key = await tts.save_audio(audio, hierarchy_id, variant="raw")
+            print("Raw key:", raw_key)
 
-                # normalize, change speed, add reverb using the raw audio from S3
-                final_key = await tts.process_audio(
-                    None, hierarchy_id, speed=0.87, reverb=True
-                )
+    # one loudness for the whole project: measure all raw takes, then apply
+    # one gain per shot while changing speed and adding reverb
+    await tts.normalize_project([sh.hierarchy_id for sh in index.shots], speed=SPEED, reverb=True)
 
-                print("Raw key:", raw_key)
-                print("Final key:", final_key)
+    # ambient bed per sequence, ducked under the narration; beds are cached per music style
+    beds = AmbientBeds(cache=WaveformCache(os.getenv("AMBIENT_CACHE_DIR", ".ambient_cache")))
+    for seq, shots in index.iter_sequence_shots():
+        await tts.mix_sequence(seq.hierarchy_id, [sh.hierarchy_id for sh in shots], seq.style.music, beds)
 
 
 async def main():
     # Generate scenario
-    s_gen = ScenarioGenerator()
+    # with REDIS_URL the OpenAI limit is shared by every process running this pipeline
+    s_gen = ScenarioGenerator(rate_limiter=openai_limiter_from_env())
     a = await s_gen.gen(
         "Roman Empire", "Documentary", 30, is_backup=True
     )
     # Generate images for all sequences
-    await process_all(a)
+    await process_all(a, target_seconds=30)
 
 
 if __name__ == "__main__":
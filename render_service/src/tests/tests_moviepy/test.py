@@ -9,6 +9,7 @@ from typing import Callable, Mapping, MutableMapping
 
 from botocore.exceptions import ClientError
 from moviepy import AudioFileClip, CompositeVideoClip, ImageClip, concatenate_videoclips
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 
 # Make the DTO and saver packages available without requiring installation
 ROOT_DIR = Path(__file__).resolve().parents[4]
@@ -21,15 +22,18 @@ for module_path in (DTO_SRC, ASSETS_SRC):
         if path_str not in sys.path:
             sys.path.append(path_str)
 
-from scenario_dto.dto import ProjectDTO  # pylint: disable=wrong-import-position
+from scenario_dto.dto import AudioFormat, ProjectDTO  # pylint: disable=wrong-import-position
+from scenario_dto.index import ProjectIndex  # pylint: disable=wrong-import-position
 from saver.s3_saver import S3AsyncSaver  # pylint: disable=wrong-import-position
 
-FPS = 30
 DEFAULT_S3_ENDPOINT = os.getenv("S3_ENDPOINT_URL", "http://127.0.0.1:9000")
 DEFAULT_S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY", "minio")
 DEFAULT_S3_SECRET_KEY = os.getenv("S3_SECRET_KEY", "minio123")
 DEFAULT_S3_REGION = os.getenv("S3_REGION", "us-east-1")
 DEFAULT_S3_BUCKET = os.getenv("S3_BUCKET", "demo")
+# shot audio is stored with the render codec of the TTS service, moviepy decodes it through ffmpeg
+RENDER_CODEC = os.getenv("TTS_RENDER_CODEC", "opus")
+SHOT_AUDIO_EXTENSION = "m4a" if RENDER_CODEC == "aac" else RENDER_CODEC
 
 
 class S3AssetCollector:
@@ -47,7 +51,12 @@ class S3AssetCollector:
     @staticmethod
     def _shot_audio_key(shot_id) -> str:
         name = str(shot_id)
-        return f"{name.replace('-', '/')}/{name}.wav"
+        return f"{name.replace('-', '/')}/{name}.{SHOT_AUDIO_EXTENSION}"
+
+    @staticmethod
+    def _sequence_mix_key(sequence_id) -> str:
+        name = str(sequence_id)
+        return f"{name.replace('-', '/')}/{name}_mix.{SHOT_AUDIO_EXTENSION}"
 
     def add_asset(self, dto, key_builder: Callable[[object], str]) -> Path:
         """Register a DTO to download using the provided key builder."""
@@ -96,6 +105,16 @@ class S3AssetCollector:
         return dict(self._targets)
 
 
+def audio_resample(path: Path, audio_format: AudioFormat) -> str | None:
+    """Describe the conversion ffmpeg applies to ``path`` for ``audio_format``, ``None`` if it matches."""
+
+    infos = ffmpeg_parse_infos(str(path))
+    rate = infos.get("audio_fps")
+    if rate and rate != audio_format.sample_rate:
+        return f"{path.name}: {rate} Hz -> {audio_format.sample_rate} Hz"
+    return None
+
+
 def render_project(
     project: ProjectDTO,
     *,
@@ -105,8 +124,13 @@ def render_project(
     secret_key: str = DEFAULT_S3_SECRET_KEY,
     region: str = DEFAULT_S3_REGION,
     output: str | Path = "output.mp4",
+    mixed: bool = True,
 ) -> Path:
-    """Render a project into a video using assets stored in S3."""
+    """Render a project into a video using assets stored in S3.
+
+    With ``mixed`` every sequence plays its pre-mixed narration and ambient
+    track (``SileroTTSProcessor.mix_sequence``), otherwise the bare shot audio.
+    """
 
     if not project.episodes:
         raise ValueError("Project does not contain any episodes to render")
@@ -116,23 +140,29 @@ def render_project(
     with TemporaryDirectory() as tmpdir_name:
         tmpdir = Path(tmpdir_name)
         collector = S3AssetCollector(tmpdir)
-        has_shots = False
+        index = ProjectIndex(project)
 
-        for episode in project.episodes:
-            for sequence in episode.sequences:
+        if not index.shots:
+            raise ValueError("Project does not contain any shots to render")
+
+        # (image key, audio key) of every clip in render order
+        segments: list[tuple[str, str]] = []
+        for sequence, shots in index.iter_sequence_shots():
+            image_key = S3AssetCollector._sequence_image_key(sequence.hierarchy_id)
+            collector.add_asset(
+                sequence.hierarchy_id,
+                S3AssetCollector._sequence_image_key,
+            )
+            if mixed:
+                collector.add_asset(sequence.hierarchy_id, S3AssetCollector._sequence_mix_key)
+                segments.append((image_key, S3AssetCollector._sequence_mix_key(sequence.hierarchy_id)))
+                continue
+            for shot in shots:
                 collector.add_asset(
-                    sequence.hierarchy_id,
-                    S3AssetCollector._sequence_image_key,
+                    shot.hierarchy_id,
+                    S3AssetCollector._shot_audio_key,
                 )
-                for shot in sequence.shots:
-                    has_shots = True
-                    collector.add_asset(
-                        shot.hierarchy_id,
-                        S3AssetCollector._shot_audio_key,
-                    )
-
-        if not has_shots:
-            raise ValueError("Project does not contain any shots to render")
+                segments.append((image_key, S3AssetCollector._shot_audio_key(shot.hierarchy_id)))
 
         downloaded_assets = asyncio.run(
             collector.download(
@@ -146,32 +176,41 @@ def render_project(
 
         clips: list[CompositeVideoClip] = []
         audio_clips: list[AudioFileClip] = []
-
-        for episode in sorted(project.episodes, key=lambda ep: ep.hierarchy_id.episode):
-            for sequence in sorted(episode.sequences, key=lambda seq: seq.hierarchy_id.sequence):
-                image_key = S3AssetCollector._sequence_image_key(sequence.hierarchy_id)
-                image_path = downloaded_assets[image_key]
-                for shot in sorted(sequence.shots, key=lambda sh: sh.hierarchy_id.shot):
-                    audio_key = S3AssetCollector._shot_audio_key(shot.hierarchy_id)
-                    audio_path = downloaded_assets[audio_key]
-                    audio_clip = AudioFileClip(str(audio_path))
-                    audio_clips.append(audio_clip)
-                    clip = (
-                        ImageClip(str(image_path))
-                        .with_duration(audio_clip.duration)
-                        .with_audio(audio_clip)
-                        .with_fps(FPS)
-                        .resized(height=1080)
-                    )
-                    frame = CompositeVideoClip(
-                        [clip.with_position("center")],
-                        size=(1920, 1080),
-                        bg_color=(0, 0, 0),
-                    )
-                    clips.append(frame)
+        profile = project.render
+        audio_format = profile.audio
+
+        for image_key, audio_key in segments:
+            image_path = downloaded_assets[image_key]
+            audio_path = downloaded_assets[audio_key]
+            resample = audio_resample(audio_path, audio_format)
+            if resample:
+                print("Resample", resample)
+            # decode at the profile rate; TTS already stored it at that rate, so ffmpeg does not resample
+            audio_clip = AudioFileClip(str(audio_path), fps=audio_format.sample_rate)
+            audio_clips.append(audio_clip)
+            clip = (
+                ImageClip(str(image_path))
+                .with_duration(audio_clip.duration)
+                .with_audio(audio_clip)
+                .with_fps(profile.fps)
+                .resized(height=profile.height)
+            )
+            frame = CompositeVideoClip(
+                [clip.with_position("center")],
+                size=(profile.width, profile.height),
+                bg_color=(0, 0, 0),
+            )
+            clips.append(frame)
 
         final = concatenate_videoclips(clips, method="chain")
-        final.write_videofile(str(output_path), fps=FPS, codec="libx264", audio_codec="aac")
+        final.write_videofile(
+            str(output_path),
+            fps=profile.fps,
+            codec="libx264",
+            audio_codec=audio_format.codec,
+            audio_fps=audio_format.sample_rate,
+            audio_bitrate=audio_format.bitrate,
+        )
         final.close()
 
         for clip in clips:
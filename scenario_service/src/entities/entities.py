@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 
 import yaml
 from uuid import UUID
@@ -28,8 +29,8 @@ STYLES = load_styles()
 
 class ShotEntity(ShotDTO):
     @classmethod
-    def example(cls) -> "ShotEntity":
-        data = STYLES["ShotEntity"]
+    def example(cls, styles: Optional[dict] = None) -> "ShotEntity":
+        data = (styles or STYLES)["ShotEntity"]
         return cls(
             id=UUID(int=0),
             title=data["title"],
@@ -41,39 +42,39 @@ class ShotEntity(ShotDTO):
 
 class SequenceEntity(SequenceDTO):
     @classmethod
-    def example(cls) -> "SequenceEntity":
-        data = STYLES["SequenceEntity"]
+    def example(cls, styles: Optional[dict] = None) -> "SequenceEntity":
+        data = (styles or STYLES)["SequenceEntity"]
         return cls(
             id=UUID(int=0),
             title=data["title"],
             style=SequenceStyle(**data["style"]),
             hierarchy_id=SequenceId(project=0, episode=0, sequence=0),
-            shots=[ShotEntity.example()],
+            shots=[ShotEntity.example(styles)],
         )
 
 
 class EpisodeEntity(EpisodeDTO):
     @classmethod
-    def example(cls) -> "EpisodeEntity":
-        data = STYLES["EpisodeEntity"]
+    def example(cls, styles: Optional[dict] = None) -> "EpisodeEntity":
+        data = (styles or STYLES)["EpisodeEntity"]
         return cls(
             id=UUID(int=0),
             title=data["title"],
             style=data["style"],
             hierarchy_id=EpisodeId(project=0, episode=0),
-            sequences=[SequenceEntity.example()],
+            sequences=[SequenceEntity.example(styles)],
         )
 
 
 class ProjectEntity(ProjectDTO):
     @classmethod
-    def example(cls) -> "ProjectEntity":
-        data = STYLES["ProjectEntity"]
+    def example(cls, styles: Optional[dict] = None) -> "ProjectEntity":
+        data = (styles or STYLES)["ProjectEntity"]
         return cls(
             id=UUID(int=0),
             title=data["title"],
             style=data["style"],
             hierarchy_id=ProjectId(project=0),
-            episodes=[EpisodeEntity.example()],
+            episodes=[EpisodeEntity.example(styles)],
         )
 
@@ -1,7 +1,7 @@
 import abc
-import base64
+import binascii
 from pathlib import Path
-from typing import Optional, Literal, Union, List
+from typing import Optional, Literal, Union, List, TYPE_CHECKING
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
 from openai.types.chat import (
@@ -9,6 +9,9 @@ from openai.types.chat import (
     ChatCompletionUserMessageParam,
 )
 
+if TYPE_CHECKING:
+    from cache_client.rate_limit import RateLimiter
+
 load_dotenv()
 
 
@@ -42,20 +45,35 @@ class ChatGPTAPIAsync(GPTAPI):
         model: The model identifier (e.g., ``gpt-5-nano``).
         gpt_role: Default system role instruction.
         timeout: Request timeout in seconds.
+        rate_limiter: Optional shared limiter applied per model before each request.
     """
 
-    def __init__(self, model: str = "gpt-5-nano", gpt_role: Optional[str] = None, timeout: float = 60.0):
+    def __init__(
+        self,
+        model: str = "gpt-5-nano",
+        gpt_role: Optional[str] = None,
+        timeout: float = 60.0,
+        rate_limiter: Optional["RateLimiter"] = None,
+    ):
         """Initialize the async GPT API client.
 
         Args:
             model: Model identifier.
             gpt_role: Default system role instruction.
             timeout: Request timeout in seconds.
+            rate_limiter: Optional limiter from ``cache_client``. Its state lives in
+                Redis, so the limit holds across all worker processes.
         """
         self.client = AsyncOpenAI()
         self.model = model
         self.gpt_role = gpt_role
         self.timeout = timeout
+        self.rate_limiter = rate_limiter
+
+    async def _throttle(self, model: str, cost: int = 1) -> None:
+        """Wait for the shared per-model rate limit, if one is configured."""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(f"openai:{model}", cost, timeout=self.timeout)
 
     async def ask(self, message: str, gpt_role: Optional[str] = None) -> str:
         """Send a message to the GPT model and return its response.
@@ -80,6 +98,8 @@ class ChatGPTAPIAsync(GPTAPI):
             messages.append(ChatCompletionSystemMessageParam(role="system", content=role))
         messages.append(ChatCompletionUserMessageParam(role="user", content=message))
 
+        await self._throttle(self.model)
+
         # Perform asynchronous request to OpenAI API
         response = await self.client.chat.completions.create(
             model=self.model,
@@ -148,14 +168,18 @@ class ChatGPTAPIAsync(GPTAPI):
         if output_compression is not None:
             kwargs["output_compression"] = int(output_compression)
 
+        await self._throttle(model, cost=n)
+
         # Perform async request to OpenAI Images API
         resp = await self.client.images.generate(
             **kwargs,
             timeout=self.timeout,
         )
 
-        # Decode base64 JSON to raw image bytes
-        imgs: List[bytes] = [base64.b64decode(d.b64_json) for d in resp.data]
+        # Decode base64 JSON to raw image bytes; a2b_base64 takes the str as is,
+        # without an intermediate ASCII copy, and the encoded strings are dropped right after
+        imgs: List[bytes] = [binascii.a2b_base64(d.b64_json) for d in resp.data]
+        del resp
 
         # Optionally save to disk
         if output_path:
@@ -0,0 +1,39 @@
+import math
+from dataclasses import dataclass
+
+# narration speed of the TTS voices, words per second
+WORDS_PER_SECOND = {"ru": 2.0, "en": 2.5}
+DEFAULT_WORDS_PER_SECOND = 2.2
+# output tokens per narrated word
+TOKENS_PER_WORD = {"ru": 2.2, "en": 1.3}
+DEFAULT_TOKENS_PER_WORD = 2.0
+# JSON structure, titles and style descriptions around the narration text
+JSON_OVERHEAD = 1.6
+DEFAULT_MAX_OUTPUT_TOKENS = 6000
+
+
+def estimate_output_tokens(duration: int, lang: str = "ru") -> int:
+    """Estimate completion tokens of a scenario with ``duration`` seconds of narration."""
+    words = duration * WORDS_PER_SECOND.get(lang, DEFAULT_WORDS_PER_SECOND)
+    return math.ceil(words * TOKENS_PER_WORD.get(lang, DEFAULT_TOKENS_PER_WORD) * JSON_OVERHEAD)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    index: int
+    total: int
+    duration: int
+    tokens: int
+
+
+def plan_chunks(duration: int, lang: str = "ru", max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS) -> list[Chunk]:
+    """Split ``duration`` into episode-sized chunks that each fit ``max_output_tokens``."""
+    if duration <= 0:
+        raise ValueError(f"duration must be positive, got {duration}")
+    if max_output_tokens <= 0:
+        raise ValueError(f"max_output_tokens must be positive, got {max_output_tokens}")
+    total = max(1, math.ceil(estimate_output_tokens(duration, lang) / max_output_tokens))
+    total = min(total, duration)
+    base, extra = divmod(duration, total)
+    durations = [base + (i < extra) for i in range(total)]
+    return [Chunk(i, total, d, estimate_output_tokens(d, lang)) for i, d in enumerate(durations)]
@@ -2,59 +2,148 @@ import asyncio
 import json
 from pathlib import Path
 from pprint import pprint
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Optional
 from uuid import uuid4
-from copy import copy
+from copy import copy, deepcopy
 
 import yaml
 
 from gpt_api.chatgpt_api import ChatGPTAPIAsync
 from entities.entities import ProjectEntity
+from scenario_dto.serialization import read_project, write_project
+from scenarist.chunking import DEFAULT_MAX_OUTPUT_TOKENS, Chunk, plan_chunks
+from scenarist.templates import count_tokens, deep_exclude_key, registry
 
+if TYPE_CHECKING:
+    from cache_client.rate_limit import RateLimiter
 
-def deep_exclude_key(obj: Any, key: str) -> Any:
-    if isinstance(obj, dict):
-        return {k: deep_exclude_key(v, key) for k, v in obj.items() if k != key}
-    if isinstance(obj, list):
-        return [deep_exclude_key(v, key) for v in obj]
-    return obj
+# files with this suffix use the JSON-lines project format instead of YAML
+PROJECT_SUFFIX = ".gvp"
 
-def get_json_scheme_example():
-    data_base = ProjectEntity.example().model_dump()
-    data = deep_exclude_key(data_base, "id")
-    json_scenario_schema = deep_exclude_key(data, "hierarchy_id")
-    return json_scenario_schema
+
+def get_json_scheme_example() -> dict:
+    # a copy of the memoized example, callers may modify it
+    return deepcopy(registry.schema())
+
+
+OUTLINE_ROLE = """
+                You plan multi-part educational and entertainment videos.
+                Return ONLY valid JSON without explanations and Markdown:
+                    {"episodes": [{"title": "...", "summary": "..."}]}
+                Each summary is 1–2 sentences in English.
+                """
 
 
 class ScenarioGenerator:
     entities = ["episodes", "sequences", "shots"]
+    # prompt tokens (system role + user prompt) of the last generation, summed over its requests
+    prompt_tokens = 0
+
+    def __init__(
+        self,
+        max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+        max_concurrency: int = 4,
+        attempts: int = 2,
+        rate_limiter: Optional["RateLimiter"] = None,
+    ):
+        """
+        Args:
+            max_output_tokens: Completion token budget of one request. Longer
+                scenarios are generated as several episodes in parallel.
+            max_concurrency: Maximum number of parallel requests.
+            attempts: Tries per request; a failed chunk is retried on its own.
+            rate_limiter: Optional shared limiter passed to every ``ChatGPTAPIAsync``,
+                e.g. ``cache_client.rate_limit.openai_limiter_from_env()``.
+        """
+        if attempts < 1:
+            raise ValueError("attempts must be >= 1")
+        self.max_output_tokens = max_output_tokens
+        self.max_concurrency = max_concurrency
+        self.attempts = attempts
+        self.rate_limiter = rate_limiter
+
+    async def _ask(self, role: str, prompt: str) -> str:
+        api = ChatGPTAPIAsync(gpt_role=role, timeout=200, rate_limiter=self.rate_limiter)
+        return await api.ask(prompt)
+
+    async def _ask_json(self, role: str, prompt: str, check: Callable[[dict], None] | None = None) -> dict:
+        """Ask for JSON, retrying this request alone if it fails, is invalid or fails ``check``."""
+        for attempt in range(1, self.attempts + 1):
+            try:
+                data = json.loads(await self._ask(role, prompt))
+                if check is not None:
+                    check(data)
+                return data
+            except Exception:  # pylint: disable=broad-except
+                if attempt >= self.attempts:
+                    raise
 
     async def _gen(self, theme: str, style: str, duration: int, lang="ru", schema: dict = None):
-        role = f"""
-                You are a scriptwriter for educational and entertainment videos. 
-                Strictly adhere to the JSON response schema.
-                Requirements:
-                1) Return ONLY valid JSON without explanations and Markdown.
-                2) Maintain the hierarchy:  project -> episodes -> sequences -> shots
-                    In each project there are episodes; 
-                    in each episode there are 3–7 sequences; 
-                    in each sequence there are 5–10 shots; 
-                    in each shot there are 3–5 text sentences.
-                3) Do not add fields outside the schema.
-                4) All language: en. Shot text language: {lang}.
-                5) The style field describes what should be in this field. Fill it in with the appropriate data.
-                Scheme:
-                    {str(schema)}
-                """
-        api = ChatGPTAPIAsync(gpt_role=role, timeout=200)
+        template = registry.get(lang, schema=schema)
         prompt = f"""
                 Topic: {theme}
                 Style/reference: {style}
                 Create text in shots for {duration} seconds of aloud reading 
                 """
-        res = await api.ask(prompt)
+        self.prompt_tokens = template.role_tokens + count_tokens(prompt)
+        res = await self._ask(template.role, prompt)
         return res
 
+    async def _gen_outline(self, theme: str, style: str, chunks: list[Chunk]) -> list[dict]:
+        prompt = f"""
+                Topic: {theme}
+                Style/reference: {style}
+                Plan exactly {len(chunks)} consecutive episodes of one video,
+                about {chunks[0].duration} seconds of narration each.
+                """
+        def check(data: dict) -> None:
+            if len(data.get("episodes", [])) != len(chunks):
+                raise ValueError(f"Outline must have {len(chunks)} episodes")
+
+        self.prompt_tokens += count_tokens(OUTLINE_ROLE) + count_tokens(prompt)
+        return (await self._ask_json(OUTLINE_ROLE, prompt, check))["episodes"]
+
+    async def _gen_chunk(
+        self, theme: str, style: str, chunk: Chunk, outline: list[dict], lang: str, schema: dict | None
+    ) -> dict:
+        template = registry.get(lang, schema=schema)
+        plan = "\n".join(
+            f"                    {i + 1}. {part.get('title', '')}: {part.get('summary', '')}"
+            for i, part in enumerate(outline)
+        )
+        prompt = f"""
+                Topic: {theme}
+                Style/reference: {style}
+                The video consists of {chunk.total} episodes:
+{plan}
+                Write only episode {chunk.index + 1}, continuing the previous one
+                and leading to the next one. Return a project with exactly one episode.
+                Create text in shots for {chunk.duration} seconds of aloud reading
+                """
+        def check(data: dict) -> None:
+            if len(data.get("episodes", [])) != 1:
+                raise ValueError(f"Chunk {chunk.index + 1} must contain exactly one episode")
+
+        self.prompt_tokens += template.role_tokens + count_tokens(prompt)
+        return await self._ask_json(template.role, prompt, check)
+
+    async def _gen_chunked(
+        self, theme: str, style: str, chunks: list[Chunk], lang: str, schema: dict | None
+    ) -> dict:
+        """Generate every chunk as one episode in parallel and join them into one project."""
+        self.prompt_tokens = 0
+        outline = await self._gen_outline(theme, style, chunks)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(chunk: Chunk) -> dict:
+            async with semaphore:
+                return await self._gen_chunk(theme, style, chunk, outline, lang, schema)
+
+        parts = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        project = parts[0]
+        project["episodes"] = [part["episodes"][0] for part in parts]
+        return project
+
     def _update_dict_fields(self, data: dict, path: dict | None = None, id_factory=uuid4) -> None:
         """
         Mutates `data`:
@@ -81,20 +170,29 @@ class ScenarioGenerator:
 
     async def gen(self, theme: str, style: str, duration: int, lang="ru", schema: dict = None, is_backup: bool = False, file_path: str = "ans.yaml"):
         if not is_backup:
-            if not schema:
-                ans = await self._gen(theme, style, duration, schema=get_json_scheme_example(), lang=lang)
+            # without a schema the memoized styles.yml example is used
+            chunks = plan_chunks(duration, lang, self.max_output_tokens)
+            if len(chunks) == 1:
+                ans = await self._gen(theme, style, duration, schema=schema or None, lang=lang)
+                data = json.loads(ans)
             else:
-                ans = await self._gen(theme, style, duration, schema=schema, lang=lang)
-            data = json.loads(ans)
+                data = await self._gen_chunked(theme, style, chunks, lang, schema or None)
             self._update_dict_fields(data)
+        elif Path(file_path).suffix == PROJECT_SUFFIX:
+            return read_project(file_path, ProjectEntity)
         else:
+            # YAML backups can be edited by hand, so they are validated like any input
             data = yaml.safe_load(Path(file_path).read_text(encoding="utf-8"))
+            return ProjectEntity.model_validate(data)
 
         model_data = ProjectEntity.model_validate(data)
         return model_data
 
     async def gen_to_file(self, theme: str, style: str, duration: int, lang="ru", schema: dict = None, file_path: str = "ans.yaml"):
         ans = await self.gen(theme, style, duration, schema=schema, lang=lang)
+        if Path(file_path).suffix == PROJECT_SUFFIX:
+            write_project(ans, file_path)
+            return
 
         data = ans.model_dump(mode="json")
         with open(file_path, "w", encoding="utf-8") as f:
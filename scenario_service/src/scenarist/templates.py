@@ -0,0 +1,155 @@
+import hashlib
+import json
+import math
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional
+
+from entities.entities import STYLES_PATH, ProjectEntity, load_styles
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+ROLE_TEMPLATE = """
+                You are a scriptwriter for educational and entertainment videos.
+                Strictly adhere to the JSON response schema.
+                Requirements:
+                1) Return ONLY valid JSON without explanations and Markdown.
+                2) Maintain the hierarchy:  project -> episodes -> sequences -> shots
+                    In each project there are episodes;
+                    in each episode there are 3–7 sequences;
+                    in each sequence there are 5–10 shots;
+                    in each shot there are 3–5 text sentences.
+                3) Do not add fields outside the schema.
+                4) All language: en. Shot text language: {lang}.
+                5) The style field describes what should be in this field. Fill it in with the appropriate data.
+                Scheme:
+                    {schema}
+                """
+
+
+def deep_exclude_key(obj, key: str):
+    if isinstance(obj, dict):
+        return {k: deep_exclude_key(v, key) for k, v in obj.items() if k != key}
+    if isinstance(obj, list):
+        return [deep_exclude_key(v, key) for v in obj]
+    return obj
+
+
+def build_schema_example(styles: Optional[dict] = None) -> dict:
+    """Build the example project the model has to fill in, without ids and render settings."""
+    data_base = ProjectEntity.example(styles).model_dump(exclude={"render"})
+    data = deep_exclude_key(data_base, "id")
+    return deep_exclude_key(data, "hierarchy_id")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Return the number of prompt tokens in ``text``.
+
+    Uses ``tiktoken`` when it is installed, otherwise estimates 4 characters per token.
+    """
+    encoding = _encoding()
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text))
+
+
+def _fingerprint(data: dict) -> str:
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A rendered system prompt for one language and schema, with its token cost."""
+
+    lang: str
+    schema: dict
+    role: str
+    role_tokens: int
+
+
+class PromptRegistry:
+    """Builds each schema example and system prompt once per process.
+
+    Templates are keyed by language and the entity style set (``styles.yml``
+    content or an explicit schema). All templates are dropped when the
+    modification time of ``styles.yml`` changes.
+    """
+
+    def __init__(self, styles_path: Path = STYLES_PATH, counter: Callable[[str], int] = count_tokens):
+        self._styles_path = Path(styles_path)
+        self._counter = counter
+        self._lock = threading.Lock()
+        self._mtime: Optional[int] = None
+        self._styles: dict = {}
+        self._styles_key = ""
+        self._schemas: dict[str, dict] = {}
+        self._templates: dict[tuple[str, str], PromptTemplate] = {}
+        self.builds = 0
+
+    def _refresh(self) -> None:
+        mtime = self._styles_path.stat().st_mtime_ns
+        if mtime != self._mtime:
+            self._styles = load_styles(self._styles_path)
+            self._styles_key = _fingerprint(self._styles)
+            self._schemas.clear()
+            self._templates.clear()
+            self._mtime = mtime
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._mtime = None
+
+    def schema(self, styles: Optional[dict] = None) -> dict:
+        """Return the schema example for ``styles`` (the ``styles.yml`` set by default).
+
+        The returned dict is shared, do not modify it.
+        """
+        with self._lock:
+            self._refresh()
+            return self._schema(styles)
+
+    def _schema(self, styles: Optional[dict]) -> dict:
+        key = self._styles_key if styles is None else _fingerprint(styles)
+        schema = self._schemas.get(key)
+        if schema is None:
+            schema = self._schemas[key] = build_schema_example(styles or self._styles)
+        return schema
+
+    def get(self, lang: str = "ru", styles: Optional[dict] = None, schema: Optional[dict] = None) -> PromptTemplate:
+        """Return the system prompt template for ``lang``.
+
+        An explicit ``schema`` takes precedence over ``styles``.
+        """
+        with self._lock:
+            self._refresh()
+            if schema is not None:
+                key = (lang, "schema:" + _fingerprint(schema))
+            else:
+                key = (lang, self._styles_key if styles is None else _fingerprint(styles))
+            template = self._templates.get(key)
+            if template is None:
+                schema = schema if schema is not None else self._schema(styles)
+                role = ROLE_TEMPLATE.format(lang=lang, schema=str(schema))
+                template = PromptTemplate(lang=lang, schema=schema, role=role, role_tokens=self._counter(role))
+                self._templates[key] = template
+                self.builds += 1
+            return template
+
+
+registry = PromptRegistry()
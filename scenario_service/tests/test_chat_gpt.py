@@ -1,8 +1,12 @@
+from types import SimpleNamespace
 from typing import Optional
 
 import pytest
 
+from cache_client.memory import InMemoryRedis
+from cache_client.rate_limit import RateLimitExceeded, TokenBucketLimiter
 from gpt_api.chatgpt_api import ChatGPTAPIAsync
+from scenarist import scenarist
 
 
 # @pytest.mark.skip("Skip the test because you have to pay)")
@@ -15,3 +19,55 @@ class TestChatGPT:
     async def test_ask(self, message: str, expected: Optional[str]):
         api = ChatGPTAPIAsync()
         assert await api.ask(message) == expected
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = SimpleNamespace(content="A")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class TestThrottle:
+    @pytest.fixture
+    def limiter(self):
+        return TokenBucketLimiter(InMemoryRedis(clock=lambda: 1000.0), rate=0.1, capacity=2)
+
+    @pytest.fixture
+    def api(self, limiter, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        api = ChatGPTAPIAsync(model="gpt-test", timeout=1, rate_limiter=limiter)
+        api.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+        return api
+
+    @pytest.mark.asyncio
+    async def test_requests_wait_for_the_shared_limit(self, api, limiter):
+        assert await api.ask("first") == "A"
+        assert await api.ask("second") == "A"
+        # the bucket refills in 10 s, longer than the request timeout
+        with pytest.raises(RateLimitExceeded):
+            await api.ask("third")
+        assert len(api.client.chat.completions.calls) == 2
+        # the limit is kept per model
+        assert (await limiter.try_acquire("openai:other-model"))[0]
+
+    @pytest.mark.asyncio
+    async def test_without_limiter(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        api = ChatGPTAPIAsync()
+        await api._throttle("gpt-test", cost=100)
+
+    @pytest.mark.asyncio
+    async def test_scenario_generator_passes_limiter(self, api, limiter, monkeypatch):
+        clients = []
+
+        def client(**kwargs):
+            clients.append(kwargs)
+            return api
+
+        monkeypatch.setattr(scenarist, "ChatGPTAPIAsync", client)
+        await scenarist.ScenarioGenerator(rate_limiter=limiter)._ask("role", "prompt")
+        assert clients[0]["rate_limiter"] is limiter
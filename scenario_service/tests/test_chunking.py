@@ -0,0 +1,101 @@
+import json
+import re
+
+import pytest
+
+from entities.entities import ProjectEntity
+from scenarist.chunking import estimate_output_tokens, plan_chunks
+from scenarist.scenarist import OUTLINE_ROLE, ScenarioGenerator
+from scenarist.templates import count_tokens, registry
+
+
+def _episode(title: str) -> dict:
+    shot = {"title": "shot", "style": {"voice": "calm"}, "text": "text"}
+    sequence = {"title": "seq", "style": {"image": "forum", "music": "ambient"}, "shots": [shot]}
+    return {"title": title, "style": "calm", "sequences": [sequence]}
+
+
+class FakeGenerator(ScenarioGenerator):
+    """Answers from canned JSON instead of calling OpenAI."""
+
+    def __init__(self, *args, failures: int = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prompts: list[str] = []
+        self.failures = failures
+
+    async def _ask(self, role: str, prompt: str) -> str:
+        self.prompts.append(prompt)
+        if role == OUTLINE_ROLE:
+            total = int(re.search(r"exactly (\d+) consecutive", prompt).group(1))
+            return json.dumps({"episodes": [{"title": f"part {i}", "summary": "s"} for i in range(total)]})
+        match = re.search(r"Write only episode (\d+)", prompt)
+        if match and match.group(1) == "2" and self.failures:
+            self.failures -= 1
+            return "not json"
+        number = match.group(1) if match else "1"
+        return json.dumps({"title": "Rome", "style": "documentary", "episodes": [_episode(f"episode {number}")]})
+
+
+class TestPlanChunks:
+    def test_short_scenario_is_one_chunk(self):
+        [chunk] = plan_chunks(30, "ru", max_output_tokens=6000)
+        assert chunk.duration == 30 and chunk.total == 1
+
+    @pytest.mark.parametrize("duration,lang", [(600, "ru"), (1801, "en"), (3600, "de")])
+    def test_chunks_fit_budget(self, duration, lang):
+        chunks = plan_chunks(duration, lang, max_output_tokens=2000)
+        assert sum(c.duration for c in chunks) == duration
+        assert all(c.tokens <= 2000 for c in chunks)
+        assert len(chunks) == -(-estimate_output_tokens(duration, lang) // 2000)
+
+    def test_languages_differ(self):
+        assert estimate_output_tokens(600, "ru") > estimate_output_tokens(600, "en")
+
+    @pytest.mark.parametrize("duration,budget", [(0, 100), (10, 0)])
+    def test_invalid(self, duration, budget):
+        with pytest.raises(ValueError):
+            plan_chunks(duration, "ru", budget)
+
+
+class TestChunkedGeneration:
+    @pytest.mark.asyncio
+    async def test_single_request_within_budget(self):
+        gen = FakeGenerator(max_output_tokens=100_000)
+        project = await gen.gen("Rome", "Documentary", 60)
+        assert len(gen.prompts) == 1
+        assert isinstance(project, ProjectEntity)
+
+    @pytest.mark.asyncio
+    async def test_assembles_episodes_in_order(self):
+        gen = FakeGenerator(max_output_tokens=1000)
+        project = await gen.gen("Rome", "Documentary", 600)
+        total = len(plan_chunks(600, "ru", 1000))
+        assert total > 1
+        assert [ep.title for ep in project.episodes] == [f"episode {i + 1}" for i in range(total)]
+        assert [str(ep.hierarchy_id) for ep in project.episodes] == [f"Pr0-Ep{i}" for i in range(total)]
+        # every chunk sees the outline of the whole video
+        assert all("part 0" in p and f"part {total - 1}" in p for p in gen.prompts[1:])
+        # prompt tokens cover the outline and every chunk request
+        outline, *parts = gen.prompts
+        role_tokens = registry.get("ru").role_tokens
+        assert gen.prompt_tokens == count_tokens(OUTLINE_ROLE) + count_tokens(outline) + sum(
+            role_tokens + count_tokens(p) for p in parts
+        )
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_is_retried_alone(self):
+        gen = FakeGenerator(max_output_tokens=1000, failures=1)
+        project = await gen.gen("Rome", "Documentary", 600)
+        total = len(project.episodes)
+        assert len(gen.prompts) == 1 + total + 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_attempts(self):
+        gen = FakeGenerator(max_output_tokens=1000, failures=5, attempts=2)
+        with pytest.raises(json.JSONDecodeError):
+            await gen.gen("Rome", "Documentary", 600)
+
+    @pytest.mark.parametrize("attempts", [0, -1])
+    def test_invalid_attempts(self, attempts):
+        with pytest.raises(ValueError, match="attempts"):
+            FakeGenerator(attempts=attempts)
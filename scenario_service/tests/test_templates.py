@@ -0,0 +1,67 @@
+import os
+
+import pytest
+import yaml
+
+from entities.entities import STYLES
+from scenarist.scenarist import get_json_scheme_example
+from scenarist.templates import PromptRegistry, build_schema_example, count_tokens
+
+
+@pytest.fixture
+def styles_path(tmp_path):
+    path = tmp_path / "styles.yml"
+    path.write_text(yaml.safe_dump(STYLES, allow_unicode=True), encoding="utf-8")
+    return path
+
+
+class TestPromptRegistry:
+    def test_built_once_per_language(self, styles_path):
+        registry = PromptRegistry(styles_path)
+        ru = registry.get("ru")
+        assert registry.get("ru") is ru
+        en = registry.get("en")
+        assert en is not ru and "Shot text language: en" in en.role
+        assert registry.builds == 2
+        assert ru.schema == build_schema_example(STYLES)
+
+    def test_token_counts(self, styles_path):
+        counted = []
+
+        def counter(text):
+            counted.append(text)
+            return len(text.split())
+
+        registry = PromptRegistry(styles_path, counter=counter)
+        template = registry.get("ru")
+        registry.get("ru")
+        assert counted == [template.role]
+        assert template.role_tokens == len(template.role.split())
+        assert count_tokens(template.role) > 0
+
+    def test_invalidated_when_styles_change(self, styles_path):
+        registry = PromptRegistry(styles_path)
+        before = registry.get("ru")
+        changed = {**STYLES, "ProjectEntity": {**STYLES["ProjectEntity"], "title": "Другое"}}
+        styles_path.write_text(yaml.safe_dump(changed, allow_unicode=True), encoding="utf-8")
+        stat = styles_path.stat()
+        os.utime(styles_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        after = registry.get("ru")
+        assert after is not before
+        assert after.schema["title"] == "Другое"
+
+    def test_style_sets_and_explicit_schema(self, styles_path):
+        registry = PromptRegistry(styles_path)
+        other = {**STYLES, "ShotEntity": {"title": "t", "style": {"voice": "whisper"}}}
+        custom = registry.get("ru", styles=other)
+        assert custom is registry.get("ru", styles=dict(other))
+        assert "whisper" in custom.role and custom is not registry.get("ru")
+        schema = {"title": "x"}
+        assert registry.get("ru", schema=schema).schema == schema
+
+
+def test_schema_example_is_a_copy():
+    schema = get_json_scheme_example()
+    schema["title"] = "changed"
+    assert get_json_scheme_example()["title"] != "changed"
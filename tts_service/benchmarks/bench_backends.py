@@ -0,0 +1,66 @@
+"""Cold start, real-time factor and peak memory of every TTS backend on CPU.
+
+Each backend runs in a fresh process so load time and peak RSS are its own.
+Backends whose dependencies are not installed are reported as skipped. Run
+from the ``tts_service`` directory::
+
+    PYTHONPATH=src python benchmarks/bench_backends.py [silero mms xtts]
+"""
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tts_processors.backends import BACKENDS
+
+# fixed corpus, about 40 seconds of narration
+CORPUS = [
+    "Легенда о Ромуле и Реме задаёт тон ранней истории Рима.",
+    "Археологические данные напоминают, что город возник из нескольких латинских поселений.",
+    "Река Тибр стала главной торговой артерией и естественной границей первых кварталов.",
+    "Поселения вокруг Палатина росли благодаря обмену, ремеслу и общей обороне.",
+    "Вскоре отношения между соседями оформились в городской союз.",
+    "Социальные и политические институты складывались на перекрёстке торговли и обороны.",
+]
+
+CPU_OPTIONS = {"mms": {"device": "cpu"}, "xtts": {"device": "cpu"}}
+
+
+def run(name: str) -> dict:
+    backend = BACKENDS[name](**CPU_OPTIONS.get(name, {}))
+    started = time.perf_counter()
+    backend.load()
+    backend.warm_up()
+    cold_start = time.perf_counter() - started
+
+    started = time.perf_counter()
+    audio = [backend.synthesize(text) for text in CORPUS]
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    backend.synthesize_batch(CORPUS)
+    batched = time.perf_counter() - started
+
+    seconds = sum(len(a) for a in audio) / backend.sample_rate
+    return {
+        "cold_start": cold_start,
+        "rtf": sequential / seconds,
+        "rtf_batch": batched / seconds,
+        "audio": seconds,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or list(BACKENDS):
+        try:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                r = pool.submit(run, name).result()
+        except ImportError as e:
+            print(f"{name:7} skipped: {e}")
+            continue
+        print(
+            f"{name:7} cold start {r['cold_start']:6.1f} s  RTF {r['rtf']:.3f}  "
+            f"batch RTF {r['rtf_batch']:.3f}  audio {r['audio']:.1f} s  peak RSS {r['peak_mib']:.0f} MiB"
+        )
@@ -0,0 +1,63 @@
+"""Real-time factor of Silero per inference mode on CPU, with the distance to fp32.
+
+Each mode runs in a fresh process so thread settings and memory are its own.
+Run from the ``tts_service`` directory::
+
+    PYTHONPATH=src python benchmarks/bench_silero_modes.py [--threads N] [fp32 int8 frozen int8-frozen]
+"""
+import argparse
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from tts_processors.backends import SileroBackend
+from tts_processors.quality import duration_drift, log_spectral_distance
+from tts_processors.silero_optimize import INFERENCE_MODES, InferenceConfig
+
+CORPUS = [
+    "Легенда о Ромуле и Реме задаёт тон ранней истории Рима.",
+    "Археологические данные напоминают, что город возник из нескольких латинских поселений.",
+    "Река Тибр стала главной торговой артерией и естественной границей первых кварталов.",
+    "Поселения вокруг Палатина росли благодаря обмену, ремеслу и общей обороне.",
+]
+
+
+def run(mode: str, threads: int) -> dict:
+    backend = SileroBackend(inference=InferenceConfig(mode=mode, threads=threads))
+    started = time.perf_counter()
+    backend.load()
+    backend.warm_up()
+    cold_start = time.perf_counter() - started
+
+    started = time.perf_counter()
+    audio = backend.synthesize_batch(CORPUS)
+    elapsed = time.perf_counter() - started
+    seconds = sum(len(a) for a in audio) / backend.sample_rate
+    return {
+        "cold_start": cold_start,
+        "rtf": elapsed / seconds,
+        "audio": audio,
+        "peak_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modes", nargs="*", default=list(INFERENCE_MODES))
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    reference = None
+    for mode in ["fp32"] + [m for m in args.modes if m != "fp32"]:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            r = pool.submit(run, mode, args.threads).result()
+        if reference is None:
+            reference = r["audio"]
+        lsd = np.mean([log_spectral_distance(a, b) for a, b in zip(reference, r["audio"])])
+        drift = max(duration_drift(a, b) for a, b in zip(reference, r["audio"]))
+        print(
+            f"{mode:11} cold start {r['cold_start']:5.1f} s  RTF {r['rtf']:.3f}  "
+            f"LSD {lsd:5.2f} dB  drift {drift:.1%}  peak RSS {r['peak_mib']:.0f} MiB"
+        )
@@ -1,6 +1,21 @@
-def synthesize_speech(text: str) -> str:
-    """Generate speech audio for the given text.
+from typing import Optional
 
-    TODO: Integrate Coqui TTS or gTTS and upload audio to S3.
+import soundfile as sf
+
+from tts_processors.backends import BackendPool
+
+_pool: Optional[BackendPool] = None
+
+
+def synthesize_speech(text: str, voice: str = "", output_path: str = "speech.wav") -> str:
+    """Generate speech audio for the given text and write it to ``output_path``.
+
+    The backend and speaker are selected from ``voice`` (``ShotStyle.voice``),
+    models stay loaded between calls.
     """
-    return ""
+    global _pool
+    if _pool is None:
+        _pool = BackendPool()
+    backend, speaker = _pool.for_voice(voice)
+    sf.write(output_path, backend.synthesize(text, speaker), backend.sample_rate)
+    return output_path
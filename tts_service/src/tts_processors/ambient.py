@@ -0,0 +1,217 @@
+"""Ambient music bed under the narration of a sequence.
+
+A bed is a seamless loop chosen or generated from ``SequenceStyle.music``,
+cached per style, source, level and sample rate, and tiled to the length of
+the sequence.
+It is leveled to ``BED_LUFS`` and ducked under the narration with a gain
+computed from the narration envelope. The mix is assembled before rendering,
+so the renderer only decodes one track per sequence.
+"""
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Optional, Protocol, Union
+
+import numpy as np
+import soundfile as sf
+
+from tts_processors.audio_contract import to_layout
+from tts_processors.loudness import integrated_loudness
+from tts_processors.waveform_cache import WaveformCache
+
+# level of the bed with no narration over it, well under the -16 LUFS narration
+BED_LUFS = -30.0
+# extra attenuation of the bed while the narration speaks
+DUCK_DB = -10.0
+LOOP_SECONDS = 20.0
+FADE_SECONDS = 1.0
+
+
+def normalize_style(style: str) -> str:
+    return " ".join(re.findall(r"\w+", style.lower()))
+
+
+def bed_key(style: str, source: str, sample_rate: int, level: float, choice: Optional[str] = None) -> str:
+    """Cache key of a leveled loop; ``choice`` identifies the file a library source picked."""
+    raw = "\x1f".join([source, choice or "", str(sample_rate), f"{level:.2f}", normalize_style(style)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AmbientSource(Protocol):
+    name: str
+
+    def loop(self, style: str, sample_rate: int) -> np.ndarray:
+        """Return a mono loop for ``style`` whose end joins its start without a click."""
+
+
+class SynthAmbientSource:
+    """Generates a slowly breathing chord pad, seeded by the style.
+
+    Every partial and tremolo completes a whole number of cycles per loop, so
+    tiled loops join seamlessly.
+    """
+
+    name = "synth-pad"
+    # root notes from A2 to E3
+    ROOTS = (110.0, 123.47, 130.81, 146.83, 164.81)
+    MINOR = ("dark", "tense", "dramatic", "sad", "mysterious", "minor", "war", "battle")
+
+    def __init__(self, seconds: float = LOOP_SECONDS):
+        self.seconds = seconds
+
+    def minor(self, style: str) -> bool:
+        return not set(normalize_style(style).split()).isdisjoint(self.MINOR)
+
+    def loop(self, style: str, sample_rate: int) -> np.ndarray:
+        words = normalize_style(style)
+        rng = np.random.default_rng(int(hashlib.sha256(words.encode("utf-8")).hexdigest()[:8], 16))
+        third = 1.2 if self.minor(style) else 1.25
+        root = rng.choice(self.ROOTS)
+        ratios = np.array([0.5, 1.0, third, 1.5, 2.0, 2.0 * third])
+        amplitudes = np.array([0.6, 1.0, 0.7, 0.8, 0.4, 0.25])
+
+        t = np.arange(int(self.seconds * sample_rate)) / sample_rate
+        # round every frequency to whole cycles per loop
+        freqs = np.round(root * ratios * self.seconds) / self.seconds
+        tremolo = rng.integers(1, 4, size=len(freqs)) / self.seconds
+        phases = rng.uniform(0, 2 * np.pi, size=(2, len(freqs)))
+        partials = np.sin(2 * np.pi * np.outer(t, freqs) + phases[0])
+        swell = 0.6 + 0.4 * np.sin(2 * np.pi * np.outer(t, tremolo) + phases[1])
+        return (partials * swell) @ amplitudes
+
+
+class LibraryAmbientSource:
+    """Selects a loop from a directory of audio files (``AMBIENT_LIBRARY``).
+
+    The file whose name shares the most words with the style wins, e.g.
+    ``light_strings.flac`` for "ambient with light strings". Loops are
+    converted to the requested rate once, the result is cached.
+    """
+
+    name = "library"
+
+    def __init__(self, root: Union[str, Path, None] = None, fallback: Optional[AmbientSource] = None):
+        self.root = Path(root or os.getenv("AMBIENT_LIBRARY", "ambient"))
+        self.fallback = fallback or SynthAmbientSource()
+
+    def select(self, style: str) -> Optional[Path]:
+        words = set(normalize_style(style).split())
+        best, score = None, 0
+        for path in sorted(self.root.glob("*")):
+            if not path.is_file():
+                continue
+            match = len(words & set(normalize_style(path.stem.replace("_", " ")).split()))
+            if match > score:
+                best, score = path, match
+        return best
+
+    def loop(self, style: str, sample_rate: int) -> np.ndarray:
+        path = self.select(style)
+        if path is None:
+            return self.fallback.loop(style, sample_rate)
+        audio, rate = sf.read(path, dtype="float32")
+        audio = to_layout(audio, 1)
+        if rate != sample_rate:
+            positions = np.arange(int(len(audio) * sample_rate / rate)) * rate / sample_rate
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+        return audio
+
+
+class AmbientBeds:
+    """Beds per music style, leveled to ``level`` LUFS and cached as loops."""
+
+    def __init__(
+        self,
+        source: Optional[AmbientSource] = None,
+        cache: Optional[WaveformCache] = None,
+        *,
+        level: float = BED_LUFS,
+        fade: float = FADE_SECONDS,
+    ):
+        self.source = source or SynthAmbientSource()
+        self.cache = cache
+        self.level = level
+        self.fade = fade
+        self.generated = 0
+        self.cached = 0
+
+    def _choice(self, style: str) -> Optional[str]:
+        # a library loop is cached per file, so a new or replaced file is picked up
+        select = getattr(self.source, "select", None)
+        path = select(style) if select is not None else None
+        return None if path is None else f"{path.name}:{path.stat().st_mtime_ns}"
+
+    def loop(self, style: str, sample_rate: int) -> np.ndarray:
+        key = bed_key(style, self.source.name, sample_rate, self.level, self._choice(style))
+        if self.cache is not None:
+            loop = self.cache.get(key)
+            if loop is not None:
+                self.cached += 1
+                return loop
+        loop = np.asarray(self.source.loop(style, sample_rate), dtype=np.float64)
+        loudness = integrated_loudness(loop, sample_rate)
+        if np.isfinite(loudness):
+            loop *= 10 ** ((self.level - loudness) / 20)
+        loop = loop.astype(np.float32)
+        self.generated += 1
+        if self.cache is not None:
+            self.cache.put(key, loop)
+        return loop
+
+    def bed(self, style: str, frames: int, sample_rate: int) -> np.ndarray:
+        """Tile the loop of ``style`` to ``frames`` samples with a fade in and out."""
+        loop = self.loop(style, sample_rate)
+        bed = np.resize(loop, frames) if len(loop) else np.zeros(frames, dtype=np.float32)
+        fade = min(int(self.fade * sample_rate), frames // 2)
+        if fade:
+            ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+            bed[:fade] *= ramp
+            bed[frames - fade:] *= ramp[::-1]
+        return bed
+
+
+def ducking_gain(
+    narration: np.ndarray,
+    sample_rate: int,
+    *,
+    depth_db: float = DUCK_DB,
+    threshold_db: float = -45.0,
+    attack: float = 0.15,
+    release: float = 0.6,
+    hop: float = 0.01,
+) -> np.ndarray:
+    """Linear gain per sample for the bed, ``depth_db`` down while the narration speaks.
+
+    The narration RMS is taken per ``hop``. Active frames are widened by
+    ``attack`` before and ``release`` after, since the whole track is known in
+    advance. The result is smoothed into ramps, all with array operations and
+    no per-sample loop.
+    """
+    mono = to_layout(np.asarray(narration, dtype=np.float32), 1)
+    if not len(mono):
+        return np.ones(0, dtype=np.float32)
+    step = max(int(hop * sample_rate), 1)
+    frames = -(-len(mono) // step)
+    padded = np.pad(mono, (0, frames * step - len(mono)))
+    rms = np.sqrt(np.mean(np.square(padded.reshape(frames, step)), axis=1))
+    with np.errstate(divide="ignore"):
+        active = 20 * np.log10(rms) > threshold_db
+
+    before, after = int(attack / hop), int(release / hop)
+    # a frame ducks if speech is at most ``after`` frames behind or ``before`` frames ahead
+    widened = np.convolve(active.astype(np.float32), np.ones(before + after + 1))[before:before + frames] > 0
+    gain_db = np.where(widened, depth_db, 0.0)
+    ramp = max(before, 1)
+    gain_db = np.convolve(np.pad(gain_db, (ramp, ramp), mode="edge"), np.ones(ramp) / ramp, mode="same")[ramp:-ramp]
+
+    centers = (np.arange(frames) + 0.5) * step
+    return (10 ** (np.interp(np.arange(len(mono)), centers, gain_db) / 20)).astype(np.float32)
+
+
+def mix_bed(narration: np.ndarray, bed: np.ndarray, sample_rate: int, *, depth_db: float = DUCK_DB) -> np.ndarray:
+    """Narration with the ducked bed under it, in the layout of the narration."""
+    gain = ducking_gain(narration, sample_rate, depth_db=depth_db)
+    channels = 1 if narration.ndim == 1 else narration.shape[1]
+    under = to_layout(bed[: len(narration)] * gain, channels)
+    return np.clip(narration + under, -1.0, 1.0).astype(np.float32)
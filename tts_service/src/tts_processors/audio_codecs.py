@@ -0,0 +1,142 @@
+"""Storage codecs for shot audio.
+
+The raw take is kept losslessly (FLAC by default) and the render-ready
+variant is stored compressed (Opus by default). WAV, FLAC and Opus are
+encoded by libsndfile; AAC goes through pydub and needs ffmpeg.
+"""
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+
+@dataclass(frozen=True)
+class AudioCodec:
+    name: str
+    extension: str
+    content_type: str
+    # libsndfile format and subtype, None for codecs encoded by ffmpeg
+    format: Optional[str] = None
+    subtype: Optional[str] = None
+    bitrate: Optional[str] = None
+
+
+CODECS = {
+    "wav": AudioCodec("wav", "wav", "audio/wav", "WAV", "PCM_16"),
+    "flac": AudioCodec("flac", "flac", "audio/flac", "FLAC", "PCM_16"),
+    # libsndfile encodes Opus at 8, 12, 16, 24 and 48 kHz only
+    "opus": AudioCodec("opus", "opus", "audio/ogg", "OGG", "OPUS"),
+    "aac": AudioCodec("aac", "m4a", "audio/mp4", bitrate="96k"),
+}
+
+EXTENSIONS = {codec.extension: codec for codec in CODECS.values()}
+
+
+def get_codec(name: str) -> AudioCodec:
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown audio codec: {name}, expected one of {list(CODECS)}") from None
+
+
+def codec_for_key(key: str) -> AudioCodec:
+    """Codec of a stored object from its extension."""
+    extension = key.rsplit(".", 1)[-1].lower()
+    try:
+        return EXTENSIONS[extension]
+    except KeyError:
+        raise ValueError(f"Unknown audio extension: {key}") from None
+
+
+def encode_audio(audio: np.ndarray, sample_rate: int, codec: AudioCodec) -> bytes:
+    """Encode ``audio`` with ``codec``; Opus at a rate it does not support is stored at 48 kHz."""
+    buffer = io.BytesIO()
+    if codec.name == "opus":
+        # audio_contract imports this module
+        from tts_processors.audio_contract import OPUS_RATES, resample
+
+        if sample_rate not in OPUS_RATES:
+            audio, sample_rate = resample(audio, sample_rate, 48000), 48000
+    if codec.format is not None:
+        sf.write(buffer, audio, sample_rate, format=codec.format, subtype=codec.subtype)
+        return buffer.getvalue()
+
+    from pydub import AudioSegment
+
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    channels = 1 if pcm.ndim == 1 else pcm.shape[1]
+    segment = AudioSegment(pcm.tobytes(), frame_rate=sample_rate, sample_width=2, channels=channels)
+    segment.export(buffer, format="ipod", bitrate=codec.bitrate)
+    return buffer.getvalue()
+
+
+def decode_audio(data: bytes, codec: Optional[AudioCodec] = None) -> tuple[np.ndarray, int]:
+    """Decode stored audio to float32 samples; libsndfile detects its own formats."""
+    if codec is None or codec.format is not None:
+        audio, sample_rate = sf.read(io.BytesIO(data), dtype="float32")
+        return audio, sample_rate
+
+    from pydub import AudioSegment
+
+    segment = AudioSegment.from_file(io.BytesIO(data), format="mp4")
+    return segment_to_array(segment), segment.frame_rate
+
+
+def segment_to_array(segment) -> np.ndarray:
+    """Samples of a pydub ``AudioSegment`` as float32, shaped ``(frames, channels)`` for stereo."""
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * segment.sample_width - 1))
+    if segment.channels > 1:
+        samples = samples.reshape(-1, segment.channels)
+    return samples
+
+
+@dataclass(frozen=True)
+class StoragePolicy:
+    """How shot audio is stored: codec of the raw take, codec of the render variant
+    and whether the raw take is dropped once the render variant exists."""
+
+    raw_codec: str = "flac"
+    render_codec: str = "opus"
+    keep_raw: bool = True
+
+    def __post_init__(self):
+        get_codec(self.raw_codec)
+        get_codec(self.render_codec)
+
+    @classmethod
+    def from_env(cls) -> "StoragePolicy":
+        return cls(
+            raw_codec=os.getenv("TTS_RAW_CODEC", "flac"),
+            render_codec=os.getenv("TTS_RENDER_CODEC", "opus"),
+            keep_raw=os.getenv("TTS_KEEP_RAW", "1") not in ("0", "false", "no"),
+        )
+
+    def codec(self, variant: Optional[str]) -> AudioCodec:
+        return get_codec(self.raw_codec if variant == "raw" else self.render_codec)
+
+
+class AudioEncoder:
+    """Encodes and decodes audio in a thread pool, off the event loop.
+
+    libsndfile releases the GIL while encoding, so a few threads encode in parallel.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audio-encode")
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    async def encode(self, audio: np.ndarray, sample_rate: int, codec: AudioCodec) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, encode_audio, audio, sample_rate, codec)
+
+    async def decode(self, data: bytes, codec: Optional[AudioCodec] = None) -> tuple[np.ndarray, int]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, decode_audio, data, codec)
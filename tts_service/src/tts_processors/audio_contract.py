@@ -0,0 +1,86 @@
+"""Audio format contract between TTS, storage and render.
+
+The project's render profile declares one sample rate and channel layout.
+TTS synthesizes at that rate, stores that layout, and the renderer decodes and
+writes at the same rate, so no stage has to resample. ``check_audio_contract``
+lists the stages that would still resample for a given configuration.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from tts_processors.audio_codecs import StoragePolicy
+
+# sample rates the Silero v3 models synthesize natively
+SILERO_RATES = (8000, 24000, 48000)
+# libsndfile encodes Opus at these rates only
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+# output rates of the AAC encoder of ffmpeg
+AAC_RATES = (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000, 64000, 88200, 96000)
+
+
+@dataclass(frozen=True)
+class Resample:
+    stage: str
+    source_rate: int
+    target_rate: int
+    reason: str
+
+    def __str__(self) -> str:
+        return f"{self.stage}: {self.source_rate} Hz -> {self.target_rate} Hz ({self.reason})"
+
+
+def nearest_rate(sample_rate: int, rates: tuple[int, ...]) -> int:
+    """Supported rate closest to ``sample_rate``, the higher one on a tie."""
+    return min(rates, key=lambda rate: (abs(rate - sample_rate), -rate))
+
+
+def check_audio_contract(
+    sample_rate: int,
+    *,
+    model_rates: tuple[int, ...] = SILERO_RATES,
+    storage: Optional[StoragePolicy] = None,
+    speed: float = 1.0,
+    output_codec: str = "aac",
+) -> list[Resample]:
+    """Return every stage that resamples when the render profile asks for ``sample_rate``."""
+    issues = []
+    synth_rate = sample_rate
+    if sample_rate not in model_rates:
+        synth_rate = nearest_rate(sample_rate, model_rates)
+        issues.append(Resample("tts", synth_rate, sample_rate, f"model synthesizes at {list(model_rates)} only"))
+    if speed != 1.0:
+        # process_audio changes tempo by playing the samples at another rate and converting back
+        issues.append(Resample("process_audio", int(sample_rate * speed), sample_rate, f"speed {speed}"))
+    storage = storage or StoragePolicy()
+    for variant in ("raw", None):
+        codec = storage.codec(variant)
+        if codec.name == "opus" and sample_rate not in OPUS_RATES:
+            issues.append(
+                Resample(f"storage ({variant or 'render'})", sample_rate, 48000, "Opus supports 8-48 kHz steps only")
+            )
+    if output_codec == "aac" and sample_rate not in AAC_RATES:
+        target = min(AAC_RATES, key=lambda rate: abs(rate - sample_rate))
+        issues.append(Resample("render", sample_rate, target, "AAC output rate"))
+    return issues
+
+
+def resample(audio: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Linear resampling of mono or ``(frames, channels)`` audio, returned unchanged when the rates match."""
+    if source_rate == target_rate or not len(audio):
+        return audio
+    positions = np.arange(int(len(audio) * target_rate / source_rate)) * source_rate / target_rate
+    frames = np.arange(len(audio))
+    if audio.ndim == 1:
+        return np.interp(positions, frames, audio).astype(np.float32)
+    return np.stack([np.interp(positions, frames, channel) for channel in audio.T], axis=1).astype(np.float32)
+
+
+def to_layout(audio: np.ndarray, channels: int) -> np.ndarray:
+    """Shape ``audio`` as mono ``(frames,)`` or stereo ``(frames, 2)`` for the render profile."""
+    if channels == 1:
+        return audio if audio.ndim == 1 else audio.mean(axis=1)
+    if audio.ndim == 1:
+        return np.repeat(audio[:, None], channels, axis=1)
+    return audio
@@ -0,0 +1,290 @@
+"""TTS backends behind one interface.
+
+Every backend loads its model lazily, can be warmed up, synthesizes a batch of
+texts and reports its output sample rate. ``VoiceRouter`` picks a backend and
+speaker from the free-form ``ShotStyle.voice`` description and ``BackendPool``
+keeps one loaded instance per backend.
+"""
+import abc
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from tts_processors.silero_optimize import InferenceConfig
+    from tts_processors.text_frontend import TextFrontend
+
+SILERO_MODEL = "v3_1_ru"
+WARM_UP_TEXT = "Проверка связи."
+
+# models are loaded one at a time per process, so a loader that adjusts
+# process-wide torch state never races with another one
+_LOAD_LOCK = threading.Lock()
+
+
+@contextmanager
+def _torch_load_overrides(**overrides):
+    """Make ``torch.load`` use ``overrides`` as keyword arguments until the block exits.
+
+    For libraries that call ``torch.load`` themselves; only use it under ``_LOAD_LOCK``.
+    """
+    import torch
+
+    original = torch.load
+    torch.load = lambda *args, **kwargs: original(*args, **{**kwargs, **overrides})
+    try:
+        yield
+    finally:
+        torch.load = original
+
+
+class TTSBackend(abc.ABC):
+    name: str = ""
+    sample_rate: int = 0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    @abc.abstractmethod
+    def _load(self) -> None:
+        ...
+
+    @abc.abstractmethod
+    def _synthesize_batch(self, texts: list[str], speaker: Optional[str]) -> list[np.ndarray]:
+        ...
+
+    def load(self) -> None:
+        """Load the model once; later calls are no-ops."""
+        with self._lock:
+            if not self.loaded:
+                with _LOAD_LOCK:
+                    self._load()
+                self.loaded = True
+
+    def warm_up(self) -> None:
+        """Run one short synthesis so the first real request does not pay for lazy initialization."""
+        self.synthesize_batch([WARM_UP_TEXT])
+
+    def synthesize_batch(self, texts: list[str], speaker: Optional[str] = None) -> list[np.ndarray]:
+        """Return one mono float32 waveform at ``sample_rate`` per text."""
+        self.load()
+        return [np.asarray(audio, dtype=np.float32).reshape(-1) for audio in self._synthesize_batch(texts, speaker)]
+
+    def synthesize(self, text: str, speaker: Optional[str] = None) -> np.ndarray:
+        return self.synthesize_batch([text], speaker)[0]
+
+
+def default_device() -> str:
+    import torch
+
+    return "mps" if torch.backends.mps.is_available() else "cpu"
+
+
+class SileroBackend(TTSBackend):
+    """Silero v3 Russian voices (``eugene``, ``baya``, ``kseniya``, ``xenia``, ``aidar``).
+
+    Texts prepared by an accenting ``frontend`` already carry stress and ё, so
+    the model does not place them again.
+    """
+
+    name = "silero"
+
+    def __init__(
+        self,
+        speaker: str = "eugene",
+        sample_rate: int = 48000,
+        model: str = SILERO_MODEL,
+        inference: Optional["InferenceConfig"] = None,
+        frontend: Optional["TextFrontend"] = None,
+    ):
+        super().__init__()
+        self.speaker = speaker
+        self.sample_rate = sample_rate
+        self.model_name = model
+        self.inference = inference
+        self.frontend = frontend
+        self.model = None
+        # inference mode actually applied, known once loaded
+        self.mode: Optional[str] = None
+
+    @property
+    def accented(self) -> bool:
+        return self.frontend is not None and self.frontend.accented
+
+    def _load(self) -> None:
+        import torch
+
+        from tts_processors.silero_optimize import InferenceConfig, optimize_silero
+
+        model, _ = torch.hub.load(
+            repo_or_dir="snakers4/silero-models", model="silero_tts", language="ru", speaker=self.model_name
+        )
+        self.model, self.mode = optimize_silero(model, self.inference or InferenceConfig.from_env())
+
+    def _synthesize_batch(self, texts, speaker):
+        accented = self.accented
+        # the Silero package API synthesizes one text per call
+        return [
+            self.model.apply_tts(
+                text=text,
+                speaker=speaker or self.speaker,
+                sample_rate=self.sample_rate,
+                put_accent=not accented,
+                put_yo=not accented,
+            ).numpy()
+            for text in texts
+        ]
+
+
+class MMSBackend(TTSBackend):
+    """Meta MMS VITS model from Hugging Face, padded batches in one forward pass."""
+
+    name = "mms"
+
+    def __init__(self, model_id: str = "facebook/mms-tts-rus", device: Optional[str] = None):
+        super().__init__()
+        self.model_id = model_id
+        self.device = device
+        self.sample_rate = 16000
+        self.model = None
+        self.tokenizer = None
+
+    def _load(self) -> None:
+        from transformers import AutoTokenizer, VitsModel
+
+        self.device = self.device or default_device()
+        self.model = VitsModel.from_pretrained(self.model_id).to(self.device)
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+        self.sample_rate = self.model.config.sampling_rate
+
+    def _synthesize_batch(self, texts, speaker):
+        import torch
+
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.device)
+        with torch.no_grad():
+            output = self.model(**inputs)
+        waveforms = output.waveform.cpu().numpy()
+        if output.sequence_lengths is None:
+            return list(waveforms)
+        # padded texts produce padded audio, cut every waveform to its own length
+        return [w[:n] for w, n in zip(waveforms, output.sequence_lengths.tolist())]
+
+
+class XTTSBackend(TTSBackend):
+    """Coqui XTTS v2, clones the voice of ``speaker_wav``."""
+
+    name = "xtts"
+
+    def __init__(
+        self,
+        speaker_wav: str = "silero_out.wav",
+        language: str = "ru",
+        model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2",
+        device: Optional[str] = None,
+    ):
+        super().__init__()
+        self.speaker_wav = speaker_wav
+        self.language = language
+        self.model_name = model_name
+        self.device = device
+        self.sample_rate = 24000
+        self.tts = None
+
+    def _load(self) -> None:
+        from TTS.api import TTS
+
+        # XTTS checkpoints are not loadable with weights_only=True and TTS calls torch.load itself
+        with _torch_load_overrides(weights_only=False):
+            self.tts = TTS(model_name=self.model_name, progress_bar=False).to(self.device or default_device())
+        self.sample_rate = self.tts.synthesizer.output_sample_rate
+
+    def _synthesize_batch(self, texts, speaker):
+        return [
+            self.tts.tts(text=text, speaker_wav=speaker or self.speaker_wav, language=self.language)
+            for text in texts
+        ]
+
+
+BACKENDS: dict[str, type[TTSBackend]] = {
+    SileroBackend.name: SileroBackend,
+    MMSBackend.name: MMSBackend,
+    XTTSBackend.name: XTTSBackend,
+}
+
+
+@dataclass(frozen=True)
+class VoiceChoice:
+    backend: str
+    speaker: Optional[str] = None
+
+
+# keyword of the voice description -> backend and speaker, first match wins
+DEFAULT_RULES = [
+    (r"\b(female|woman|женск)", VoiceChoice("silero", "baya")),
+    (r"\b(expressive|dramatic|emotional)", VoiceChoice("silero", "aidar")),
+]
+
+_EXPLICIT = re.compile(r"^\s*(\w+):([^\s,;]+)")
+
+
+class VoiceRouter:
+    """Maps ``ShotStyle.voice`` to a backend and speaker.
+
+    ``backend:speaker`` at the start of the description selects them
+    explicitly, otherwise the first matching keyword rule or ``default`` is used.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[list[tuple[str, VoiceChoice]]] = None,
+        default: VoiceChoice = VoiceChoice("silero"),
+        backends: Optional[dict[str, type[TTSBackend]]] = None,
+    ):
+        self.backends = backends or BACKENDS
+        self.rules = [(re.compile(pattern, re.IGNORECASE), choice) for pattern, choice in (rules or DEFAULT_RULES)]
+        self.default = default
+
+    def select(self, voice: str) -> VoiceChoice:
+        explicit = _EXPLICIT.match(voice or "")
+        if explicit and explicit.group(1).lower() in self.backends:
+            return VoiceChoice(explicit.group(1).lower(), explicit.group(2))
+        for pattern, choice in self.rules:
+            if pattern.search(voice or ""):
+                return choice
+        return self.default
+
+
+class BackendPool:
+    """Keeps one loaded backend per name for the lifetime of the process."""
+
+    def __init__(self, router: Optional[VoiceRouter] = None, options: Optional[dict[str, dict]] = None):
+        self.router = router or VoiceRouter()
+        self.backends = self.router.backends
+        self.options = options or {}
+        self._backends: dict[str, TTSBackend] = {}
+        self._lock = threading.Lock()
+
+    def add(self, backend: TTSBackend) -> TTSBackend:
+        """Use an already configured ``backend`` for its name, e.g. the Silero model of a processor."""
+        with self._lock:
+            self._backends[backend.name] = backend
+        return backend
+
+    def get(self, name: str) -> TTSBackend:
+        with self._lock:
+            backend = self._backends.get(name)
+            if backend is None:
+                if name not in self.backends:
+                    raise ValueError(f"Unknown TTS backend: {name}")
+                backend = self._backends[name] = self.backends[name](**self.options.get(name, {}))
+        backend.load()
+        return backend
+
+    def for_voice(self, voice: str) -> tuple[TTSBackend, Optional[str]]:
+        choice = self.router.select(voice)
+        return self.get(choice.backend), choice.speaker
@@ -0,0 +1,223 @@
+"""Speech duration calibration.
+
+Learns how many characters per second each speaker reads from the audio that
+was actually synthesized, and predicts shot durations from text before any
+TTS or render work is spent.
+"""
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from scenario_dto.dto import SequenceDTO, ShotDTO
+
+# prior speaking rates in spoken characters (letters and digits) per second
+DEFAULT_CHARS_PER_SECOND = {"ru": 14.0, "en": 15.0}
+FALLBACK_CHARS_PER_SECOND = 14.0
+# weight of the prior, in seconds of audio
+PRIOR_SECONDS = 10.0
+# older observations fade out so the rate follows model and speaker changes
+DECAY = 0.98
+
+_SPOKEN = re.compile(r"\w", re.UNICODE)
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS speech_rates (
+    speaker TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    chars REAL NOT NULL,
+    seconds REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    PRIMARY KEY (speaker, lang)
+)
+"""
+
+UPSERT_RATE = f"""
+INSERT INTO speech_rates (speaker, lang, chars, seconds, samples)
+VALUES (?, ?, ?, ?, 1)
+ON CONFLICT (speaker, lang) DO UPDATE SET
+    chars = speech_rates.chars * {DECAY} + excluded.chars,
+    seconds = speech_rates.seconds * {DECAY} + excluded.seconds,
+    samples = speech_rates.samples + 1
+"""
+
+
+def spoken_chars(text: str) -> int:
+    """Return the number of characters that are actually pronounced."""
+    return len(_SPOKEN.findall(text))
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s for s in _SENTENCE_END.split(text.strip()) if s]
+
+
+class SpeechRateStore:
+    """Small SQLite store of decayed character and second totals per speaker and language.
+
+    Rows are mirrored in memory, so predictions never touch the database.
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None):
+        path = path or os.getenv("TTS_STATS_PATH", "tts_stats.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(SCHEMA)
+        self._rows: dict[tuple[str, str], tuple[float, float, int]] = {
+            (speaker, lang): (chars, seconds, samples)
+            for speaker, lang, chars, seconds, samples in self._conn.execute(
+                "SELECT speaker, lang, chars, seconds, samples FROM speech_rates"
+            )
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get(self, speaker: str, lang: str) -> Optional[tuple[float, float, int]]:
+        """Return ``(chars, seconds, samples)`` totals or ``None`` if nothing was observed."""
+        return self._rows.get((speaker, lang))
+
+    def add(self, speaker: str, lang: str, chars: float, seconds: float) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute(UPSERT_RATE, (speaker, lang, chars, seconds))
+            old_chars, old_seconds, samples = self._rows.get((speaker, lang), (0.0, 0.0, 0))
+            self._rows[(speaker, lang)] = (
+                old_chars * DECAY + chars,
+                old_seconds * DECAY + seconds,
+                samples + 1,
+            )
+
+
+@dataclass
+class ShotEstimate:
+    hierarchy_id: str
+    seconds: float
+
+
+@dataclass
+class SequenceEstimate:
+    hierarchy_id: str
+    budget: float
+    shots: list[ShotEstimate] = field(default_factory=list)
+    tolerance: float = 0.1
+
+    @property
+    def seconds(self) -> float:
+        return sum(shot.seconds for shot in self.shots)
+
+    @property
+    def overshoot(self) -> float:
+        """Predicted seconds above the budget, 0 if it fits."""
+        return max(0.0, self.seconds - self.budget)
+
+    @property
+    def exceeds(self) -> bool:
+        return self.seconds > self.budget * (1 + self.tolerance)
+
+
+class DurationCalibrator:
+    """Predicts narration durations from text using learned speaking rates."""
+
+    def __init__(self, store: SpeechRateStore, lang: str = "ru"):
+        self.store = store
+        self.lang = lang
+
+    def chars_per_second(self, speaker: str, lang: Optional[str] = None) -> float:
+        lang = lang or self.lang
+        prior = DEFAULT_CHARS_PER_SECOND.get(lang, FALLBACK_CHARS_PER_SECOND)
+        totals = self.store.get(speaker, lang)
+        if totals is None:
+            return prior
+        chars, seconds, _ = totals
+        # observed totals smoothed towards the prior
+        return (chars + prior * PRIOR_SECONDS) / (seconds + PRIOR_SECONDS)
+
+    def observe(self, text: str, seconds: float, speaker: str, lang: Optional[str] = None) -> None:
+        """Record the duration of synthesized ``text``."""
+        chars = spoken_chars(text)
+        if chars and seconds > 0:
+            self.store.add(speaker, lang or self.lang, chars, seconds)
+
+    def observe_audio(self, text: str, audio, sample_rate: int, speaker: str, lang: Optional[str] = None) -> None:
+        self.observe(text, len(audio) / sample_rate, speaker, lang)
+
+    def predict(self, text: str, speaker: str, lang: Optional[str] = None, speed: float = 1.0) -> float:
+        """Predict seconds of speech; ``speed`` as passed to post-processing (< 1 is slower)."""
+        return spoken_chars(text) / self.chars_per_second(speaker, lang) / speed
+
+    def estimate_sequence(
+        self,
+        sequence: SequenceDTO,
+        budget: float,
+        speaker: str,
+        *,
+        lang: Optional[str] = None,
+        speed: float = 1.0,
+        tolerance: float = 0.1,
+    ) -> SequenceEstimate:
+        return SequenceEstimate(
+            hierarchy_id=str(sequence.hierarchy_id),
+            budget=budget,
+            tolerance=tolerance,
+            shots=[
+                ShotEstimate(str(shot.hierarchy_id), self.predict(shot.text, speaker, lang, speed))
+                for shot in sequence.shots
+            ],
+        )
+
+    def check(
+        self,
+        sequences: Iterable[SequenceDTO],
+        target_seconds: float,
+        speaker: str,
+        **kwargs,
+    ) -> list[SequenceEstimate]:
+        """Estimate every sequence against an equal share of ``target_seconds``."""
+        sequences = list(sequences)
+        if not sequences:
+            return []
+        budget = target_seconds / len(sequences)
+        return [self.estimate_sequence(seq, budget, speaker, **kwargs) for seq in sequences]
+
+    def trim(
+        self,
+        sequence: SequenceDTO,
+        budget: float,
+        speaker: str,
+        *,
+        lang: Optional[str] = None,
+        speed: float = 1.0,
+    ) -> SequenceDTO:
+        """Return a copy of ``sequence`` with trailing sentences dropped until it fits ``budget``.
+
+        Sentences are taken from the currently longest shot first; every shot keeps
+        at least one sentence, so the result may still exceed a very small budget.
+        """
+        sentences = {shot.hierarchy_id: split_sentences(shot.text) for shot in sequence.shots}
+        original = {hid: len(parts) for hid, parts in sentences.items()}
+        durations = {
+            hid: self.predict(" ".join(parts), speaker, lang, speed) for hid, parts in sentences.items()
+        }
+        total = sum(durations.values())
+        while total > budget:
+            candidates = [hid for hid, parts in sentences.items() if len(parts) > 1]
+            if not candidates:
+                break
+            longest = max(candidates, key=durations.__getitem__)
+            sentences[longest].pop()
+            new = self.predict(" ".join(sentences[longest]), speaker, lang, speed)
+            total += new - durations[longest]
+            durations[longest] = new
+
+        shots: list[ShotDTO] = []
+        for shot in sequence.shots:
+            parts = sentences[shot.hierarchy_id]
+            if len(parts) < original[shot.hierarchy_id]:
+                shot = shot.model_copy(update={"text": " ".join(parts)})
+            shots.append(shot)
+        return sequence.model_copy(update={"shots": shots})
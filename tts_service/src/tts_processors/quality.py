@@ -0,0 +1,37 @@
+"""Distance between a synthesized waveform and a reference, used to guard optimized inference modes."""
+import numpy as np
+
+# an optimized model may not drift further from the fp32 output than this
+MAX_SPECTRAL_DISTANCE_DB = 3.0
+MAX_DURATION_DRIFT = 0.05
+
+
+def _power_spectrogram(audio: np.ndarray, n_fft: int, hop: int) -> np.ndarray:
+    audio = np.asarray(audio, dtype=np.float64).reshape(-1)
+    if len(audio) < n_fft:
+        audio = np.pad(audio, (0, n_fft - len(audio)))
+    frames = np.lib.stride_tricks.sliding_window_view(audio, n_fft)[::hop]
+    return np.abs(np.fft.rfft(frames * np.hanning(n_fft), axis=1)) ** 2
+
+
+def log_spectral_distance(reference: np.ndarray, test: np.ndarray, n_fft: int = 1024, hop: int = 256) -> float:
+    """Mean log-spectral distance in dB between two waveforms of the same sample rate.
+
+    The longer signal is cut to the length of the shorter one. Bins more than
+    60 dB below the loudest reference bin are clamped, and frames that are
+    silent in both signals are ignored.
+    """
+    n = min(len(reference), len(test))
+    ref = _power_spectrogram(reference[:n], n_fft, hop)
+    out = _power_spectrogram(test[:n], n_fft, hop)
+    # 60 dB of dynamic range below the loudest bin of the reference
+    floor = 1e-6 * max(ref.max(), 1e-20)
+    ref_db = 10 * np.log10(np.maximum(ref, floor))
+    out_db = 10 * np.log10(np.maximum(out, floor))
+    per_frame = np.sqrt(np.mean((ref_db - out_db) ** 2, axis=1))
+    active = ref.sum(axis=1) + out.sum(axis=1) > floor * ref.shape[1]
+    return float(per_frame[active].mean()) if active.any() else 0.0
+
+
+def duration_drift(reference: np.ndarray, test: np.ndarray) -> float:
+    return abs(len(test) - len(reference)) / max(len(reference), 1)
@@ -0,0 +1,101 @@
+"""Optimized CPU inference for the Silero model.
+
+``int8`` applies dynamic quantization to the linear and recurrent layers,
+``frozen`` freezes the TorchScript graph, ``int8-frozen`` does both. The
+thread counts of torch are tuned at load time. A step that fails is skipped,
+or raises with ``strict``; ``optimize_silero`` reports the mode actually applied.
+"""
+import os
+import warnings
+from dataclasses import dataclass
+from typing import Any, Optional
+
+INFERENCE_MODES = ("fp32", "int8", "frozen", "int8-frozen")
+
+
+@dataclass(frozen=True)
+class InferenceConfig:
+    mode: str = "fp32"
+    # intra-op threads per process; None keeps the torch default
+    threads: Optional[int] = None
+    interop_threads: Optional[int] = None
+    # fail instead of falling back when a step is not supported
+    strict: bool = False
+
+    def __post_init__(self):
+        if self.mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {self.mode}, expected one of {INFERENCE_MODES}")
+
+    @classmethod
+    def from_env(cls) -> "InferenceConfig":
+        threads = os.getenv("TTS_THREADS")
+        return cls(
+            mode=os.getenv("TTS_INFERENCE_MODE", "fp32"),
+            threads=int(threads) if threads else None,
+            strict=os.getenv("TTS_INFERENCE_STRICT", "0") not in ("0", "false", "no"),
+        )
+
+
+def tune_threads(config: InferenceConfig) -> None:
+    import torch
+
+    if config.threads:
+        torch.set_num_threads(config.threads)
+    if config.interop_threads:
+        try:
+            torch.set_num_interop_threads(config.interop_threads)
+        except RuntimeError:
+            # only allowed before the first parallel work of the process
+            warnings.warn(f"Inter-op threads are already fixed at {torch.get_num_interop_threads()}", RuntimeWarning)
+
+
+def _quantize(module):
+    import torch
+
+    return torch.quantization.quantize_dynamic(
+        module, {torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU}, dtype=torch.qint8
+    )
+
+
+def _freeze(module):
+    import torch
+
+    if not isinstance(module, torch.jit.ScriptModule):
+        module = torch.jit.script(module)
+    return torch.jit.optimize_for_inference(torch.jit.freeze(module.eval()))
+
+
+def optimize_silero(model, config: InferenceConfig) -> tuple[Any, str]:
+    """Apply ``config`` to a model returned by ``torch.hub.load(..., model="silero_tts")``.
+
+    Returns the model and the mode that was applied. The network lives in
+    ``model.model``; a step that the packaged network does not support is
+    skipped with a warning and the model stays usable, so ``int8-frozen`` may
+    end up as ``int8``, ``frozen`` or ``fp32``. With ``config.strict`` the
+    step raises ``RuntimeError`` instead.
+    """
+    tune_threads(config)
+    if config.mode == "fp32":
+        return model, "fp32"
+    wrapped = hasattr(model, "model")
+    network = model.model if wrapped else model
+    steps = []
+    if config.mode.startswith("int8"):
+        steps.append(("int8", _quantize))
+    if config.mode.endswith("frozen"):
+        steps.append(("frozen", _freeze))
+    applied = []
+    for name, step in steps:
+        try:
+            network = step(network)
+        except Exception as e:  # pylint: disable=broad-except
+            if config.strict:
+                raise RuntimeError(f"Silero {name} optimization failed: {e}") from e
+            warnings.warn(f"Silero {name} optimization skipped: {e}", RuntimeWarning)
+        else:
+            applied.append(name)
+    mode = "-".join(applied) or "fp32"
+    if not wrapped:
+        return network, mode
+    model.model = network
+    return model, mode
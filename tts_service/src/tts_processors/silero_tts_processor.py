@@ -1,10 +1,9 @@
 import asyncio
 import io
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Optional
 
 import numpy as np
-import torch
 import soundfile as sf
 from pydub import AudioSegment, effects
 
@@ -15,6 +14,19 @@ except ModuleNotFoundError as exc:  # pragma: no cover - makes runtime error exp
     S3AsyncSaver = None  # type: ignore
     _S3_IMPORT_ERROR = exc
 
+from tts_processors.ambient import AmbientBeds, mix_bed
+from tts_processors.audio_codecs import EXTENSIONS, AudioEncoder, StoragePolicy, segment_to_array
+from tts_processors.audio_contract import OPUS_RATES, SILERO_RATES, nearest_rate, resample, to_layout
+from tts_processors.backends import SILERO_MODEL, BackendPool, SileroBackend, TTSBackend
+from tts_processors.loudness import TARGET_LUFS, LoudnessPlan, ShotLoudness, plan_gains
+from tts_processors.silero_optimize import InferenceConfig
+from tts_processors.text_frontend import TextFrontend
+from tts_processors.waveform_cache import SentenceSynthesizer, WaveformCache
+from tts_processors.wav_stream import SoundFileStreamUpload, WavStreamUpload
+
+if TYPE_CHECKING:
+    from tts_processors.calibration import DurationCalibrator
+
 
 class SileroTTSProcessor:
     """
@@ -27,15 +39,31 @@ class SileroTTSProcessor:
         speaker: str = "eugene",
         sample_rate: int = 48000,
         *,
+        channels: int = 1,
         bucket: Optional[str] = None,
         endpoint_url: Optional[str] = None,
         access_key: Optional[str] = None,
         secret_key: Optional[str] = None,
         region: Optional[str] = None,
         root_prefix: Optional[str] = None,
+        calibrator: Optional["DurationCalibrator"] = None,
+        frontend: Optional[TextFrontend] = None,
+        waveform_cache: Optional[WaveformCache] = None,
+        inference: Optional[InferenceConfig] = None,
+        storage: Optional[StoragePolicy] = None,
+        pool: Optional[BackendPool] = None,
     ):
+        # rate and layout of the render profile; other rates than SILERO_RATES are
+        # synthesized at the nearest supported one and resampled once, as ``check_audio_contract`` reports
         self.speaker = speaker
         self.sample_rate = sample_rate
+        self.channels = channels
+        # codecs of the stored variants, TTS_RAW_CODEC / TTS_RENDER_CODEC / TTS_KEEP_RAW by default
+        self.storage = storage or StoragePolicy.from_env()
+        self.encoder = AudioEncoder()
+        # learns the speaking rate from every synthesized text
+        self.calibrator = calibrator
+        self.frontend = frontend
 
         if S3AsyncSaver is None:  # pragma: no cover - handled at runtime if dependency missing
             raise RuntimeError(
@@ -59,26 +87,121 @@ class SileroTTSProcessor:
             region=region,
         )
 
-        # load the Silero TTS model once
-        self.model, _ = torch.hub.load(
-            repo_or_dir="snakers4/silero-models",
-            model="silero_tts",
-            language="ru",
-            speaker="v3_1_ru"
+        # int8 / frozen graph and thread tuning, TTS_INFERENCE_MODE and TTS_THREADS by default
+        self.inference = inference or InferenceConfig.from_env()
+        # load the Silero TTS model once; stress and ё placed by the front-end are not redone by it
+        self.backend = SileroBackend(
+            speaker, nearest_rate(sample_rate, SILERO_RATES), inference=self.inference, frontend=frontend
         )
+        self.backend.load()
+        # ``ShotStyle.voice`` may pick another speaker or backend; the pool reuses this Silero model
+        self.pool = pool or BackendPool()
+        self.pool.add(self.backend)
+
+        # with a front-end or a waveform cache text is synthesized sentence by sentence
+        self.sentence_mode = frontend is not None or waveform_cache is not None
+        self.waveform_cache = waveform_cache
+        self.sentences = SentenceSynthesizer(
+            self._apply_tts,
+            frontend,
+            waveform_cache,
+            speaker=speaker,
+            sample_rate=sample_rate,
+            # quantized output differs slightly, keep its waveforms apart under the mode applied
+            model=SILERO_MODEL if self.backend.mode == "fp32" else f"{SILERO_MODEL}:{self.backend.mode}",
+        )
+        self._voices: dict[tuple[str, Optional[str]], SentenceSynthesizer] = {}
+
+    def _apply_tts(self, text: str) -> np.ndarray:
+        return resample(self.backend.synthesize(text), self.backend.sample_rate, self.sample_rate)
 
-    def synthesize(self, text: str) -> any:
+    def _voice(self, voice: Optional[str]) -> tuple[SentenceSynthesizer, str]:
+        """Sentence synthesizer and speaker label for a ``ShotStyle.voice`` description.
+
+        The label keys cached waveforms and calibration; a backend without named
+        speakers is labelled by its name.
+        """
+        if not voice:
+            return self.sentences, self.speaker
+        backend, speaker = self.pool.for_voice(voice)
+        if backend is self.backend and speaker in (None, self.speaker):
+            return self.sentences, self.speaker
+        label = speaker or getattr(backend, "speaker", None) or backend.name
+        synthesizer = self._voices.get((backend.name, speaker))
+        if synthesizer is None:
+            frontend = self.sentences.frontend
+            if backend is not self.backend:
+                # stress marks are Silero syntax, other backends get the normalized text only
+                frontend = TextFrontend(normalizer=frontend.normalizer)
+            synthesizer = self._voices[backend.name, speaker] = SentenceSynthesizer(
+                lambda text: self._synthesize_with(backend, text, speaker),
+                frontend,
+                self.waveform_cache,
+                speaker=label,
+                sample_rate=self.sample_rate,
+                model=self.sentences.model if backend is self.backend else backend.name,
+            )
+        return synthesizer, synthesizer.speaker
+
+    def _synthesize_with(self, backend: TTSBackend, text: str, speaker: Optional[str]) -> np.ndarray:
+        audio = backend.synthesize(text, speaker)
+        return resample(audio, backend.sample_rate, self.sample_rate)
+
+    def synthesize(self, text: str, voice: Optional[str] = None) -> any:
         """
         Generate raw audio waveform (numpy array) from text.
+
+        ``voice`` (``ShotStyle.voice``) selects the backend and speaker through
+        the ``VoiceRouter`` of the pool; by default the processor speaker is used.
         """
-        audio = self.model.apply_tts(
-            text=text,
-            speaker=self.speaker,
-            sample_rate=self.sample_rate,
-            put_accent=True,
-            put_yo=True,
-        )
-        return audio.numpy()
+        synthesizer, speaker = self._voice(voice)
+        if self.sentence_mode:
+            audio = synthesizer.synthesize(text)
+        else:
+            audio = synthesizer.synth(text)
+        if self.calibrator is not None:
+            self.calibrator.observe_audio(text, audio, self.sample_rate, speaker, lang="ru")
+        return audio
+
+    async def stream(self, text: str, voice: Optional[str] = None) -> AsyncIterator[np.ndarray]:
+        """Yield the waveform sentence by sentence as soon as each one is synthesized.
+
+        The chunks concatenate to the same audio as ``synthesize`` in sentence mode.
+        """
+        synthesizer, speaker = self._voice(voice)
+        samples = 0
+        async for chunk in synthesizer.astream(text):
+            samples += len(chunk)
+            yield chunk
+        if self.calibrator is not None and samples:
+            self.calibrator.observe(text, samples / self.sample_rate, speaker, lang="ru")
+
+    async def stream_to_s3(
+        self, text: str, hierarchy_id: str, *, variant: str = "raw", voice: Optional[str] = None
+    ) -> str:
+        """Synthesize ``text`` and upload it while it is being synthesized.
+
+        Codecs of libsndfile (WAV, FLAC, Opus) are encoded and uploaded
+        progressively; codecs encoded by ffmpeg are encoded and uploaded once
+        the last sentence is synthesized.
+        """
+        codec = self.storage.codec(variant)
+        # Opus at a rate it does not support is resampled as a whole by ``save_audio``
+        if codec.format is None or (codec.name == "opus" and self.sample_rate not in OPUS_RATES):
+            chunks = [chunk async for chunk in self.stream(text, voice)]
+            return await self.save_audio(np.concatenate(chunks), hierarchy_id, variant=variant)
+
+        key = self._build_s3_key(hierarchy_id, suffix=variant)
+        async with S3AsyncSaver(**self._s3_config) as saver:
+            if codec.name == "wav":
+                upload = WavStreamUpload(saver, key, self.sample_rate, channels=self.channels)
+            else:
+                upload = SoundFileStreamUpload(saver, key, self.sample_rate, codec, channels=self.channels)
+            async with upload:
+                async for chunk in self.stream(text, voice):
+                    await upload.write(chunk)
+        print(f"Streamed audio saved to s3://{self.bucket}/{key}")
+        return key
 
     async def save_audio(
         self,
@@ -88,14 +211,14 @@ class SileroTTSProcessor:
         variant: str = "raw",
     ) -> str:
         """
-        Save audio waveform to S3 using hierarchy-based key.
+        Save audio waveform to S3 using hierarchy-based key, encoded with the codec of ``variant``.
         """
+        codec = self.storage.codec(variant)
         async with S3AsyncSaver(**self._s3_config) as saver:
-            wav_bytes = await self._resolve_audio_bytes(
-                audio, hierarchy_id, None, saver
-            )
+            samples, sample_rate = await self._resolve_audio(audio, None, None, saver)
+            data = await self.encoder.encode(to_layout(samples, self.channels), sample_rate, codec)
             key = self._build_s3_key(hierarchy_id, suffix=variant)
-            await saver.save(wav_bytes, key, content_type="audio/wav")
+            await saver.save(data, key, content_type=codec.content_type)
         print(f"Raw audio saved to s3://{self.bucket}/{key}")
         return key
 
@@ -108,24 +231,44 @@ class SileroTTSProcessor:
         *,
         variant: Optional[str] = None,
         source_variant: str = "raw",
+        gain_db: Optional[float] = None,
     ) -> str:
         """
         Normalize loudness, adjust speed, optionally add reverb, and upload to S3.
+
+        The result is stored with the render codec. Without ``keep_raw`` in the
+        storage policy the source variant is deleted once it was read from S3.
+        ``gain_db`` from ``normalize_project`` replaces the per-shot peak normalization.
         """
+        codec = self.storage.codec(variant)
         async with S3AsyncSaver(**self._s3_config) as saver:
-            wav_bytes = await self._resolve_audio_bytes(
+            samples, sample_rate = await self._resolve_audio(
                 audio, hierarchy_id, source_variant, saver
             )
-            sound = AudioSegment.from_file(io.BytesIO(wav_bytes), format="wav")
+            if gain_db is not None:
+                samples = samples * np.float32(10 ** (gain_db / 20))
+            pcm = (np.clip(to_layout(samples, self.channels), -1.0, 1.0) * 32767).astype("<i2")
+            sound = AudioSegment(
+                pcm.tobytes(),
+                frame_rate=sample_rate,
+                sample_width=2,
+                channels=1 if pcm.ndim == 1 else pcm.shape[1],
+            )
 
-            # normalize loudness
-            sound = effects.normalize(sound)
+            # normalize loudness, unless the project-wide gain was applied above
+            if gain_db is None:
+                sound = effects.normalize(sound)
 
-            # adjust playback speed (tempo)
-            sound = sound._spawn(
-                sound.raw_data,
-                overrides={"frame_rate": int(sound.frame_rate * speed)}
-            ).set_frame_rate(sound.frame_rate)
+            # adjust playback speed (tempo); this resamples, so it is skipped at speed 1
+            if speed != 1.0:
+                sound = sound._spawn(
+                    sound.raw_data,
+                    overrides={"frame_rate": int(sound.frame_rate * speed)}
+                ).set_frame_rate(sound.frame_rate)
+
+            # audio stored for another profile is converted once, matching audio is not touched
+            if sound.frame_rate != self.sample_rate:
+                sound = sound.set_frame_rate(self.sample_rate)
 
             # add light reverb (simulated with echo overlay)
             if reverb:
@@ -134,12 +277,12 @@ class SileroTTSProcessor:
                 echo = sound.overlay(sound - abs(decay), position=delay)
                 sound = echo
 
-            buffer = io.BytesIO()
-            sound.export(buffer, format="wav")
-            buffer.seek(0)
-
+            data = await self.encoder.encode(segment_to_array(sound), sound.frame_rate, codec)
             key = self._build_s3_key(hierarchy_id, suffix=variant)
-            await saver.save(buffer.read(), key, content_type="audio/wav")
+            await saver.save(data, key, content_type=codec.content_type)
+
+            if audio is None and not self.storage.keep_raw:
+                await saver.delete(self._build_s3_key(hierarchy_id, suffix=source_variant))
 
         print(
             f"Processed audio saved to s3://{self.bucket}/{key} "
@@ -147,10 +290,97 @@ class SileroTTSProcessor:
         )
         return key
 
-    def _build_s3_key(self, hierarchy_id: str, *, suffix: Optional[str] = None, extension: str = "wav") -> str:
+    async def measure_loudness(
+        self, hierarchy_ids: Iterable[str], *, variant: str = "raw", concurrency: int = 4
+    ) -> list[ShotLoudness]:
+        """First loudness pass: integrated loudness of every stored shot, in the order given.
+
+        At most ``concurrency`` shots are downloaded and held in memory at a time;
+        only the gating block powers of a shot are kept after it is measured.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def measure(saver, hierarchy_id: str) -> ShotLoudness:
+            async with semaphore:
+                samples, sample_rate = await self._resolve_audio(None, hierarchy_id, variant, saver)
+                return await asyncio.to_thread(ShotLoudness.measure, hierarchy_id, samples, sample_rate)
+
+        async with S3AsyncSaver(**self._s3_config) as saver:
+            return list(await asyncio.gather(*(measure(saver, str(hid)) for hid in hierarchy_ids)))
+
+    async def normalize_project(
+        self,
+        hierarchy_ids: Iterable[str],
+        speed: float = 0.9,
+        reverb: bool = True,
+        *,
+        target: float = TARGET_LUFS,
+        source_variant: str = "raw",
+        concurrency: int = 4,
+    ) -> LoudnessPlan:
+        """Bring every shot of a project to ``target`` LUFS in two passes over the stored raw takes.
+
+        The first pass measures all shots, the second one runs ``process_audio``
+        with one gain per shot. Both passes work on ``concurrency`` shots at a time.
+        """
+        hierarchy_ids = [str(hid) for hid in hierarchy_ids]
+        plan = plan_gains(
+            await self.measure_loudness(hierarchy_ids, variant=source_variant, concurrency=concurrency), target
+        )
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def process(hierarchy_id: str) -> str:
+            async with semaphore:
+                return await self.process_audio(
+                    None, hierarchy_id, speed, reverb, source_variant=source_variant, gain_db=plan.gains[hierarchy_id]
+                )
+
+        await asyncio.gather(*(process(hid) for hid in hierarchy_ids))
+        print(f"Project loudness {plan.loudness:.1f} LUFS (target {target}), peak-limited shots: {list(plan.limited)}")
+        return plan
+
+    async def mix_sequence(
+        self,
+        sequence_id: str,
+        shot_ids: Iterable[str],
+        music: str,
+        beds: AmbientBeds,
+        *,
+        source_variant: Optional[str] = None,
+        variant: str = "mix",
+    ) -> str:
+        """Store the narration of a sequence with its ambient bed ducked underneath.
+
+        The processed shots are concatenated in the given order, so the renderer
+        gets one finished track per sequence and does no mixing while encoding.
+        """
+        async with S3AsyncSaver(**self._s3_config) as saver:
+            shots = [
+                await self._resolve_audio(None, str(shot_id), source_variant, saver) for shot_id in shot_ids
+            ]
+            if not shots:
+                raise ValueError(f"Sequence {sequence_id} has no shots to mix")
+            # e.g. Opus variants of a 44.1 kHz profile are stored at 48 kHz
+            narration = np.concatenate(
+                [resample(to_layout(audio, self.channels), rate, self.sample_rate) for audio, rate in shots]
+            )
+            bed = await asyncio.to_thread(beds.bed, music, len(narration), self.sample_rate)
+            mixed = await asyncio.to_thread(mix_bed, narration, bed, self.sample_rate)
+
+            codec = self.storage.codec(variant)
+            data = await self.encoder.encode(mixed, self.sample_rate, codec)
+            key = self._build_s3_key(str(sequence_id), suffix=variant)
+            await saver.save(data, key, content_type=codec.content_type)
+        print(f"Sequence mix saved to s3://{self.bucket}/{key} ({len(narration) / self.sample_rate:.1f}s)")
+        return key
+
+    def _build_s3_key(self, hierarchy_id: str, *, suffix: Optional[str] = None, extension: Optional[str] = None) -> str:
+        # the extension follows the storage codec of the variant
+        extension = extension or self.storage.codec(suffix).extension
         clean_id = str(hierarchy_id).strip()
-        if clean_id.lower().endswith(f".{extension.lower()}"):
-            clean_id = clean_id[: -(len(extension) + 1)]
+        stem, _, ext = clean_id.rpartition(".")
+        if stem and ext.lower() in EXTENSIONS:
+            clean_id = stem
 
         segments = [seg for seg in clean_id.split("-") if seg]
         if not segments:
@@ -166,6 +396,21 @@ class SileroTTSProcessor:
 
         return f"{directory}/{filename}.{extension}"
 
+    async def _resolve_audio(
+        self,
+        audio,
+        hierarchy_id: Optional[str] = None,
+        source_variant: Optional[str] = None,
+        saver: Optional["S3AsyncSaver"] = None,
+    ) -> tuple[np.ndarray, int]:
+        """Samples and sample rate of ``audio``, decoded in the encoder pool."""
+        if isinstance(audio, np.ndarray):
+            return audio, self.sample_rate
+        data = await self._resolve_audio_bytes(audio, hierarchy_id, source_variant, saver)
+        # stored variants are decoded with their codec, anything else is detected by libsndfile
+        codec = self.storage.codec(source_variant) if audio is None else None
+        return await self.encoder.decode(data, codec)
+
     async def _resolve_audio_bytes(
         self,
         audio,
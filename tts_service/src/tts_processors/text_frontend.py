@@ -0,0 +1,232 @@
+"""Text front-end of the TTS processors.
+
+Silero reads digits and abbreviations poorly, so shot text is normalized into
+plain words first. Stress and ё placement is done once per sentence and
+cached, the model then gets the marked up text and skips its own accentor.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from tts_processors.calibration import split_sentences
+
+_UNITS = ["ноль", "один", "два", "три", "четыре", "пять", "шесть", "семь", "восемь", "девять"]
+_UNITS_F = {1: "одна", 2: "две"}
+_TEENS = [
+    "десять", "одиннадцать", "двенадцать", "тринадцать", "четырнадцать",
+    "пятнадцать", "шестнадцать", "семнадцать", "восемнадцать", "девятнадцать",
+]
+_TENS = ["", "", "двадцать", "тридцать", "сорок", "пятьдесят", "шестьдесят", "семьдесят", "восемьдесят", "девяносто"]
+_HUNDREDS = ["", "сто", "двести", "триста", "четыреста", "пятьсот", "шестьсот", "семьсот", "восемьсот", "девятьсот"]
+_SCALES = [
+    (10 ** 9, ("миллиард", "миллиарда", "миллиардов"), False),
+    (10 ** 6, ("миллион", "миллиона", "миллионов"), False),
+    (10 ** 3, ("тысяча", "тысячи", "тысяч"), True),
+]
+_ORDINALS = [
+    "", "первый", "второй", "третий", "четвёртый", "пятый", "шестой", "седьмой", "восьмой", "девятый",
+    "десятый", "одиннадцатый", "двенадцатый", "тринадцатый", "четырнадцатый", "пятнадцатый",
+    "шестнадцатый", "семнадцатый", "восемнадцатый", "девятнадцатый", "двадцатый", "двадцать первый",
+]
+_MONTHS = [
+    "", "января", "февраля", "марта", "апреля", "мая", "июня",
+    "июля", "августа", "сентября", "октября", "ноября", "декабря",
+]
+_ROMAN = {"I": 1, "V": 5, "X": 10, "L": 50, "C": 100}
+
+# applied in order, longer forms first
+ABBREVIATIONS = [
+    (r"до\s?н\.\s?э\.", "до нашей эры"),
+    (r"н\.\s?э\.", "нашей эры"),
+    (r"т\.\s?е\.", "то есть"),
+    (r"т\.\s?д\.", "так далее"),
+    (r"т\.\s?п\.", "тому подобное"),
+    (r"и\s?др\.", "и другие"),
+    (r"см\.", "смотри"),
+    (r"№\s?", "номер "),
+]
+# units after a number agree with it: 1 километр, 2 километра, 5 километров
+UNITS = [
+    (r"гг\.", ("год", "года", "годы"), False),
+    (r"г\.", ("год", "год", "год"), False),
+    (r"вв\.", ("век", "века", "века"), False),
+    (r"в\.", ("век", "век", "век"), False),
+    (r"тыс\.", ("тысяча", "тысячи", "тысяч"), True),
+    (r"млн\.?", ("миллион", "миллиона", "миллионов"), False),
+    (r"млрд\.?", ("миллиард", "миллиарда", "миллиардов"), False),
+    (r"км\b", ("километр", "километра", "километров"), False),
+    (r"%", ("процент", "процента", "процентов"), False),
+]
+_ABBREVIATIONS = [(re.compile(r"(?<!\w)" + pattern, re.IGNORECASE), words) for pattern, words in ABBREVIATIONS]
+_UNITS_AFTER_NUMBER = [
+    (re.compile(r"\b(\d+)\s?" + pattern, re.IGNORECASE), forms, feminine) for pattern, forms, feminine in UNITS
+]
+_SENTENCE_START = re.compile(r"\s+[A-ZА-ЯЁ]")
+_GROUPED = re.compile(r"\b\d{1,3}(?:[ \u00a0\u202f]\d{3})+\b")
+_DATE = re.compile(r"\b(\d{1,2})\.(\d{1,2})\.(\d{3,4})\b")
+_CENTURY = re.compile(r"\b([IVXLC]+)\s?(?:в\.|век\b)")
+_DECIMAL = re.compile(r"\b(\d+)[,.](\d+)\b")
+_NUMBER = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+
+def _plural(n: int, forms: tuple[str, str, str]) -> str:
+    if 11 <= n % 100 <= 14:
+        return forms[2]
+    if n % 10 == 1:
+        return forms[0]
+    if 2 <= n % 10 <= 4:
+        return forms[1]
+    return forms[2]
+
+
+def _below_thousand(n: int, feminine: bool) -> list[str]:
+    words = [_HUNDREDS[n // 100]] if n >= 100 else []
+    n %= 100
+    if 10 <= n < 20:
+        words.append(_TEENS[n - 10])
+        return words
+    if n >= 20:
+        words.append(_TENS[n // 10])
+        n %= 10
+    if n:
+        words.append(_UNITS_F.get(n, _UNITS[n]) if feminine else _UNITS[n])
+    return words
+
+
+def number_to_words(n: int, feminine: bool = False) -> str:
+    """Spell a cardinal number in Russian, nominative case."""
+    if n < 0:
+        return "минус " + number_to_words(-n, feminine)
+    if n == 0:
+        return _UNITS[0]
+    words: list[str] = []
+    for scale, forms, scale_feminine in _SCALES:
+        if n >= scale:
+            count, n = divmod(n, scale)
+            # "тысяча", not "одна тысяча"
+            head = [] if count == 1 and scale_feminine else _below_thousand(count, scale_feminine)
+            words += head + [_plural(count, forms)]
+    words += _below_thousand(n, feminine)
+    return " ".join(w for w in words if w)
+
+
+def _roman(value: str) -> Optional[int]:
+    total = 0
+    for i, char in enumerate(value):
+        v = _ROMAN[char]
+        total += -v if i + 1 < len(value) and _ROMAN[value[i + 1]] > v else v
+    return total
+
+
+def _century(m: re.Match) -> str:
+    n = _roman(m.group(1))
+    if not n or n >= len(_ORDINALS):
+        return m.group(0)
+    return _expand(f"{_ORDINALS[n]} век")(m)
+
+
+def _date(m: re.Match) -> str:
+    day, month, year = (int(g) for g in m.groups())
+    if not (1 <= day <= 31 and 1 <= month <= 12):
+        return m.group(0)
+    return f"{day} {_MONTHS[month]} {year} года"
+
+
+def _expand(words: str, keep_case: bool = False) -> Callable[[re.Match], str]:
+    def replace(m: re.Match) -> str:
+        text = words
+        # with ``keep_case`` a capitalized abbreviation, e.g. "См." opening a sentence, stays capitalized
+        if keep_case and m.group(0)[0].isupper():
+            text = text[0].upper() + text[1:]
+        # keep the full stop when the abbreviation ends the sentence
+        ends_sentence = m.group(0).endswith(".") and _SENTENCE_START.match(m.string, m.end())
+        return text + "." if ends_sentence else text
+
+    return replace
+
+
+def normalize_text(text: str) -> str:
+    """Spell out numbers, dates, centuries and abbreviations of Russian text.
+
+    Numbers are spelled as nominative cardinals, only units right after a
+    number agree with it; case agreement with the rest of the sentence is not
+    attempted.
+    """
+    text = _GROUPED.sub(lambda m: re.sub(r"\D", "", m.group(0)), text)
+    text = _DATE.sub(_date, text)
+    text = _CENTURY.sub(_century, text)
+    text = _DECIMAL.sub(lambda m: f"{m.group(1)} целых {m.group(2)}", text)
+    for pattern, forms, feminine in _UNITS_AFTER_NUMBER:
+        text = pattern.sub(
+            lambda m: _expand(f"{number_to_words(int(m.group(1)), feminine)} {_plural(int(m.group(1)), forms)}")(m),
+            text,
+        )
+    for pattern, words in _ABBREVIATIONS:
+        text = pattern.sub(_expand(words, keep_case=True), text)
+    text = _NUMBER.sub(lambda m: number_to_words(int(m.group(0))), text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def sentence_key(sentence: str) -> str:
+    return hashlib.sha1(sentence.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class PreparedSentence:
+    normalized: str
+    # normalized text with stress marks and ё if an accentor is configured
+    text: str
+    key: str
+
+
+class TextFrontend:
+    """Normalizes shot text, splits it into sentences and prepares each of them once.
+
+    ``accentor`` takes normalized text and returns it with ``+`` stress marks
+    and ё placed, the format Silero accepts with ``put_accent=False``. Prepared
+    sentences are kept in an LRU cache keyed by the normalized sentence hash.
+    """
+
+    def __init__(
+        self,
+        accentor: Optional[Callable[[str], str]] = None,
+        *,
+        normalizer: Callable[[str], str] = normalize_text,
+        cache_size: int = 4096,
+    ):
+        self.accentor = accentor
+        self.normalizer = normalizer
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def accented(self) -> bool:
+        """Whether stress and ё are already placed, so the model must not redo it."""
+        return self.accentor is not None
+
+    def _prepare_sentence(self, normalized: str) -> PreparedSentence:
+        key = sentence_key(normalized)
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return PreparedSentence(normalized, text, key)
+            self.misses += 1
+        text = self.accentor(normalized) if self.accentor is not None else normalized
+        with self._lock:
+            self._cache[key] = text
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return PreparedSentence(normalized, text, key)
+
+    def prepare(self, text: str) -> list[PreparedSentence]:
+        # abbreviations end with dots, so sentences are split after normalization
+        return [self._prepare_sentence(sentence) for sentence in split_sentences(self.normalizer(text))]
@@ -0,0 +1,206 @@
+"""Progressive WAV and FLAC upload.
+
+Audio is uploaded to S3 as a multipart upload while it is being synthesized.
+The data size in the WAV header and the FLAC stream info are unknown until
+the end, so the first part is kept in memory and uploaded again with the
+final header before the upload is completed. Memory use is bounded by two parts.
+"""
+import abc
+import struct
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+from tts_processors.audio_codecs import AudioCodec
+from tts_processors.audio_contract import to_layout
+
+# S3 minimum size of every part but the last
+MIN_PART_SIZE = 5 * 1024 * 1024
+HEADER_SIZE = 44
+
+
+def wav_header(data_size: int, sample_rate: int, channels: int = 1, bits: int = 16) -> bytes:
+    """Canonical 44 byte PCM WAV header for ``data_size`` bytes of samples."""
+    block_align = channels * bits // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, bits,
+        b"data", data_size,
+    )
+
+
+def to_pcm16(audio: np.ndarray) -> bytes:
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class _MultipartStream(abc.ABC):
+    """Multipart upload of a file whose leading bytes are rewritten once it is complete."""
+
+    def __init__(self, saver, key: str, content_type: str, part_size: int):
+        self.saver = saver
+        self.key = key
+        self.content_type = content_type
+        self.part_size = part_size
+        self._buffer = bytearray()
+        self._first: Optional[bytearray] = None
+        # size of the parts uploaded so far
+        self._uploaded = 0
+        self._etags: list[str] = []
+        self._upload_id: Optional[str] = None
+
+    def _patch(self, offset: int, data: bytes) -> None:
+        """Overwrite bytes written earlier, in the first part or in the pending buffer."""
+        end = offset + len(data)
+        if self._first is not None and end <= len(self._first):
+            self._first[offset:end] = data
+        elif offset >= self._uploaded:
+            self._buffer[offset - self._uploaded:end - self._uploaded] = data
+        else:
+            raise ValueError(f"Cannot rewrite bytes {offset}..{end} of {self.key}, they are already uploaded")
+
+    async def _flush(self) -> None:
+        if self._upload_id is None:
+            self._upload_id = await self.saver.create_multipart(self.key, content_type=self.content_type)
+        part, self._buffer = self._buffer, bytearray()
+        if self._first is None:
+            self._first = part
+        self._uploaded += len(part)
+        self._etags.append(await self.saver.upload_part(self.key, self._upload_id, len(self._etags) + 1, part))
+
+    async def _flush_full(self) -> None:
+        if len(self._buffer) >= self.part_size:
+            await self._flush()
+
+    async def _complete(self) -> str:
+        if self._upload_id is None:
+            await self.saver.save(self._buffer, self.key, content_type=self.content_type)
+            return self.key
+        if self._buffer:
+            await self._flush()
+        self._etags[0] = await self.saver.upload_part(self.key, self._upload_id, 1, self._first)
+        await self.saver.complete_multipart(self.key, self._upload_id, self._etags)
+        return self.key
+
+    @abc.abstractmethod
+    async def close(self) -> str:
+        """Write the final leading bytes, complete the upload and return its key."""
+
+    async def abort(self) -> None:
+        if self._upload_id is not None:
+            upload_id, self._upload_id = self._upload_id, None
+            await self.saver.abort_multipart(self.key, upload_id)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            await self.abort()
+            return
+        try:
+            await self.close()
+        except BaseException:
+            await self.abort()
+            raise
+
+
+class WavStreamUpload(_MultipartStream):
+    """Writes 16-bit PCM to ``key`` through an opened ``S3AsyncSaver`` as it arrives.
+
+    Mono chunks are duplicated to every channel. Short audio that never fills a part is uploaded with a single ``save``::
+
+        async with WavStreamUpload(saver, key, 48000) as upload:
+            async for chunk in tts.stream(text):
+                await upload.write(chunk)
+    """
+
+    def __init__(self, saver, key: str, sample_rate: int, *, channels: int = 1, part_size: int = MIN_PART_SIZE):
+        super().__init__(saver, key, "audio/wav", part_size)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.data_size = 0
+        self._buffer += wav_header(0xFFFFFFFF - 36, sample_rate, channels)
+
+    @property
+    def samples(self) -> int:
+        return self.data_size // (2 * self.channels)
+
+    async def write(self, audio: np.ndarray) -> None:
+        pcm = to_pcm16(to_layout(audio, self.channels))
+        self._buffer += pcm
+        self.data_size += len(pcm)
+        await self._flush_full()
+
+    async def close(self) -> str:
+        self._patch(0, wav_header(self.data_size, self.sample_rate, self.channels))
+        return await self._complete()
+
+
+class _Sink:
+    """Seekable file object libsndfile encodes into, backed by the parts of a ``_MultipartStream``."""
+
+    def __init__(self, stream: _MultipartStream):
+        self.stream = stream
+        self.size = 0
+        self.position = 0
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        self.position = (0, self.position, self.size)[whence] + offset
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        if self.position == self.size:
+            self.stream._buffer += data
+            self.size += len(data)
+        else:
+            self.stream._patch(self.position, data)
+        self.position += len(data)
+        return len(data)
+
+
+class SoundFileStreamUpload(_MultipartStream):
+    """Encodes audio with a libsndfile ``codec`` (FLAC, WAV, Ogg) and uploads it to ``key`` as it arrives.
+
+    libsndfile rewrites the stream header once the file is closed; the
+    rewritten bytes are patched into the first part, as for ``WavStreamUpload``.
+    """
+
+    def __init__(
+        self,
+        saver,
+        key: str,
+        sample_rate: int,
+        codec: AudioCodec,
+        *,
+        channels: int = 1,
+        part_size: int = MIN_PART_SIZE,
+    ):
+        if codec.format is None:
+            raise ValueError(f"{codec.name} is not encoded by libsndfile and cannot be streamed")
+        super().__init__(saver, key, codec.content_type, part_size)
+        self.channels = channels
+        self.samples = 0
+        self._file = sf.SoundFile(
+            _Sink(self), "w", sample_rate, channels, format=codec.format, subtype=codec.subtype
+        )
+
+    async def write(self, audio: np.ndarray) -> None:
+        audio = to_layout(audio, self.channels)
+        self._file.write(audio)
+        self.samples += len(audio)
+        await self._flush_full()
+
+    async def close(self) -> str:
+        # writes the final header through ``_Sink.write``
+        self._file.close()
+        return await self._complete()
+
+    async def abort(self) -> None:
+        self._file.close()
+        await super().abort()
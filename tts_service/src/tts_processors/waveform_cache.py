@@ -0,0 +1,108 @@
+"""Per-sentence synthesis with a waveform cache.
+
+Shot text is synthesized sentence by sentence, and every waveform is stored
+under the hash of (prepared sentence, model, speaker, sample rate). After a
+light edit of a shot only the changed sentences reach the model.
+"""
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator, Optional, Union
+
+import numpy as np
+
+from tts_processors.text_frontend import PreparedSentence, TextFrontend
+
+# silence between concatenated sentences, seconds
+SENTENCE_PAUSE = 0.2
+
+
+def waveform_key(text: str, speaker: str, sample_rate: int, model: str) -> str:
+    raw = "\x1f".join([model, speaker, str(sample_rate), text])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class WaveformCache:
+    """Directory of ``.npy`` waveforms (``TTS_CACHE_DIR``), shared by all processes of the host."""
+
+    def __init__(self, root: Union[str, Path, None] = None):
+        self.root = Path(root or os.getenv("TTS_CACHE_DIR", ".tts_cache"))
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        try:
+            return np.load(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, audio: np.ndarray) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.stem}.{os.getpid()}.npy")
+        np.save(tmp, np.asarray(audio, dtype=np.float32))
+        os.replace(tmp, path)
+
+
+class SentenceSynthesizer:
+    """Synthesizes text sentence by sentence through ``synth``, reusing cached waveforms.
+
+    ``synth`` takes prepared sentence text and returns a mono float waveform at
+    ``sample_rate``.
+    """
+
+    def __init__(
+        self,
+        synth: Callable[[str], np.ndarray],
+        frontend: Optional[TextFrontend] = None,
+        cache: Optional[WaveformCache] = None,
+        *,
+        speaker: str,
+        sample_rate: int,
+        model: str,
+        pause: float = SENTENCE_PAUSE,
+    ):
+        self.synth = synth
+        self.frontend = frontend or TextFrontend()
+        self.cache = cache
+        self.speaker = speaker
+        self.sample_rate = sample_rate
+        self.model = model
+        self.pause = pause
+        self.synthesized = 0
+        self.cached = 0
+
+    def sentence_audio(self, sentence: PreparedSentence) -> np.ndarray:
+        key = waveform_key(sentence.text, self.speaker, self.sample_rate, self.model)
+        if self.cache is not None:
+            audio = self.cache.get(key)
+            if audio is not None:
+                self.cached += 1
+                return audio
+        audio = np.asarray(self.synth(sentence.text), dtype=np.float32)
+        self.synthesized += 1
+        if self.cache is not None:
+            self.cache.put(key, audio)
+        return audio
+
+    def _gap(self) -> np.ndarray:
+        return np.zeros(int(self.pause * self.sample_rate), dtype=np.float32)
+
+    def stream(self, text: str) -> Iterator[np.ndarray]:
+        """Yield the audio of each sentence, preceded by the pause after the previous one."""
+        for i, sentence in enumerate(self.frontend.prepare(text)):
+            audio = self.sentence_audio(sentence)
+            yield np.concatenate([self._gap(), audio]) if i else audio
+
+    async def astream(self, text: str) -> AsyncIterator[np.ndarray]:
+        """Async version of ``stream``; the model runs in a worker thread, one sentence at a time."""
+        sentences = self.frontend.prepare(text)
+        for i, sentence in enumerate(sentences):
+            audio = await asyncio.to_thread(self.sentence_audio, sentence)
+            yield np.concatenate([self._gap(), audio]) if i else audio
+
+    def synthesize(self, text: str) -> np.ndarray:
+        parts = list(self.stream(text))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
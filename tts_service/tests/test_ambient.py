@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from tts_processors.ambient import (
+    AmbientBeds,
+    LibraryAmbientSource,
+    SynthAmbientSource,
+    bed_key,
+    ducking_gain,
+    mix_bed,
+)
+from tts_processors.loudness import integrated_loudness
+from tts_processors.waveform_cache import WaveformCache
+
+RATE = 8000
+STYLE = "Background music: ambient with light strings, steady tempo"
+
+
+class CountingSource:
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def loop(self, style, sample_rate):
+        self.calls += 1
+        return SynthAmbientSource(seconds=2.0).loop(style, sample_rate)
+
+
+def _narration(speech: tuple[float, float], seconds: float = 4.0) -> np.ndarray:
+    audio = np.zeros(int(seconds * RATE), dtype=np.float32)
+    start, end = (int(x * RATE) for x in speech)
+    audio[start:end] = 0.3 * np.sin(np.arange(end - start) * 0.3)
+    return audio
+
+
+class TestBeds:
+    def test_synth_loop_is_seamless_and_seeded_by_style(self):
+        source = SynthAmbientSource(seconds=2.0)
+        loop = source.loop(STYLE, RATE)
+        step = np.abs(np.diff(loop)).max()
+        assert abs(loop[0] - loop[-1]) <= step
+        assert np.array_equal(loop, source.loop(STYLE.upper(), RATE))
+        assert not np.array_equal(loop, source.loop("orchestral with warm brass", RATE))
+
+    def test_loop_is_leveled_and_cached_per_style(self, tmp_path):
+        source = CountingSource()
+        beds = AmbientBeds(source, WaveformCache(tmp_path), level=-28.0)
+        loop = beds.loop(STYLE, RATE)
+        assert integrated_loudness(loop, RATE) == pytest.approx(-28.0, abs=0.1)
+        same = AmbientBeds(source, WaveformCache(tmp_path), level=-28.0).loop(STYLE + "!", RATE)
+        assert np.array_equal(same, loop) and source.calls == 1
+        # another level is generated again, not served from the -28 LUFS loop
+        quieter = AmbientBeds(source, WaveformCache(tmp_path)).loop(STYLE, RATE)
+        assert source.calls == 2
+        assert integrated_loudness(quieter, RATE) == pytest.approx(-30.0, abs=0.1)
+        assert bed_key(STYLE, "counting", RATE, -30.0) != bed_key(STYLE, "counting", 2 * RATE, -30.0)
+
+    def test_library_loops_are_cached_per_chosen_file(self, tmp_path):
+        library = tmp_path / "library"
+        library.mkdir()
+        sf.write(library / "strings.wav", 0.1 * np.sin(np.arange(RATE) * 0.05), RATE)
+        beds = AmbientBeds(LibraryAmbientSource(library), WaveformCache(tmp_path / "cache"))
+        strings = beds.loop(STYLE, RATE)
+        sf.write(library / "light_strings.wav", 0.1 * np.sin(np.arange(2 * RATE) * 0.05), RATE)
+        assert len(beds.loop(STYLE, RATE)) == 2 * RATE != len(strings)
+        assert beds.generated == 2
+
+    def test_minor_mode_matches_whole_words(self):
+        source = SynthAmbientSource()
+        assert source.minor("Epic war drums")
+        assert not source.minor("warm brass, sadness-free")
+
+    def test_bed_is_tiled_with_fades(self):
+        bed = AmbientBeds(SynthAmbientSource(seconds=2.0), fade=0.5).bed(STYLE, 5 * RATE, RATE)
+        assert len(bed) == 5 * RATE
+        assert bed[0] == 0 and bed[-1] == 0
+        assert np.array_equal(bed[RATE:int(1.5 * RATE)], bed[3 * RATE:int(3.5 * RATE)])
+
+    def test_library_selects_by_style_words(self, tmp_path):
+        tone = 0.1 * np.sin(np.arange(RATE) * 0.05)
+        sf.write(tmp_path / "light_strings.wav", tone, RATE)
+        sf.write(tmp_path / "warm_brass.wav", tone, RATE)
+        source = LibraryAmbientSource(tmp_path)
+        assert source.select(STYLE).name == "light_strings.wav"
+        assert len(source.loop(STYLE, 2 * RATE)) == 2 * RATE
+        # no matching file falls back to the generated pad
+        assert len(source.loop("drums", RATE)) == int(SynthAmbientSource().seconds * RATE)
+
+
+class TestDucking:
+    def test_bed_ducks_before_speech_and_recovers_after(self):
+        gain = ducking_gain(_narration((1.0, 2.0)), RATE, depth_db=-10.0, attack=0.15, release=0.6)
+        depth = 10 ** (-10 / 20)
+        assert gain[int(0.5 * RATE)] == pytest.approx(1.0)
+        assert gain[int(0.98 * RATE)] == pytest.approx(depth, rel=0.05)
+        assert gain[int(2.4 * RATE)] == pytest.approx(depth, rel=0.05)
+        assert gain[-1] == pytest.approx(1.0)
+
+    def test_mix_keeps_narration_and_layout(self):
+        narration = np.column_stack([_narration((1.0, 2.0))] * 2)
+        bed = np.full(len(narration), 0.1, dtype=np.float32)
+        mixed = mix_bed(narration, bed, RATE)
+        assert mixed.shape == narration.shape
+        assert mixed[0, 0] == pytest.approx(0.1)
+        speech = slice(int(1.2 * RATE), int(1.8 * RATE))
+        assert np.allclose(mixed[speech] - narration[speech], 0.1 * 10 ** (-10 / 20), atol=1e-3)
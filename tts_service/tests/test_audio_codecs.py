@@ -0,0 +1,85 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from tts_processors.audio_codecs import (
+    CODECS,
+    AudioEncoder,
+    StoragePolicy,
+    codec_for_key,
+    decode_audio,
+    encode_audio,
+)
+
+
+def _speech_like(seconds: float = 2.0, sample_rate: int = 48000) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    return (0.4 * envelope * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+class TestCodecs:
+    def test_flac_is_lossless_and_smaller_than_wav(self):
+        audio = _speech_like()
+        flac = encode_audio(audio, 48000, CODECS["flac"])
+        wav = encode_audio(audio, 48000, CODECS["wav"])
+        decoded, rate = decode_audio(flac)
+        assert rate == 48000
+        assert np.allclose(decoded, audio, atol=1 / 32767)
+        assert len(flac) < len(wav)
+
+    def test_opus_is_much_smaller_and_keeps_duration(self):
+        audio = _speech_like()
+        opus = encode_audio(audio, 48000, CODECS["opus"])
+        decoded, rate = decode_audio(opus)
+        assert rate == 48000
+        assert abs(len(decoded) - len(audio)) < 0.05 * len(audio)
+        assert len(opus) * 10 < len(encode_audio(audio, 48000, CODECS["wav"]))
+
+    def test_opus_at_an_unsupported_rate_is_stored_at_48k(self):
+        audio = np.repeat(_speech_like(1.0, 44100)[:, None], 2, axis=1)
+        decoded, rate = decode_audio(encode_audio(audio, 44100, CODECS["opus"]))
+        assert rate == 48000 and decoded.shape[1] == 2
+        assert abs(len(decoded) - 48000) < 0.05 * 48000
+
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="AAC is encoded by ffmpeg")
+    def test_aac_round_trip(self):
+        audio = _speech_like()
+        decoded, rate = decode_audio(encode_audio(audio, 48000, CODECS["aac"]), CODECS["aac"])
+        assert rate == 48000
+        assert abs(len(decoded) - len(audio)) < 0.05 * len(audio)
+
+    def test_codec_for_key(self):
+        assert codec_for_key("Pr0/Ep0/Pr0-Ep0_raw.flac").name == "flac"
+        assert codec_for_key("Pr0/Ep0/Pr0-Ep0.m4a").name == "aac"
+        with pytest.raises(ValueError):
+            codec_for_key("Pr0/Ep0/Pr0-Ep0.mp3")
+
+
+class TestStoragePolicy:
+    def test_raw_and_render_variants_use_their_codecs(self):
+        policy = StoragePolicy(raw_codec="flac", render_codec="aac")
+        assert policy.codec("raw").extension == "flac"
+        assert policy.codec(None).extension == "m4a"
+
+    def test_unknown_codec_is_rejected(self):
+        with pytest.raises(ValueError):
+            StoragePolicy(render_codec="mp3")
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TTS_RENDER_CODEC", "wav")
+        monkeypatch.setenv("TTS_KEEP_RAW", "0")
+        assert StoragePolicy.from_env() == StoragePolicy(render_codec="wav", keep_raw=False)
+
+
+class TestAudioEncoder:
+    async def test_encodes_off_the_event_loop(self):
+        encoder = AudioEncoder(workers=2)
+        try:
+            audio = _speech_like(0.5)
+            data = await encoder.encode(audio, 48000, CODECS["flac"])
+            decoded, rate = await encoder.decode(data)
+        finally:
+            encoder.close()
+        assert rate == 48000 and len(decoded) == len(audio)
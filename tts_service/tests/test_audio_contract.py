@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from tts_processors.audio_codecs import StoragePolicy
+from tts_processors.audio_contract import check_audio_contract, resample, to_layout
+from tts_processors.wav_stream import WavStreamUpload, wav_header
+
+
+class FakeSaver:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+
+    async def save(self, data, key, *, content_type=None):
+        self.objects[key] = bytes(data)
+
+
+class TestCheckAudioContract:
+    def test_matching_profile_has_no_resample(self):
+        assert check_audio_contract(48000) == []
+        assert check_audio_contract(24000, storage=StoragePolicy(render_codec="opus")) == []
+
+    def test_unsupported_model_rate(self):
+        (issue,) = check_audio_contract(44100, storage=StoragePolicy(render_codec="flac"))
+        assert issue.stage == "tts" and issue.source_rate == 48000 and issue.target_rate == 44100
+
+    def test_opus_storage_rate(self):
+        stages = [issue.stage for issue in check_audio_contract(44100, model_rates=(44100,))]
+        assert stages == ["storage (render)"]
+
+    def test_speed_change_is_reported(self):
+        (issue,) = check_audio_contract(48000, speed=0.9)
+        assert issue.stage == "process_audio" and issue.source_rate == 43200
+
+
+class TestResample:
+    def test_length_and_tone_are_kept(self):
+        t = np.arange(48000) / 48000
+        tone = np.sin(2 * np.pi * 440 * t).astype(np.float32)
+        out = resample(tone, 48000, 44100)
+        assert len(out) == 44100 and out.dtype == np.float32
+        expected = np.sin(2 * np.pi * 440 * np.arange(44100) / 44100)
+        assert np.max(np.abs(out - expected)) < 0.01
+
+    def test_matching_rate_is_untouched(self):
+        audio = np.ones(10, dtype=np.float32)
+        assert resample(audio, 24000, 24000) is audio
+
+
+class TestLayout:
+    def test_mono_to_stereo_and_back(self):
+        audio = np.linspace(-1, 1, 10, dtype=np.float32)
+        stereo = to_layout(audio, 2)
+        assert stereo.shape == (10, 2)
+        assert np.array_equal(to_layout(stereo, 1), audio)
+        assert to_layout(audio, 1) is audio
+
+    @pytest.mark.parametrize("channels", [1, 2])
+    async def test_wav_stream_writes_the_profile_layout(self, channels):
+        saver = FakeSaver()
+        async with WavStreamUpload(saver, "a.wav", 1000, channels=channels) as upload:
+            await upload.write(np.zeros(100, dtype=np.float32))
+        data = saver.objects["a.wav"]
+        assert data[:44] == wav_header(100 * 2 * channels, 1000, channels)
+        assert upload.samples == 100
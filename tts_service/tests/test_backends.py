@@ -0,0 +1,155 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from tts_processors.backends import (
+    BACKENDS,
+    BackendPool,
+    SileroBackend,
+    TTSBackend,
+    VoiceChoice,
+    VoiceRouter,
+    _torch_load_overrides,
+)
+from tts_processors.text_frontend import TextFrontend
+
+
+class FakeBackend(TTSBackend):
+    name = "fake"
+    sample_rate = 100
+    loads = 0
+
+    def __init__(self, speaker: str = "default"):
+        super().__init__()
+        self.speaker = speaker
+        self.calls: list[list[str]] = []
+
+    def _load(self) -> None:
+        FakeBackend.loads += 1
+
+    def _synthesize_batch(self, texts, speaker):
+        self.calls.append(list(texts))
+        return [np.ones((len(text), 1), dtype=np.float64) for text in texts]
+
+
+@pytest.fixture
+def registry():
+    FakeBackend.loads = 0
+    return {**BACKENDS, "fake": FakeBackend}
+
+
+class TestTTSBackend:
+    def test_lazy_load_and_mono_float32(self):
+        backend = FakeBackend()
+        assert not backend.loaded
+        audio = backend.synthesize_batch(["раз", "два три"])
+        assert [a.shape for a in audio] == [(3,), (7,)]
+        assert audio[0].dtype == np.float32
+        backend.warm_up()
+        assert backend.loaded and FakeBackend.loads == 1
+        assert len(backend.calls) == 2
+
+    def test_existing_experiments_are_registered(self):
+        assert set(BACKENDS) == {"silero", "mms", "xtts"}
+        assert all(issubclass(cls, TTSBackend) for cls in BACKENDS.values())
+
+    def test_models_load_one_at_a_time(self):
+        active, overlaps = [], []
+
+        class SlowBackend(FakeBackend):
+            def _load(self):
+                active.append(self)
+                overlaps.append(len(active))
+                time.sleep(0.05)
+                active.remove(self)
+
+        threads = [threading.Thread(target=SlowBackend().load) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert overlaps == [1, 1, 1]
+
+    def test_torch_load_override_is_restored(self):
+        torch = pytest.importorskip("torch")
+        original = torch.load
+        with pytest.raises(RuntimeError, match="load failed"):
+            with _torch_load_overrides(weights_only=False):
+                assert torch.load is not original
+                raise RuntimeError("load failed")
+        assert torch.load is original
+
+
+class FakeTensor:
+    def numpy(self):
+        return np.zeros(4, dtype=np.float32)
+
+
+class FakeSilero:
+    def __init__(self):
+        self.calls = []
+
+    def apply_tts(self, **kwargs):
+        self.calls.append(kwargs)
+        return FakeTensor()
+
+
+class TestSileroBackend:
+    def _backend(self, frontend=None):
+        backend = SileroBackend("baya", 24000, frontend=frontend)
+        backend.model, backend.loaded = FakeSilero(), True
+        return backend
+
+    def test_model_places_stress_without_an_accentor(self):
+        backend = self._backend(TextFrontend())
+        backend.synthesize("Привет")
+        (call,) = backend.model.calls
+        assert call["put_accent"] and call["put_yo"]
+        assert call["speaker"] == "baya" and call["sample_rate"] == 24000
+
+    def test_accented_text_is_not_accented_again(self):
+        backend = self._backend(TextFrontend(lambda text: text.replace("е", "+е")))
+        backend.synthesize("Привет", "aidar")
+        (call,) = backend.model.calls
+        assert not call["put_accent"] and not call["put_yo"]
+        assert call["speaker"] == "aidar"
+
+
+class TestVoiceRouter:
+    def test_explicit_backend_and_speaker(self, registry):
+        router = VoiceRouter(backends=registry)
+        assert router.select("xtts:narrator.wav, calm") == VoiceChoice("xtts", "narrator.wav")
+        assert router.select("fake:robot") == VoiceChoice("fake", "robot")
+        assert router.select("Tone: calm") == VoiceChoice("silero")
+
+    def test_keyword_rules(self):
+        router = VoiceRouter()
+        assert router.select("Female voice, warm") == VoiceChoice("silero", "baya")
+        assert router.select("Tone: expressive") == VoiceChoice("silero", "aidar")
+        assert router.select("") == VoiceChoice("silero")
+
+    def test_custom_rules_and_default(self):
+        router = VoiceRouter([(r"robot", VoiceChoice("mms"))], default=VoiceChoice("xtts"))
+        assert router.select("a robot voice").backend == "mms"
+        assert router.select("calm").backend == "xtts"
+
+
+class TestBackendPool:
+    def test_backends_stay_loaded(self, registry):
+        pool = BackendPool(VoiceRouter(default=VoiceChoice("fake"), backends=registry), {"fake": {"speaker": "x"}})
+        first, speaker = pool.for_voice("calm")
+        second, _ = pool.for_voice("fake:robot")
+        assert first is second and first.speaker == "x" and speaker is None
+        assert FakeBackend.loads == 1
+
+    def test_added_backend_is_reused(self, registry):
+        pool = BackendPool(VoiceRouter(default=VoiceChoice("fake"), backends=registry))
+        own = pool.add(FakeBackend("own"))
+        backend, _ = pool.for_voice("calm")
+        assert backend is own
+
+    def test_unknown_backend(self, registry):
+        with pytest.raises(ValueError, match="Unknown TTS backend"):
+            BackendPool(VoiceRouter(backends=registry)).get("espeak")
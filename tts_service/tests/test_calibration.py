@@ -0,0 +1,90 @@
+from uuid import UUID
+
+import numpy as np
+import pytest
+
+from scenario_dto.dto import SequenceDTO
+from tts_processors.calibration import (
+    DEFAULT_CHARS_PER_SECOND,
+    DurationCalibrator,
+    SpeechRateStore,
+    spoken_chars,
+    split_sentences,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SpeechRateStore(tmp_path / "stats.sqlite3")
+    yield store
+    store.close()
+
+
+def _sequence(*texts: str) -> SequenceDTO:
+    return SequenceDTO.model_validate({
+        "id": UUID(int=1), "title": "seq", "hierarchy_id": "Pr0-Ep0-Seq0",
+        "style": {"image": "forum", "music": "ambient"},
+        "shots": [
+            {"id": UUID(int=i + 2), "title": "shot", "hierarchy_id": f"Pr0-Ep0-Seq0-Sh{i}",
+             "style": {"voice": "calm"}, "text": text}
+            for i, text in enumerate(texts)
+        ],
+    })
+
+
+class TestText:
+    def test_spoken_chars_ignore_spaces_and_punctuation(self):
+        assert spoken_chars("Рим, 753 г. — основан!") == len("Рим753госнован")
+
+    def test_split_sentences(self):
+        assert split_sentences("Один. Два! Три? Четыре… Пять") == ["Один.", "Два!", "Три?", "Четыре…", "Пять"]
+
+
+class TestDurationCalibrator:
+    def test_prior_without_observations(self, store):
+        calibrator = DurationCalibrator(store)
+        assert calibrator.chars_per_second("eugene") == DEFAULT_CHARS_PER_SECOND["ru"]
+        assert calibrator.predict("а" * 140, "eugene") == pytest.approx(10.0)
+        assert calibrator.predict("а" * 140, "eugene", speed=0.5) == pytest.approx(20.0)
+
+    def test_learns_rate_per_speaker(self, store):
+        calibrator = DurationCalibrator(store)
+        for _ in range(50):
+            calibrator.observe_audio("а" * 100, np.zeros(10 * 48000), 48000, "slow")
+        assert calibrator.chars_per_second("slow") == pytest.approx(10.0, rel=0.05)
+        assert calibrator.chars_per_second("eugene") == DEFAULT_CHARS_PER_SECOND["ru"]
+        assert calibrator.chars_per_second("slow", lang="en") == DEFAULT_CHARS_PER_SECOND["en"]
+
+    def test_stats_persist(self, tmp_path):
+        path = tmp_path / "stats.sqlite3"
+        first = SpeechRateStore(path)
+        DurationCalibrator(first).observe("а" * 100, 20.0, "eugene")
+        first.close()
+        second = SpeechRateStore(path)
+        try:
+            assert second.get("eugene", "ru") == (100.0, 20.0, 1)
+        finally:
+            second.close()
+
+    def test_flags_overshooting_sequences(self, store):
+        calibrator = DurationCalibrator(store)
+        short, long = _sequence("а" * 14), _sequence("а" * 140, "а" * 140)
+        estimates = calibrator.check([short, long], target_seconds=20, speaker="eugene")
+        assert [e.budget for e in estimates] == [10, 10]
+        assert [e.exceeds for e in estimates] == [False, True]
+        assert estimates[1].overshoot == pytest.approx(10.0)
+
+    def test_trim_drops_sentences_from_longest_shots(self, store):
+        calibrator = DurationCalibrator(store)
+        sentence = "а" * 13 + "."
+        sequence = _sequence(" ".join([sentence] * 4), " ".join([sentence] * 2), sentence)
+        trimmed = calibrator.trim(sequence, budget=4.7, speaker="eugene")
+        assert [len(split_sentences(s.text)) for s in trimmed.shots] == [2, 2, 1]
+        assert trimmed.shots[1] is sequence.shots[1]
+        assert sum(calibrator.predict(s.text, "eugene") for s in trimmed.shots) <= 4.7
+        assert len(split_sentences(sequence.shots[0].text)) == 4
+
+    def test_trim_keeps_one_sentence_per_shot(self, store):
+        calibrator = DurationCalibrator(store)
+        trimmed = calibrator.trim(_sequence("Раз. Два.", "Три."), budget=0.1, speaker="eugene")
+        assert [s.text for s in trimmed.shots] == ["Раз.", "Три."]
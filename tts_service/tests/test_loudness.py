@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from tts_processors.loudness import (
+    ShotLoudness,
+    block_powers,
+    gated_loudness,
+    integrated_loudness,
+    plan_gains,
+)
+
+RATE = 48000
+
+
+def _sine(freq: float = 997.0, seconds: float = 3.0, amplitude: float = 1.0) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+class TestIntegratedLoudness:
+    def test_full_scale_sine_reference(self):
+        # BS.1770: a 0 dBFS 997 Hz sine in one channel reads -3.01 LUFS
+        assert integrated_loudness(_sine(), RATE) == pytest.approx(-3.01, abs=0.1)
+
+    def test_gain_shifts_loudness_by_the_same_amount(self):
+        assert integrated_loudness(_sine(amplitude=0.1), RATE) == pytest.approx(-23.01, abs=0.1)
+
+    def test_stereo_adds_both_channels(self):
+        assert integrated_loudness(np.column_stack([_sine(), _sine()]), RATE) == pytest.approx(0.0, abs=0.1)
+
+    def test_low_frequencies_are_weighted_down(self):
+        assert integrated_loudness(_sine(20.0), RATE) < integrated_loudness(_sine(), RATE) - 10
+
+    def test_silence_and_pauses_are_gated(self):
+        assert integrated_loudness(np.zeros(RATE), RATE) == float("-inf")
+        speech = _sine(amplitude=0.1)
+        with_pause = np.concatenate([speech, np.zeros(3 * RATE)])
+        # without gating the pause would take 3 dB off; only the blocks at its edge count
+        assert integrated_loudness(with_pause, RATE) == pytest.approx(integrated_loudness(speech, RATE), abs=0.5)
+
+    def test_short_audio_is_one_block(self):
+        assert len(block_powers(_sine(seconds=0.1), RATE)) == 1
+
+    def test_blocks_overlap(self):
+        # 400 ms blocks every 100 ms
+        assert len(block_powers(_sine(seconds=1.0), RATE)) == 7
+
+
+class TestPlanGains:
+    def test_every_shot_reaches_the_target(self):
+        shots = [
+            ShotLoudness.measure("a", _sine(amplitude=0.05), RATE),
+            ShotLoudness.measure("b", _sine(amplitude=0.2), RATE),
+        ]
+        plan = plan_gains(shots, target=-20.0)
+        for shot in shots:
+            assert shot.loudness + plan.gains[shot.key] == pytest.approx(-20.0)
+        assert plan.loudness == pytest.approx(-20.0, abs=0.05)
+        assert plan.limited == ()
+
+    def test_gain_is_limited_by_the_peak(self):
+        # a loud transient in quiet speech
+        audio = _sine(amplitude=0.01)
+        audio[100] = 0.9
+        plan = plan_gains([ShotLoudness.measure("a", audio, RATE)], target=-16.0, max_peak_db=-1.0)
+        assert plan.limited == ("a",)
+        assert 20 * np.log10(0.9) + plan.gains["a"] == pytest.approx(-1.0)
+
+    def test_silent_shot_keeps_its_level(self):
+        plan = plan_gains([ShotLoudness.measure("a", np.zeros(RATE), RATE)])
+        assert plan.gains == {"a": 0.0}
+        assert gated_loudness(np.zeros(0)) == float("-inf")
@@ -0,0 +1,117 @@
+import copy
+import warnings
+
+import numpy as np
+import pytest
+
+from tts_processors.quality import (
+    MAX_DURATION_DRIFT,
+    MAX_SPECTRAL_DISTANCE_DB,
+    duration_drift,
+    log_spectral_distance,
+)
+from tts_processors import silero_optimize
+from tts_processors.silero_optimize import InferenceConfig, optimize_silero
+
+
+def _voice(seconds: float = 1.0, sample_rate: int = 8000) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (0.3 * np.sin(2 * np.pi * 180 * t) + 0.1 * np.sin(2 * np.pi * 900 * t)).astype(np.float32)
+
+
+class TestMetrics:
+    def test_identical_audio_has_no_distance(self):
+        audio = _voice()
+        assert log_spectral_distance(audio, audio) == pytest.approx(0.0)
+        assert duration_drift(audio, audio) == 0.0
+
+    def test_small_noise_stays_below_large_noise(self):
+        rng = np.random.default_rng(0)
+        audio = _voice()
+        slight = log_spectral_distance(audio, audio + 1e-4 * rng.standard_normal(len(audio)))
+        heavy = log_spectral_distance(audio, audio + 0.1 * rng.standard_normal(len(audio)))
+        assert slight < MAX_SPECTRAL_DISTANCE_DB < heavy
+
+    def test_silence_is_ignored(self):
+        audio = np.concatenate([np.zeros(8000, dtype=np.float32), _voice()])
+        assert log_spectral_distance(audio, audio * 1.01) < 0.2
+
+    def test_duration_drift(self):
+        audio = _voice()
+        assert duration_drift(audio, audio[: int(len(audio) * 0.9)]) == pytest.approx(0.1, abs=1e-3)
+
+
+class TestInferenceConfig:
+    def test_unknown_mode_is_rejected(self):
+        with pytest.raises(ValueError):
+            InferenceConfig(mode="fp16")
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TTS_INFERENCE_MODE", "int8")
+        monkeypatch.setenv("TTS_THREADS", "2")
+        monkeypatch.setenv("TTS_INFERENCE_STRICT", "1")
+        assert InferenceConfig.from_env() == InferenceConfig(mode="int8", threads=2, strict=True)
+
+
+class Wrapped:
+    def __init__(self):
+        self.model = "network"
+
+
+class TestOptimizeSilero:
+    @pytest.fixture(autouse=True)
+    def steps(self, monkeypatch):
+        def unsupported(network):
+            raise RuntimeError("LSTM is not quantizable")
+
+        monkeypatch.setattr(silero_optimize, "tune_threads", lambda config: None)
+        monkeypatch.setattr(silero_optimize, "_quantize", unsupported)
+        monkeypatch.setattr(silero_optimize, "_freeze", lambda network: f"frozen {network}")
+
+    def test_applied_steps_are_reported(self):
+        model, mode = optimize_silero(Wrapped(), InferenceConfig(mode="frozen"))
+        assert mode == "frozen" and model.model == "frozen network"
+        assert optimize_silero(Wrapped(), InferenceConfig())[1] == "fp32"
+
+    def test_skipped_step_is_not_reported(self):
+        with pytest.warns(RuntimeWarning, match="int8 optimization skipped"):
+            model, mode = optimize_silero(Wrapped(), InferenceConfig(mode="int8-frozen"))
+        assert mode == "frozen" and model.model == "frozen network"
+        with pytest.warns(RuntimeWarning):
+            assert optimize_silero(Wrapped(), InferenceConfig(mode="int8"))[1] == "fp32"
+
+    def test_strict_mode_fails(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            with pytest.raises(RuntimeError, match="int8 optimization failed"):
+                optimize_silero(Wrapped(), InferenceConfig(mode="int8", strict=True))
+
+
+TEXT = "Река Тибр стала главной торговой артерией и естественной границей первых кварталов."
+
+
+@pytest.fixture(scope="module")
+def silero():
+    torch = pytest.importorskip("torch")
+    try:
+        model, _ = torch.hub.load(
+            repo_or_dir="snakers4/silero-models", model="silero_tts", language="ru", speaker="v3_1_ru"
+        )
+    except Exception as e:  # pylint: disable=broad-except
+        pytest.skip(f"Silero model is not available: {e}")
+    return model
+
+
+def _speak(model) -> np.ndarray:
+    return model.apply_tts(text=TEXT, speaker="eugene", sample_rate=24000).numpy()
+
+
+class TestOptimizedSilero:
+    @pytest.mark.parametrize("mode", ["int8", "frozen", "int8-frozen"])
+    def test_output_stays_close_to_fp32(self, silero, mode):
+        reference = _speak(silero)
+        optimized, applied = optimize_silero(copy.deepcopy(silero), InferenceConfig(mode=mode, strict=True))
+        assert applied == mode
+        audio = _speak(optimized)
+        assert duration_drift(reference, audio) < MAX_DURATION_DRIFT
+        assert log_spectral_distance(reference, audio) < MAX_SPECTRAL_DISTANCE_DB
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from tts_processors.audio_codecs import StoragePolicy
+from tts_processors.backends import BACKENDS, BackendPool, SileroBackend, TTSBackend, VoiceChoice, VoiceRouter
+from tts_processors.silero_optimize import InferenceConfig
+from tts_processors.silero_tts_processor import SileroTTSProcessor
+from tts_processors.text_frontend import TextFrontend
+
+
+class FakeTensor:
+    def __init__(self, samples: int):
+        self.samples = samples
+
+    def numpy(self):
+        return np.full(self.samples, 0.1, dtype=np.float32)
+
+
+class FakeSilero:
+    def __init__(self):
+        self.calls = []
+
+    def apply_tts(self, text, speaker, sample_rate, put_accent, put_yo):
+        self.calls.append(dict(text=text, speaker=speaker, sample_rate=sample_rate, put_accent=put_accent))
+        # 10 ms per character
+        return FakeTensor(len(text) * sample_rate // 100)
+
+
+class FakeBackend(TTSBackend):
+    name = "fake"
+    sample_rate = 16000
+
+    def __init__(self):
+        super().__init__()
+        self.texts: list[str] = []
+        self.speakers: list[str | None] = []
+
+    def _load(self):
+        pass
+
+    def _synthesize_batch(self, texts, speaker):
+        self.texts += texts
+        self.speakers.append(speaker)
+        return [np.full(len(text) * 160, 0.1, dtype=np.float32) for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def silero(monkeypatch):
+    model = FakeSilero()
+
+    def load(backend):
+        backend.model, backend.mode = model, "fp32"
+
+    monkeypatch.setattr(SileroBackend, "_load", load)
+    return model
+
+
+def _processor(**kwargs) -> SileroTTSProcessor:
+    pool = BackendPool(VoiceRouter(backends={**BACKENDS, "fake": FakeBackend}))
+    kwargs.setdefault("inference", InferenceConfig())
+    return SileroTTSProcessor(bucket="test", storage=StoragePolicy(), pool=pool, **kwargs)
+
+
+class TestInferenceMode:
+    def test_waveforms_are_keyed_by_the_applied_mode(self, monkeypatch, silero):
+        def load(backend):
+            # int8 was requested but could not be applied
+            backend.model, backend.mode = silero, "fp32"
+
+        monkeypatch.setattr(SileroBackend, "_load", load)
+        tts = _processor(inference=InferenceConfig(mode="int8"))
+        assert tts.sentences.model == "v3_1_ru"
+
+        monkeypatch.setattr(SileroBackend, "_load", lambda backend: setattr(backend, "mode", "frozen"))
+        assert _processor(inference=InferenceConfig(mode="int8-frozen")).sentences.model == "v3_1_ru:frozen"
+
+
+class TestSampleRate:
+    def test_unsupported_rate_is_synthesized_at_the_nearest_one(self, silero):
+        tts = _processor(sample_rate=44100)
+        audio = tts.synthesize("Привет")
+        assert tts.backend.sample_rate == 48000 and silero.calls[0]["sample_rate"] == 48000
+        # 60 ms at 48 kHz, resampled to 44.1 kHz
+        assert len(audio) == 6 * 441
+
+    def test_supported_rate_is_not_resampled(self, silero):
+        tts = _processor(sample_rate=24000)
+        assert len(tts.synthesize("Привет")) == 6 * 240
+        assert silero.calls[0]["sample_rate"] == 24000
+
+
+class TestVoices:
+    def test_default_voice_goes_through_the_silero_backend(self, silero):
+        tts = _processor()
+        audio = tts.synthesize("Привет")
+        assert len(audio) == 6 * 480
+        assert silero.calls == [dict(text="Привет", speaker="eugene", sample_rate=48000, put_accent=True)]
+
+    def test_accenting_frontend_turns_off_the_model_accentor(self, silero):
+        tts = _processor(frontend=TextFrontend(lambda text: text.replace("и", "+и")))
+        tts.synthesize("Привет.")
+        assert silero.calls[0]["text"] == "Пр+ивет." and not silero.calls[0]["put_accent"]
+
+    def test_voice_selects_the_speaker_of_the_same_model(self, silero):
+        tts = _processor()
+        tts.synthesize("Привет", voice="Female voice, calm")
+        assert silero.calls[0]["speaker"] == "baya"
+        assert tts.pool.get("silero") is tts.backend
+
+    def test_other_backend_is_resampled_without_stress_marks(self, silero):
+        tts = _processor(frontend=TextFrontend(lambda text: "+" + text))
+        audio = tts.synthesize("Раз. Два.", voice="fake:robot")
+        fake = tts.pool.get("fake")
+        assert fake.texts == ["Раз.", "Два."] and not silero.calls
+        # two sentences of 4 characters at 48 kHz plus the pause between them
+        assert len(audio) == 2 * 4 * 480 + len(tts.sentences._gap())
+
+    def test_routed_speaker_is_passed_as_is(self, silero):
+        router = VoiceRouter(default=VoiceChoice("fake"), backends={**BACKENDS, "fake": FakeBackend})
+        tts = SileroTTSProcessor(
+            bucket="test", storage=StoragePolicy(), pool=BackendPool(router), inference=InferenceConfig()
+        )
+        for voice in ("fake:robot", "fake:fake", "calm"):
+            tts.synthesize("Раз.", voice=voice)
+        # a speaker named like the backend is still a speaker, no speaker stays None
+        assert tts.pool.get("fake").speakers == ["robot", "fake", None]
+        # without a speaker, waveforms and calibration are labelled by the backend
+        assert tts._voice("calm")[1] == "fake"
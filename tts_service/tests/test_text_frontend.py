@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from tts_processors.text_frontend import TextFrontend, normalize_text, number_to_words
+from tts_processors.waveform_cache import SentenceSynthesizer, WaveformCache
+
+
+class FakeModel:
+    def __init__(self, sample_rate: int = 100):
+        self.sample_rate = sample_rate
+        self.texts: list[str] = []
+
+    def __call__(self, text: str) -> np.ndarray:
+        self.texts.append(text)
+        return np.full(len(text), len(self.texts), dtype=np.float32)
+
+
+class TestNormalization:
+    @pytest.mark.parametrize("n, words", [
+        (0, "ноль"),
+        (21, "двадцать один"),
+        (1001, "тысяча один"),
+        (1961, "тысяча девятьсот шестьдесят один"),
+        (2_341_002, "два миллиона триста сорок одна тысяча два"),
+        (-5, "минус пять"),
+    ])
+    def test_number_to_words(self, n, words):
+        assert number_to_words(n) == words
+
+    def test_numbers_units_and_abbreviations(self):
+        assert normalize_text("Жили 1 200 000 человек, т. е. 12% от 21 тыс.") == (
+            "Жили один миллион двести тысяч человек, то есть двенадцать процентов от двадцать одна тысяча"
+        )
+        assert normalize_text("3,5 км и 2 км") == "три целых пять километров и два километра"
+
+    def test_dates_and_centuries(self):
+        assert normalize_text("12.04.1961") == "двенадцать апреля тысяча девятьсот шестьдесят один года"
+        assert normalize_text("В XV в. и в XXV веке") == "В пятнадцатый век и в XXV веке"
+
+    def test_sentence_end_after_abbreviation(self):
+        assert normalize_text("Основан в 753 г. до н. э. Рим рос.") == (
+            "Основан в семьсот пятьдесят три год до нашей эры. Рим рос."
+        )
+        assert normalize_text("Это было в XX в. Потом.") == "Это было в двадцатый век. Потом."
+
+    def test_sentence_initial_abbreviation_keeps_capital(self):
+        assert normalize_text("Так было. См. карту, т. е. схему.") == "Так было. Смотри карту, то есть схему."
+        assert normalize_text("Т. е. иначе.") == "То есть иначе."
+
+
+class TestTextFrontend:
+    def test_sentences_are_prepared_once(self):
+        calls = []
+
+        def accentor(text: str) -> str:
+            calls.append(text)
+            return text.replace("Рим", "Р+им")
+
+        frontend = TextFrontend(accentor)
+        first = frontend.prepare("Рим растёт. В 2 км от Рима река.")
+        second = frontend.prepare("Рим растёт.  Новая фраза.")
+        assert [s.text for s in first] == ["Р+им растёт.", "В два километра от Р+има река."]
+        assert second[0] == first[0]
+        assert calls == ["Рим растёт.", "В два километра от Рима река.", "Новая фраза."]
+        assert (frontend.hits, frontend.misses) == (1, 3)
+        assert frontend.accented
+
+    def test_cache_is_bounded(self):
+        frontend = TextFrontend(cache_size=2)
+        frontend.prepare("Раз. Два. Три.")
+        frontend.prepare("Раз.")
+        assert frontend.misses == 4
+
+
+class TestSentenceSynthesizer:
+    def test_only_changed_sentences_are_synthesized(self, tmp_path):
+        model = FakeModel()
+        synth = SentenceSynthesizer(
+            model, cache=WaveformCache(tmp_path), speaker="eugene", sample_rate=100, model="v3_1_ru", pause=0.1
+        )
+        audio = synth.synthesize("Раз два. Три четыре.")
+        assert len(audio) == len("Раз два.") + 10 + len("Три четыре.")
+        assert audio[len("Раз два."):len("Раз два.") + 10].tolist() == [0.0] * 10
+
+        model.texts.clear()
+        edited = synth.synthesize("Раз два. Пять шесть!")
+        assert model.texts == ["Пять шесть!"]
+        assert np.array_equal(edited[:8], audio[:8])
+        assert (synth.synthesized, synth.cached) == (3, 1)
+
+    def test_cache_key_includes_speaker_and_rate(self, tmp_path):
+        model, cache = FakeModel(), WaveformCache(tmp_path)
+        for speaker, rate in [("eugene", 100), ("baya", 100), ("eugene", 200)]:
+            SentenceSynthesizer(model, cache=cache, speaker=speaker, sample_rate=rate, model="m").synthesize("Раз.")
+        assert len(model.texts) == 3
+
+    def test_empty_text(self):
+        synth = SentenceSynthesizer(FakeModel(), speaker="eugene", sample_rate=100, model="m")
+        assert len(synth.synthesize("  ")) == 0
@@ -0,0 +1,167 @@
+import asyncio
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from tts_processors.audio_codecs import get_codec
+from tts_processors.wav_stream import (
+    HEADER_SIZE,
+    SoundFileStreamUpload,
+    WavStreamUpload,
+    _MultipartStream,
+    wav_header,
+)
+from tts_processors.waveform_cache import SentenceSynthesizer
+
+
+class FakeSaver:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.part_uploads: list[int] = []
+        self.aborted: list[str] = []
+
+    async def save(self, data, key, *, content_type=None):
+        self.objects[key] = bytes(data)
+
+    async def create_multipart(self, key, *, content_type="application/octet-stream"):
+        self.uploads[f"u{len(self.uploads)}"] = {}
+        return f"u{len(self.uploads) - 1}"
+
+    async def upload_part(self, key, upload_id, part_number, data):
+        self.uploads[upload_id][part_number] = bytes(data)
+        self.part_uploads.append(part_number)
+        return f"etag-{part_number}-{len(self.part_uploads)}"
+
+    async def complete_multipart(self, key, upload_id, etags):
+        parts = self.uploads.pop(upload_id)
+        assert len(etags) == len(parts)
+        self.objects[key] = b"".join(parts[i] for i in sorted(parts))
+
+    async def abort_multipart(self, key, upload_id):
+        self.uploads.pop(upload_id)
+        self.aborted.append(key)
+
+
+def _tone(seconds: float, sample_rate: int = 1000) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * 50 * t)).astype(np.float32)
+
+
+def _read(data: bytes) -> tuple[np.ndarray, int]:
+    return sf.read(io.BytesIO(data), dtype="float32")
+
+
+class TestMultipartStream:
+    def test_subclass_without_close_cannot_be_created(self):
+        class Incomplete(_MultipartStream):
+            pass
+
+        with pytest.raises(TypeError, match="close"):
+            Incomplete(FakeSaver(), "a.wav", "audio/wav", part_size=1024)
+
+
+class TestWavStreamUpload:
+    async def test_short_audio_is_a_single_object(self):
+        saver = FakeSaver()
+        async with WavStreamUpload(saver, "a.wav", 1000, part_size=1 << 20) as upload:
+            await upload.write(_tone(0.5))
+        audio, rate = _read(saver.objects["a.wav"])
+        assert rate == 1000 and len(audio) == 500
+        assert saver.part_uploads == []
+
+    async def test_long_audio_is_uploaded_in_parts_with_patched_header(self):
+        saver = FakeSaver()
+        tone = _tone(3.0)
+        async with WavStreamUpload(saver, "a.wav", 1000, part_size=1024) as upload:
+            for chunk in np.array_split(tone, 10):
+                await upload.write(chunk)
+        data = saver.objects["a.wav"]
+        assert data[:HEADER_SIZE] == wav_header(len(tone) * 2, 1000)
+        audio, _ = _read(data)
+        assert np.allclose(audio, tone, atol=1e-4)
+        # the first part goes up early and once more with the final header
+        assert saver.part_uploads[0] == 1 and saver.part_uploads[-1] == 1
+        assert len(saver.part_uploads) > 3
+
+    async def test_failure_aborts_the_upload(self):
+        saver = FakeSaver()
+        with pytest.raises(RuntimeError):
+            async with WavStreamUpload(saver, "a.wav", 1000, part_size=256) as upload:
+                await upload.write(_tone(1.0))
+                raise RuntimeError("tts failed")
+        assert saver.aborted == ["a.wav"] and "a.wav" not in saver.objects
+
+    async def test_failed_completion_aborts_the_upload(self):
+        saver = FakeSaver()
+
+        async def complete_multipart(key, upload_id, etags):
+            raise ConnectionError("S3 is down")
+
+        saver.complete_multipart = complete_multipart
+        with pytest.raises(ConnectionError):
+            async with WavStreamUpload(saver, "a.wav", 1000, part_size=256) as upload:
+                await upload.write(_tone(1.0))
+        assert saver.aborted == ["a.wav"] and not saver.uploads
+
+
+class TestSoundFileStreamUpload:
+    async def test_flac_is_uploaded_in_parts_with_patched_stream_info(self):
+        saver = FakeSaver()
+        tone = _tone(20.0, 8000)
+        async with SoundFileStreamUpload(saver, "a.flac", 8000, get_codec("flac"), part_size=4096) as upload:
+            for chunk in np.array_split(tone, 20):
+                await upload.write(chunk)
+        assert saver.part_uploads[0] == 1 and saver.part_uploads[-1] == 1
+        assert len(saver.part_uploads) > 3
+        info = sf.info(io.BytesIO(saver.objects["a.flac"]))
+        assert info.format == "FLAC" and info.frames == len(tone) == upload.samples
+        audio, _ = _read(saver.objects["a.flac"])
+        assert np.allclose(audio, tone, atol=1e-4)
+
+    async def test_short_flac_is_a_single_object(self):
+        saver = FakeSaver()
+        async with SoundFileStreamUpload(saver, "a.flac", 1000, get_codec("flac"), channels=2) as upload:
+            await upload.write(_tone(0.5))
+        audio, rate = _read(saver.objects["a.flac"])
+        assert rate == 1000 and audio.shape == (500, 2)
+        assert saver.part_uploads == []
+
+    async def test_failure_aborts_the_upload(self):
+        saver = FakeSaver()
+        with pytest.raises(RuntimeError):
+            async with SoundFileStreamUpload(saver, "a.flac", 8000, get_codec("flac"), part_size=256) as upload:
+                await upload.write(_tone(2.0, 8000))
+                raise RuntimeError("tts failed")
+        assert saver.aborted == ["a.flac"] and "a.flac" not in saver.objects
+
+    def test_ffmpeg_codecs_are_rejected(self):
+        with pytest.raises(ValueError, match="aac"):
+            SoundFileStreamUpload(FakeSaver(), "a.m4a", 48000, get_codec("aac"))
+
+
+class TestSentenceStream:
+    def _synth(self, delays: list[float]) -> SentenceSynthesizer:
+        def model(text: str) -> np.ndarray:
+            import time
+            time.sleep(delays.pop(0))
+            return np.full(len(text), 0.1, dtype=np.float32)
+
+        return SentenceSynthesizer(model, speaker="eugene", sample_rate=100, model="m", pause=0.1)
+
+    async def test_stream_matches_synthesize(self):
+        text = "Раз два. Три четыре! Пять?"
+        chunks = [chunk async for chunk in self._synth([0, 0, 0]).astream(text)]
+        assert len(chunks) == 3
+        assert np.array_equal(np.concatenate(chunks), self._synth([0, 0, 0]).synthesize(text))
+
+    async def test_first_sentence_arrives_before_the_rest_is_done(self):
+        stream = self._synth([0.0, 0.3]).astream("Раз. Два.")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await anext(stream)
+        assert loop.time() - started < 0.2
+        await anext(stream)
+        assert loop.time() - started >= 0.3